@@ -14,3 +14,12 @@ __all__ = [
     'utils',
     'tests'
 ]
+
+
+def __getattr__(name):
+    """Import subpackages on first access (`import src; src.rag`) rather than eagerly."""
+    if name in __all__:
+        import importlib
+
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
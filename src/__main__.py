@@ -0,0 +1,5 @@
+"""python -m src — same as the `flightlens` command (see cli.py)."""
+
+from src.cli import main
+
+main()
@@ -0,0 +1,4 @@
+"""
+FlightLens benchmark suite
+Synthetic corpus generator and offline performance benchmarks (see run.py)
+"""
@@ -0,0 +1,204 @@
+"""
+ASR backend benchmark for FlightLens
+
+Transcribes the audio fixtures in src/bench/fixtures/asr with each backend
+(see src/uia/asr.py) and reports per backend:
+- real-time factor (transcription time / audio duration; < 1 is faster than real time)
+- word error rate against the reference transcripts, and against the
+  openai-whisper baseline output
+- model load time, RSS after load and peak RSS
+
+Each backend runs in a fresh process so memory numbers are not mixed.
+
+The fixtures are WAV files named after the ids in transcripts.jsonl; the
+committed ones were synthesized with the system TTS voice (espeak-ng).
+Replace them with recorded speech, or regenerate them after editing the
+transcripts:
+    python -m src.bench.asr fixtures --record --overwrite
+    python -m src.bench.asr fixtures --tts --overwrite
+
+Usage:
+    python -m src.bench.asr [--backends openai-whisper faster-whisper onnx] [--model base]
+"""
+
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.loadgen import current_rss_mb
+from src.bench.run import BENCH_DIR, git_commit, peak_rss_mb
+from src.uia.asr import BACKENDS, ASRBackendError, load_backend, word_error_rate
+from src.uia.voice_assistant import SAMPLE_RATE, WHISPER_LANGUAGE, read_wav
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "asr"
+BASELINE = "openai-whisper"
+
+
+# -------------------------------------------------------------------
+# Fixtures
+# -------------------------------------------------------------------
+def load_transcripts(fixtures: Path = FIXTURES_DIR) -> List[Dict]:
+    with open(fixtures / "transcripts.jsonl", "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_fixtures(fixtures: Path = FIXTURES_DIR) -> List[Tuple[str, np.ndarray, str]]:
+    """(id, 16 kHz float32 audio, reference text) for every transcript with a WAV file."""
+    out = []
+    for item in load_transcripts(fixtures):
+        path = fixtures / f"{item['id']}.wav"
+        if path.exists():
+            out.append((item["id"], read_wav(path)[0], item["text"]))
+    return out
+
+
+class _NoTranscription:
+    """Model stand-in while capturing fixtures: only the VAD endpointing is needed."""
+
+    def transcribe(self, audio, **options):
+        return {"text": ""}
+
+
+def make_fixtures(fixtures: Path = FIXTURES_DIR, tts: bool = False, overwrite: bool = False):
+    """Record (or synthesize) one WAV per reference transcript."""
+    from src.uia.voice_assistant import MAX_UTTERANCE_S, StreamingTranscriber, microphone_chunks, write_wav
+
+    for item in load_transcripts(fixtures):
+        path = fixtures / f"{item['id']}.wav"
+        if path.exists() and not overwrite:
+            continue
+        if tts:
+            import pyttsx3
+
+            engine = pyttsx3.init()
+            engine.save_to_file(item["text"], str(path))
+            engine.runAndWait()
+            write_wav(path, read_wav(path)[0])     # normalize to 16 kHz mono PCM
+        else:
+            print(f"🎙️ Say: \"{item['text']}\"")
+            transcriber = StreamingTranscriber(model=_NoTranscription(), partial_every=MAX_UTTERANCE_S)
+            transcriber.run(microphone_chunks())
+            if transcriber.last_audio is None:
+                print("⚠️ No speech detected, skipped")
+                continue
+            write_wav(path, transcriber.last_audio)
+        print(f"✅ {path}")
+
+
+# -------------------------------------------------------------------
+# Benchmark
+# -------------------------------------------------------------------
+def bench_backend(backend: str, model: str, fixtures: str) -> Dict:
+    """Load one backend and transcribe every fixture (run in its own process)."""
+    clips = load_fixtures(Path(fixtures))
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    try:
+        asr = load_backend(backend, model)
+    except ASRBackendError as e:
+        return {"skipped": str(e)}
+    load_s = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    options = {"fp16": False, "language": WHISPER_LANGUAGE or None, "condition_on_previous_text": False}
+    asr.transcribe(clips[0][1], **options)   # warm-up
+
+    hypotheses, seconds = {}, []
+    for clip_id, audio, _ in clips:
+        start = time.perf_counter()
+        hypotheses[clip_id] = asr.transcribe(audio, **options)["text"].strip()
+        seconds.append(time.perf_counter() - start)
+
+    audio_s = sum(len(a) for _, a, _ in clips) / SAMPLE_RATE
+    return {
+        "load_s": round(load_s, 3),
+        "audio_s": round(audio_s, 2),
+        "transcribe_s": round(sum(seconds), 3),
+        "rtf": round(sum(seconds) / audio_s, 4),
+        "p50_clip_ms": round(float(np.percentile(seconds, 50)) * 1000, 1),
+        "model_rss_mb": round(rss_loaded - rss_before, 1) if rss_loaded and rss_before else None,
+        "rss_mb": round(rss_loaded, 1) if rss_loaded else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "hypotheses": hypotheses,
+    }
+
+
+def run_asr_bench(backends: Sequence[str] = tuple(BACKENDS), model: str = "base",
+                  fixtures: Path = FIXTURES_DIR) -> Dict:
+    clips = load_fixtures(fixtures)
+    if not clips:
+        raise SystemExit(f"No WAV fixtures in {fixtures}. Run: python -m src.bench.asr fixtures --record")
+    references = {clip_id: text for clip_id, _, text in clips}
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for backend in backends:
+        print(f"▶ {backend}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            results[backend] = pool.submit(bench_backend, backend, model, str(fixtures)).result()
+
+    ids = list(references)
+    baseline = results.get(BASELINE, {}).get("hypotheses")
+    for backend, result in results.items():
+        hyps = result.get("hypotheses")
+        if hyps is None:
+            continue
+        result["wer"] = round(word_error_rate([references[i] for i in ids], [hyps[i] for i in ids]), 4)
+        if baseline and backend != BASELINE:
+            result["wer_vs_baseline"] = round(word_error_rate([baseline[i] for i in ids], [hyps[i] for i in ids]), 4)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "model": model,
+            "clips": len(clips),
+        },
+        "backends": results,
+    }
+
+
+def print_report(report: Dict):
+    print(f"\n{'backend':16s} {'RTF':>7s} {'WER':>7s} {'vs base':>8s} {'load s':>7s} {'model MB':>9s} {'peak MB':>8s}")
+    for backend, r in report["backends"].items():
+        if "skipped" in r:
+            print(f"{backend:16s} skipped: {r['skipped']}")
+            continue
+        vs = r.get("wer_vs_baseline")
+        print(f"{backend:16s} {r['rtf']:7.3f} {r['wer']:7.1%} {'' if vs is None else f'{vs:.1%}':>8s} "
+              f"{r['load_s']:7.1f} {r['model_rss_mb'] or 0:9.0f} {r['peak_rss_mb'] or 0:8.0f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    if len(sys.argv) > 1 and sys.argv[1] == "fixtures":
+        make_fixtures(tts="--tts" in sys.argv, overwrite="--overwrite" in sys.argv)
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="FlightLens ASR backend benchmark")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--model", default="base", help="Whisper size (tiny, base, small, ...)")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--out", type=Path, default=None, help="Output JSON path")
+    args = parser.parse_args()
+
+    report = run_asr_bench(args.backends, args.model, args.fixtures)
+    print_report(report)
+
+    out = args.out or BENCH_DIR / f"asr_{report['meta']['commit'] or 'local'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Saved → {out}")
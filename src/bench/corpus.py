@@ -0,0 +1,110 @@
+"""
+Synthetic aviation corpus for FlightLens benchmarks
+- Deterministic POH-like pages: numbered sections, CAPS checklist titles,
+  numbered steps, WARNING/NOTE blocks and prose paragraphs
+- Written to a minimal PDF (no extra dependencies) so the parser stage
+  can run offline without any real manuals
+"""
+
+import random
+import textwrap
+from pathlib import Path
+from typing import List
+
+SECTIONS = [
+    "EMERGENCY PROCEDURES", "NORMAL PROCEDURES", "PERFORMANCE",
+    "WEIGHT AND BALANCE", "SYSTEMS DESCRIPTION", "LIMITATIONS",
+]
+PROCEDURES = [
+    "ENGINE FIRE DURING FLIGHT", "ELECTRICAL FIRE IN FLIGHT", "ENGINE FAILURE AFTER TAKEOFF",
+    "ROUGH ENGINE OPERATION", "LOSS OF OIL PRESSURE", "ALTERNATOR FAILURE",
+    "SPIN RECOVERY", "BEFORE TAKEOFF", "CRUISE", "BEFORE LANDING", "SHORT FIELD LANDING",
+]
+ITEMS = [
+    "Mixture", "Throttle", "Fuel Selector", "Master Switch", "Magnetos", "Carburetor Heat",
+    "Flaps", "Trim", "Cabin Heat and Air", "Fuel Pump", "Avionics Master", "Airspeed",
+]
+ACTIONS = ["IDLE CUT OFF", "OFF", "ON", "CHECK", "SET", "BOTH", "FULL RICH", "AS REQUIRED", "UP", "65 KIAS"]
+PROSE = [
+    "The fuel system supplies fuel from both wing tanks to the engine through a selector valve.",
+    "Maneuvering speed decreases with weight and should be reduced when operating below gross weight.",
+    "Stall speed increases with bank angle because the load factor increases in a coordinated turn.",
+    "The alternator supplies electrical power and charges the battery when the engine is running.",
+    "Density altitude has a significant effect on takeoff distance and climb performance.",
+    "Visibility of ten statute miles or more is reported in a METAR as 10SM.",
+    "Crosswind components should be computed before landing using the reported surface wind.",
+    "Carburetor icing can occur at temperatures well above freezing in humid conditions.",
+]
+
+
+def make_pages(n_pages: int, seed: int = 0) -> List[str]:
+    """Generate `n_pages` pages of POH-like text."""
+    rng = random.Random(seed)
+    pages = []
+    for p in range(n_pages):
+        lines = [f"SECTION {p // 20 + 1}", SECTIONS[(p // 20) % len(SECTIONS)], ""]
+        for _ in range(rng.randint(1, 2)):
+            lines.append(rng.choice(PROCEDURES))
+            for step in range(1, rng.randint(4, 8)):
+                lines.append(f"{step}. {rng.choice(ITEMS)} -- {rng.choice(ACTIONS)}")
+            lines.append("")
+        if rng.random() < 0.3:
+            lines.append("WARNING")
+            lines.append(rng.choice(PROSE))
+            lines.append("")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(" ".join(rng.choice(PROSE) for _ in range(rng.randint(2, 4))))
+            lines.append("")
+        pages.append("\n".join(lines))
+    return pages
+
+
+def make_chunks(n_chunks: int, seed: int = 0) -> List[dict]:
+    """chunks.jsonl-style records, for stages that skip parsing and chunking."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n_chunks):
+        title = rng.choice(PROCEDURES)
+        steps = "\n".join(f"{s}. {rng.choice(ITEMS)} -- {rng.choice(ACTIONS)}" for s in range(1, rng.randint(3, 7)))
+        text = f"{title}\n{steps}\n{' '.join(rng.choice(PROSE) for _ in range(rng.randint(1, 3)))}"
+        chunks.append({"text": text, "metadata": {"source": f"synthetic_{i % 4}.pdf", "page": i // 3}})
+    return chunks
+
+
+# -------------------------------------------------------------------
+# Minimal PDF writer
+# -------------------------------------------------------------------
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(pages: List[str], path: Path) -> Path:
+    """Write pages as a plain-text PDF (Helvetica, one text object per page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        ops = ["BT", "/F1 9 Tf", "11 TL", "50 780 Td"]
+        for line in text.split("\n"):
+            ops += [f"({_pdf_escape(part)}) Tj T*" for part in textwrap.wrap(line, 110) or [""]]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>").encode())
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
@@ -0,0 +1,167 @@
+"""
+Import-time benchmark for FlightLens entry points
+
+Runs each command's imports in a fresh interpreter under
+`python -X importtime` and reports:
+- wall time to import (interpreter start included)
+- cumulative import time and number of modules loaded
+- heavy packages pulled in (LangChain, transformers, torch, Whisper, ...)
+- the slowest top-level imports
+
+Lightweight commands (METAR lookup, ingest, procedure routing) must start in
+well under a second and must not load the ML stack; --check exits non-zero
+when one of them does.
+
+Usage:
+    python -m src.bench.importtime [--commands metar ingest] [--repeat 5] [--check]
+"""
+
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.run import BENCH_DIR, git_commit
+
+# Entry points and the imports they need before doing any work
+COMMANDS = {
+    "metar": "from src.integrations.aviation_weather import get_metar, decode_metar, explain_metar_groups",
+    "ingest": "from src.data.ingest import load_pdfs, split_docs, save_chunks",
+    "procedures": "from src.rag.router import route_query; from src.rag.procedures import get_procedure_index",
+    "packages": "import src, src.rag, src.data, src.evaluate, src.integrations",
+    "voice": "import src.uia.voice_assistant",
+    "cli": "import src.cli, src.daemon",
+}
+LIGHT_COMMANDS = ("metar", "ingest", "procedures", "packages", "voice", "cli")
+BUDGET_S = 1.0
+
+HEAVY_PACKAGES = (
+    "torch", "transformers", "langchain", "langchain_core", "langchain_community",
+    "langchain_huggingface", "sentence_transformers", "faiss", "whisper",
+    "faster_whisper", "sounddevice", "pyttsx3", "pandas",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+# -------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `-X importtime` output: module, self/cumulative µs and nesting depth."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": len(m.group(3)) // 2,
+            })
+    return rows
+
+
+def measure(code: str, repeat: int = 5) -> Dict:
+    """Import `code` in `repeat` fresh interpreters; median wall time and the last run's profile."""
+    walls, rows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=project_root, capture_output=True, text=True,
+        )
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            return {"error": error}
+        rows = parse_importtime(proc.stderr)
+
+    top_level = [r for r in rows if r["depth"] == 0]
+    loaded = {r["module"] for r in rows}
+    return {
+        "wall_s": round(statistics.median(walls), 3),
+        "import_s": round(sum(r["cumulative_us"] for r in top_level) / 1e6, 3),
+        "modules": len(loaded),
+        "heavy": sorted(p for p in HEAVY_PACKAGES if p in loaded),
+        "slowest": [
+            {"module": r["module"], "ms": round(r["cumulative_us"] / 1000, 1)}
+            for r in sorted(top_level, key=lambda r: -r["cumulative_us"])[:8]
+        ],
+    }
+
+
+def run_importtime_bench(commands: Sequence[str] = tuple(COMMANDS), repeat: int = 5) -> Dict:
+    results = {}
+    for name in commands:
+        print(f"▶ {name}...")
+        results[name] = measure(COMMANDS[name], repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "repeat": repeat,
+            "budget_s": BUDGET_S,
+        },
+        "commands": results,
+    }
+
+
+def failures(report: Dict) -> List[str]:
+    """Light commands over budget or loading the ML stack."""
+    out = []
+    for name, r in report["commands"].items():
+        if name not in LIGHT_COMMANDS or "error" in r:
+            continue
+        if r["wall_s"] > BUDGET_S:
+            out.append(f"{name}: {r['wall_s']:.2f}s > {BUDGET_S:.2f}s")
+        if r["heavy"]:
+            out.append(f"{name}: imports {', '.join(r['heavy'])}")
+    return out
+
+
+def print_report(report: Dict):
+    print(f"\n{'command':12s} {'wall s':>7s} {'import s':>9s} {'modules':>8s}  heavy / slowest")
+    for name, r in report["commands"].items():
+        if "error" in r:
+            print(f"{name:12s} failed: {r['error']}")
+            continue
+        slowest = ", ".join(f"{s['module']} {s['ms']:.0f}ms" for s in r["slowest"][:3])
+        heavy = f"⚠️ {', '.join(r['heavy'])} | " if r["heavy"] else ""
+        print(f"{name:12s} {r['wall_s']:7.3f} {r['import_s']:9.3f} {r['modules']:8d}  {heavy}{slowest}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlightLens import-time benchmark")
+    parser.add_argument("--commands", nargs="+", default=list(COMMANDS), choices=list(COMMANDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a light command is slow or loads the ML stack")
+    parser.add_argument("--out", type=Path, default=None, help="Output JSON path")
+    args = parser.parse_args()
+
+    report = run_importtime_bench(args.commands, args.repeat)
+    print_report(report)
+
+    out = args.out or BENCH_DIR / f"importtime_{report['meta']['commit'] or 'local'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Saved → {out}")
+
+    problems = failures(report)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if args.check and problems:
+        sys.exit(1)
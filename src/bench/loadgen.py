@@ -0,0 +1,418 @@
+"""
+Load generator for FlightLens
+
+Replays a mixed workload against the in-process engine or a local HTTP
+endpoint and reports how many simultaneous users one host can serve:
+- RAG questions from ALL_QUESTIONS plus synthetic paraphrases
+- METAR questions and telemetry-aware questions interleaved
+- closed loop (N users back-to-back) or open loop (Poisson arrivals at a
+  fixed rate; latency counted from the scheduled arrival, so queueing shows)
+- throughput, latency percentiles (overall and per request kind), error
+  rate, and CPU / RSS sampled over time
+- external weather APIs replaced by a local stub server
+
+Usage:
+    python -m src.bench.loadgen --concurrency 4 --duration 60
+    python -m src.bench.loadgen --rate 2 --duration 120 --target http://127.0.0.1:8765/query
+    python -m src.bench.loadgen --serve 8765      # expose the engine over HTTP
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.run import git_commit, peak_rss_mb
+
+LOAD_DIR = project_root / "evaluation" / "load"
+DEFAULT_MIX = {"rag": 0.7, "metar": 0.15, "telemetry": 0.15}
+STATIONS = ["KDFW", "KLAX", "KJFK", "KORD", "KSEA", "KDEN", "KATL", "KBOS"]
+
+PARAPHRASES = [
+    "{q}",
+    "Quick question: {q}",
+    "Can you tell me {lq}",
+    "{q} Please keep it brief.",
+    "I'm studying for my checkride. {q}",
+    "According to the POH, {lq}",
+]
+METAR_TEMPLATES = [
+    "What's the current METAR at {icao}?",
+    "Decode the weather at {icao} for me.",
+    "Is {icao} VFR right now?",
+    "What are the winds at {icao}?",
+]
+TELEMETRY_TEMPLATES = [
+    "Given my current altitude and airspeed, is this a stable cruise?",
+    "Based on my current telemetry, should I reduce power?",
+    "Am I climbing or descending right now, and is that appropriate?",
+    "Check my current airspeed against maneuvering speed.",
+]
+
+
+# -------------------------------------------------------------------
+# Workload
+# -------------------------------------------------------------------
+@dataclass
+class Request:
+    kind: str
+    query: str
+
+
+def paraphrase(question: str, rng: random.Random) -> str:
+    template = rng.choice(PARAPHRASES)
+    lowered = question[0].lower() + question[1:] if question else question
+    return template.format(q=question, lq=lowered)
+
+
+def build_workload(n: int, mix: Dict[str, float] = None, seed: int = 0) -> List[Request]:
+    """`n` requests drawn from the kind mix (deterministic for a given seed)."""
+    from src.evaluate.test_dataset import ALL_QUESTIONS
+
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds, weights = zip(*mix.items())
+    questions = [q["question"] for q in ALL_QUESTIONS if not q.get("requires_context")]
+
+    workload = []
+    for kind in rng.choices(kinds, weights=weights, k=n):
+        if kind == "metar":
+            query = rng.choice(METAR_TEMPLATES).format(icao=rng.choice(STATIONS))
+        elif kind == "telemetry":
+            query = rng.choice(TELEMETRY_TEMPLATES)
+        else:
+            query = paraphrase(rng.choice(questions), rng)
+        workload.append(Request(kind, query))
+    return workload
+
+
+# -------------------------------------------------------------------
+# Weather stub
+# -------------------------------------------------------------------
+def start_weather_stub(delay: float = 0.05, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Local stand-in for the aviationweather.gov data server
+
+    Points aviation_weather at it and disables the other providers.
+    """
+    from src.integrations import aviation_weather
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            from urllib.parse import parse_qs, urlparse
+
+            station = parse_qs(urlparse(self.path).query).get("stationString", ["KXXX"])[0]
+            time.sleep(delay)
+            body = json.dumps({"data": {"METAR": [{
+                "raw_text": f"METAR {station} 091856Z 18010KT 10SM FEW050 25/18 A3012"
+            }]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="weather-stub", daemon=True).start()
+    aviation_weather.AVIATION_WEATHER_URL = f"http://127.0.0.1:{server.server_port}/metar"
+    aviation_weather.WEATHERAPI_KEY = ""
+    return server
+
+
+# -------------------------------------------------------------------
+# Targets
+# -------------------------------------------------------------------
+class InProcessTarget:
+    """Routed answers from the process-wide RAG service."""
+
+    name = "in-process"
+
+    def __init__(self):
+        from src.rag.router import QueryRouter
+        from src.rag.service import get_service
+        from src.utils.context_simconnect import MSFSContext
+
+        self.service = get_service()
+        self.router = QueryRouter(self.service.engine.embeddings)
+        self.sim = MSFSContext()
+
+    def __call__(self, request: Request) -> Dict:
+        from src.rag.router import answer_routed
+
+        with self.service.acquire() as engine:
+            return answer_routed(request.query, engine=engine, router=self.router, sim=self.sim)
+
+
+class HttpTarget:
+    """POST {"query": ...} to a local endpoint; expects a JSON answer."""
+
+    def __init__(self, url: str, timeout: float = 120.0):
+        self.name = url
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self, request: Request) -> Dict:
+        import requests
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.post(self.url, json={"query": request.query, "kind": request.kind}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def serve_http(port: int, target: InProcessTarget = None):
+    """Minimal JSON endpoint over the in-process engine (POST /query)."""
+    target = target or InProcessTarget()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                result = target(Request(payload.get("kind", "rag"), payload["query"]))
+                body, status = json.dumps(result, default=str).encode(), 200
+            except Exception as e:
+                body, status = json.dumps({"error": str(e)}).encode(), 500
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"✅ Serving FlightLens on http://127.0.0.1:{server.server_port}/query")
+    return server
+
+
+# -------------------------------------------------------------------
+# Resource sampler
+# -------------------------------------------------------------------
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+class Sampler(threading.Thread):
+    """Samples CPU (100 = one core), RSS, completions and in-flight requests."""
+
+    def __init__(self, stats: "LoadStats", interval: float = 1.0):
+        super().__init__(name="load-sampler", daemon=True)
+        self.stats = stats
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._halt = threading.Event()
+
+    def run(self):
+        t0 = last_wall = time.perf_counter()
+        last_cpu = time.process_time()
+        last_done = 0
+        while not self._halt.wait(self.interval):
+            wall, cpu = time.perf_counter(), time.process_time()
+            done = self.stats.completed
+            self.samples.append({
+                "t": round(wall - t0, 2),
+                "cpu_percent": round(100.0 * (cpu - last_cpu) / (wall - last_wall), 1),
+                "rss_mb": round(current_rss_mb() or 0.0, 1),
+                "throughput_rps": round((done - last_done) / (wall - last_wall), 2),
+                "inflight": self.stats.inflight,
+            })
+            last_wall, last_cpu, last_done = wall, cpu, done
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[Dict] = []
+        self.inflight = 0
+
+    @property
+    def completed(self) -> int:
+        return len(self.records)
+
+    def begin(self):
+        with self._lock:
+            self.inflight += 1
+
+    def record(self, kind: str, latency: float, queued: float, error: Optional[str]):
+        with self._lock:
+            self.inflight -= 1
+            self.records.append({"kind": kind, "latency": latency, "queued": queued, "error": error})
+
+
+# -------------------------------------------------------------------
+# Runner
+# -------------------------------------------------------------------
+def _execute(target, request: Request, scheduled: float, stats: LoadStats):
+    started = time.perf_counter()
+    stats.begin()
+    error = None
+    try:
+        target(request)
+    except Exception as e:
+        error = type(e).__name__
+    stats.record(request.kind, time.perf_counter() - scheduled, started - scheduled, error)
+
+
+def run_load(target, workload: List[Request], concurrency: int = 4, rate: float = 0.0,
+             duration: float = 60.0, sample_interval: float = 1.0, seed: int = 0) -> Dict:
+    """
+    Drive `target` with `workload` (cycled) for `duration` seconds
+
+    Args:
+        concurrency: Worker threads (closed loop: simultaneous users)
+        rate: Open-loop arrival rate in requests/sec (0 = closed loop)
+    """
+    stats = LoadStats()
+    sampler = Sampler(stats, sample_interval)
+    rng = random.Random(seed)
+    sampler.start()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    if rate > 0:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            next_at, i = start, 0
+            while next_at < deadline:
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                pool.submit(_execute, target, workload[i % len(workload)], next_at, stats)
+                i += 1
+                next_at += rng.expovariate(rate)
+    else:
+        counter = iter(range(sys.maxsize))
+        lock = threading.Lock()
+
+        def user():
+            while time.perf_counter() < deadline:
+                with lock:
+                    i = next(counter)
+                _execute(target, workload[i % len(workload)], time.perf_counter(), stats)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(user)
+
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+    return summarize(stats.records, elapsed, sampler.samples)
+
+
+def _latency_summary(records: List[Dict]) -> Dict:
+    lat = np.array([r["latency"] for r in records]) * 1000.0
+    if lat.size == 0:
+        return {"count": 0}
+    p50, p90, p95, p99 = np.percentile(lat, [50, 90, 95, 99])
+    return {"count": int(lat.size), "p50_ms": round(float(p50), 1), "p90_ms": round(float(p90), 1),
+            "p95_ms": round(float(p95), 1), "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(lat.max()), 1), "mean_ms": round(float(lat.mean()), 1)}
+
+
+def summarize(records: List[Dict], elapsed: float, samples: List[Dict]) -> Dict:
+    ok = [r for r in records if r["error"] is None]
+    errors = {}
+    for r in records:
+        if r["error"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    by_kind = {}
+    for kind in sorted({r["kind"] for r in records}):
+        kind_records = [r for r in records if r["kind"] == kind]
+        by_kind[kind] = _latency_summary([r for r in kind_records if r["error"] is None])
+        by_kind[kind]["errors"] = sum(1 for r in kind_records if r["error"])
+
+    cpu = [s["cpu_percent"] for s in samples]
+    rss = [s["rss_mb"] for s in samples]
+    return {
+        "requests": len(records),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "error_rate": round(len(records) and (len(records) - len(ok)) / len(records), 4),
+        "errors": errors,
+        "latency": _latency_summary(ok),
+        "queue_wait_p95_ms": round(float(np.percentile([r["queued"] for r in ok], 95) * 1000.0), 1) if ok else None,
+        "by_kind": by_kind,
+        "cpu_percent_mean": round(float(np.mean(cpu)), 1) if cpu else None,
+        "rss_mb_max": max(rss) if rss else None,
+        "timeline": samples,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlightLens load generator")
+    parser.add_argument("--target", default="in-process", help='"in-process" or an HTTP URL (POST {"query": ...})')
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrivals/sec (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--requests", type=int, default=500, help="Workload size (cycled)")
+    parser.add_argument("--mix", default="rag=0.7,metar=0.15,telemetry=0.15")
+    parser.add_argument("--weather-delay", type=float, default=0.05, help="Stub METAR server latency (s)")
+    parser.add_argument("--no-metar-cache", action="store_true")
+    parser.add_argument("--serve", type=int, default=None, help="Serve the in-process engine on this port instead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start_weather_stub(delay=args.weather_delay)
+    if args.no_metar_cache:
+        from src.integrations import aviation_weather
+
+        aviation_weather.METAR_CACHE_TTL = 0
+
+    if args.serve is not None:
+        try:
+            serve_http(args.serve).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    mix = {k: float(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    workload = build_workload(args.requests, mix, seed=args.seed)
+    target = InProcessTarget() if args.target == "in-process" else HttpTarget(args.target)
+
+    print(f"▶ {args.duration:.0f}s against {target.name}: concurrency={args.concurrency}, "
+          f"{'rate=%.2f/s' % args.rate if args.rate else 'closed loop'}")
+    report = run_load(target, workload, args.concurrency, args.rate, args.duration, seed=args.seed)
+    report["config"] = {**vars(args), "mix": mix, "commit": git_commit(),
+                        "timestamp": datetime.now().isoformat(timespec="seconds")}
+
+    lat = report["latency"]
+    print(f"\nThroughput: {report['throughput_rps']} req/s   errors: {report['error_rate']:.1%}")
+    print(f"Latency p50/p95/p99: {lat.get('p50_ms')} / {lat.get('p95_ms')} / {lat.get('p99_ms')} ms")
+    for kind, s in report["by_kind"].items():
+        print(f"  {kind:10s} n={s.get('count', 0):5d}  p95={s.get('p95_ms')} ms  errors={s['errors']}")
+    print(f"CPU mean: {report['cpu_percent_mean']}%   RSS max: {report['rss_mb_max']} MB")
+
+    LOAD_DIR.mkdir(parents=True, exist_ok=True)
+    out = LOAD_DIR / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\n✅ Saved → {out}")
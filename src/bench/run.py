@@ -0,0 +1,298 @@
+"""
+FlightLens benchmark suite
+
+Runs offline on a synthetic corpus (see corpus.py) and writes one JSON file
+per run so results can be compared between commits:
+- PDF parse pages/sec (pypdf, as used by PyPDFLoader)
+- chunking throughput (structure-aware chunker)
+- embedding chunks/sec
+- index build time and query latency distribution at several corpus sizes
+- generation tokens/sec (with --models)
+- peak RSS after each stage
+
+By default a hashing embedder stands in for the sentence-transformer so no
+model files are needed; --models uses the registry models from the local cache.
+
+Usage:
+    python -m src.bench.run [--sizes 1000 10000 50000] [--models]
+    python -m src.bench.run compare old.json new.json
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.corpus import make_chunks, make_pages, write_pdf
+
+BENCH_DIR = project_root / "evaluation" / "bench"
+DEFAULT_SIZES = (1000, 10000, 50000)
+QUERIES = [
+    "What are the steps for an engine fire during flight?",
+    "How does bank angle affect stall speed?",
+    "What is maneuvering speed?",
+    "What should I do after an alternator failure?",
+    "How is visibility reported in a METAR?",
+    "What is the short field landing procedure?",
+]
+REGRESSION_THRESHOLD = 0.10
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentiles(seconds: Sequence[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3), "mean_ms": round(float(ms.mean()), 3)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class HashingEmbeddings:
+    """Deterministic bag-of-words embeddings (feature hashing); no model files needed."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in text.lower().split():
+                out[i, zlib.crc32(token.encode()) % self.dim] += 1.0
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+        return out.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+# -------------------------------------------------------------------
+# Stages
+# -------------------------------------------------------------------
+def bench_parse(n_pages: int, workdir: Path) -> Dict:
+    from pypdf import PdfReader
+
+    path = write_pdf(make_pages(n_pages), workdir / "synthetic_poh.pdf")
+    start = time.perf_counter()
+    texts = [page.extract_text() for page in PdfReader(str(path)).pages]
+    seconds = time.perf_counter() - start
+    return {"pages": len(texts), "seconds": round(seconds, 3),
+            "pages_per_s": round(len(texts) / seconds, 1), "pdf_bytes": path.stat().st_size}
+
+
+def bench_chunking(n_pages: int) -> Dict:
+    from src.data.chunker import chunk_document
+
+    pages = [(text, i) for i, text in enumerate(make_pages(n_pages))]
+    chars = sum(len(t) for t, _ in pages)
+    start = time.perf_counter()
+    chunks = chunk_document(pages, "synthetic_poh.pdf")
+    seconds = time.perf_counter() - start
+    return {"pages": n_pages, "chunks": len(chunks), "seconds": round(seconds, 3),
+            "chunks_per_s": round(len(chunks) / seconds, 1),
+            "mb_per_s": round(chars / seconds / 1e6, 3)}
+
+
+def bench_embedding(embeddings, n_chunks: int) -> Tuple[Dict, np.ndarray]:
+    texts = [c["text"] for c in make_chunks(n_chunks)]
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    seconds = time.perf_counter() - start
+    return {"chunks": n_chunks, "dimension": int(vectors.shape[1]), "seconds": round(seconds, 3),
+            "chunks_per_s": round(n_chunks / seconds, 1)}, vectors
+
+
+def corpus_vectors(base: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """Grow the embedded base set to `size` vectors by tiling with small noise."""
+    rng = np.random.default_rng(seed)
+    reps = -(-size // len(base))
+    vectors = np.tile(base, (reps, 1))[:size]
+    if size > len(base):
+        vectors = vectors + rng.normal(0, 0.01, vectors.shape).astype(np.float32)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def bench_index(embeddings, base: np.ndarray, sizes: Sequence[int], k: int = 3, repeats: int = 50) -> Dict:
+    """Flat index build time and single-query latency at each corpus size."""
+    import faiss
+
+    queries = np.asarray(embeddings.embed_documents(QUERIES), dtype=np.float32)
+    results = {}
+    for size in sizes:
+        vectors = corpus_vectors(base, size)
+        start = time.perf_counter()
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+        build = time.perf_counter() - start
+
+        latencies = []
+        for r in range(repeats):
+            q = queries[r % len(queries)][None, :]
+            start = time.perf_counter()
+            index.search(q, k)
+            latencies.append(time.perf_counter() - start)
+
+        results[str(size)] = {"build_s": round(build, 4), **percentiles(latencies), "rss_mb": peak_rss_mb()}
+        del index, vectors
+    return {"index_type": "IndexFlatL2", "k": k, "sizes": results}
+
+
+def bench_generation(n_prompts: int = 5) -> Dict:
+    from src.rag.chain import load_llm
+
+    llm = load_llm()
+    tokenizer = llm.pipeline.tokenizer
+    prompts = [f"Answer the question using the context.\nContext: {c['text']}\nQuestion: {q}"
+               for c, q in zip(make_chunks(n_prompts), QUERIES * n_prompts)]
+
+    llm.invoke(prompts[0])   # warm-up
+    tokens, start = 0, time.perf_counter()
+    for prompt in prompts:
+        tokens += len(tokenizer(llm.invoke(prompt))["input_ids"])
+    seconds = time.perf_counter() - start
+    return {"prompts": n_prompts, "output_tokens": tokens, "seconds": round(seconds, 3),
+            "tokens_per_s": round(tokens / seconds, 1)}
+
+
+# -------------------------------------------------------------------
+# Run / compare
+# -------------------------------------------------------------------
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, pages: int = 200, embed_chunks: int = 2000,
+                   models: bool = False) -> Dict:
+    if models:
+        from src.utils.model_registry import EMBED_MODEL, make_embeddings
+
+        embeddings, embedder = make_embeddings(EMBED_MODEL), EMBED_MODEL
+    else:
+        embeddings, embedder = HashingEmbeddings(), "hashing-384"
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "embedder": embedder,
+        },
+        "stages": {},
+    }
+    stages = report["stages"]
+
+    def record(name, fn, *args):
+        print(f"▶ {name}...")
+        try:
+            result = fn(*args)
+        except ImportError as e:
+            result = {"skipped": f"missing dependency: {e.name}"}
+        if isinstance(result, dict) and "skipped" not in result:
+            result.setdefault("rss_mb", peak_rss_mb())
+        stages[name] = result
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        record("parse", bench_parse, pages, Path(tmp))
+    record("chunking", bench_chunking, pages)
+
+    print("▶ embedding...")
+    stages["embedding"], base = bench_embedding(embeddings, embed_chunks)
+    stages["embedding"]["rss_mb"] = peak_rss_mb()
+
+    record("index", bench_index, embeddings, base, sizes)
+    if models:
+        record("generation", bench_generation)
+    else:
+        stages["generation"] = {"skipped": "run with --models"}
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def _flatten(d: Dict, prefix: str = "") -> Dict[str, float]:
+    out = {}
+    for key, value in d.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = float(value)
+    return out
+
+
+def compare(old: Dict, new: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Print metric changes; returns the names of metrics that regressed beyond `threshold`."""
+    a, b = _flatten(old.get("stages", {})), _flatten(new.get("stages", {}))
+    regressions = []
+    for name in sorted(set(a) & set(b)):
+        if name.endswith("_per_s"):
+            higher_is_better = True
+        elif name.endswith(("_ms", "_s", "rss_mb")):
+            higher_is_better = False
+        else:
+            continue
+        if a[name] == 0:
+            continue
+        change = (b[name] - a[name]) / a[name]
+        worse = -change if higher_is_better else change
+        flag = "❌" if worse > threshold else "  "
+        print(f"{flag} {name:40s} {a[name]:12.3f} → {b[name]:12.3f}  ({change:+.1%})")
+        if worse > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        with open(sys.argv[2]) as f_old, open(sys.argv[3]) as f_new:
+            regressed = compare(json.load(f_old), json.load(f_new))
+        sys.exit(1 if regressed else 0)
+
+    parser = argparse.ArgumentParser(description="FlightLens benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Corpus sizes (chunks) for index/query")
+    parser.add_argument("--pages", type=int, default=200, help="Synthetic PDF pages for parse/chunking")
+    parser.add_argument("--embed-chunks", type=int, default=2000, help="Chunks to embed")
+    parser.add_argument("--models", action="store_true", help="Use the real embedding model and LLM")
+    parser.add_argument("--out", type=Path, default=None, help="Output JSON path")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.pages, args.embed_chunks, args.models)
+
+    out = args.out or BENCH_DIR / f"bench_{report['meta']['commit'] or 'local'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["stages"], indent=2))
+    print(f"\n✅ Saved → {out}")
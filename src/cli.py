@@ -0,0 +1,227 @@
+"""
+cli.py — the `flightlens` command line
+
+    flightlens ingest                      PDFs in data/raw → chunks.jsonl + procedure index
+    flightlens index [--sharded]           embed chunks and publish a FAISS index version
+    flightlens query "question"            answer from the manuals
+    flightlens metar KDFW                  fetch and decode a METAR
+    flightlens eval rag|retrieval|sweep|chunking [args...]
+    flightlens bench run|asr|loadgen|importtime [args...]
+    flightlens daemon [--status|--stop]    keep models and index resident
+
+`query` goes through the daemon when one is running (answers in
+milliseconds of overhead instead of reloading FLAN-T5 and MPNet) and
+loads the models in-process otherwise. Subcommands import only what they
+use; ingest/index/eval/bench run the existing module scripts, and any
+extra arguments are passed through to them.
+"""
+
+import argparse
+import json
+import runpy
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+EVAL_SUITES = {
+    "rag": "src.evaluate.run_eval",
+    "retrieval": "src.evaluate.retrieval_eval",
+    "sweep": "src.evaluate.sweep",
+    "chunking": "src.evaluate.chunking_report",
+}
+BENCH_SUITES = {
+    "run": "src.bench.run",
+    "asr": "src.bench.asr",
+    "loadgen": "src.bench.loadgen",
+    "importtime": "src.bench.importtime",
+}
+
+
+def run_script(module: str, args: List[str]):
+    """Run a module's __main__ block in this process with the given arguments."""
+    argv = sys.argv
+    sys.argv = [module, *args]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    finally:
+        sys.argv = argv
+
+
+def _parse_pages(text: str):
+    first, _, last = text.partition("-")
+    return [int(first), int(last or first)]
+
+
+# -------------------------------------------------------------------
+# Subcommands
+# -------------------------------------------------------------------
+def cmd_ingest(args, extra):
+    run_script("src.data.ingest", extra)
+
+
+def cmd_index(args, extra):
+    run_script("src.data.shards" if args.sharded else "src.data.embed_faiss", extra)
+
+    from src import daemon
+
+    try:
+        daemon.request("reload")
+        print("🔄 Daemon is loading the new index")
+    except daemon.DaemonUnavailable:
+        pass
+    except daemon.DaemonError as e:
+        print(f"⚠️ Daemon could not reload: {e}")
+
+
+def cmd_query(args, extra):
+    params = {
+        "source": args.source,
+        "page_range": _parse_pages(args.pages) if args.pages else None,
+        "section": args.section,
+    }
+    streamed = []
+
+    def print_token(text):
+        streamed.append(text)
+        print(text, end="", flush=True)
+
+    stream = not (args.json or args.no_stream or args.routed)
+    on_token = print_token if stream else None
+
+    result = None
+    if not args.no_daemon:
+        from src import daemon
+
+        try:
+            result = daemon.query(args.question, on_token=on_token, routed=args.routed, **params)
+        except daemon.DaemonError as e:
+            if streamed:
+                print()
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    if result is None:
+        result = _query_in_process(args.question, on_token, args.routed, params)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print("" if streamed else result["answer"])
+    if args.sources:
+        for i, src in enumerate(result.get("sources", []), 1):
+            meta = src["metadata"]
+            print(f"  [{i}] {meta.get('source')} p.{meta.get('page')}")
+
+
+def _query_in_process(question: str, on_token, routed: bool, params) -> dict:
+    if routed:
+        from src.rag.filtering import MetadataFilter
+        from src.rag.router import answer_routed
+        from src.rag.service import get_service
+
+        page_range = params.pop("page_range")
+        flt = MetadataFilter(page_range=tuple(page_range) if page_range else None, **params)
+        with get_service().acquire() as engine:
+            return answer_routed(question, engine=engine, filter=flt)
+
+    from src.rag.chain import answer_question_with_sources
+
+    if params["page_range"]:
+        params["page_range"] = tuple(params["page_range"])
+    return answer_question_with_sources(question, on_token=on_token, **params)
+
+
+def cmd_metar(args, extra):
+    from src.integrations.aviation_weather import decode_metar, get_metar
+
+    for icao in args.stations:
+        raw = get_metar(icao.upper())
+        print(raw)
+        if not args.raw:
+            print(decode_metar(raw))
+            print()
+
+
+def cmd_eval(args, extra):
+    run_script(EVAL_SUITES[args.suite], extra)
+
+
+def cmd_bench(args, extra):
+    run_script(BENCH_SUITES[args.suite], extra)
+
+
+def cmd_daemon(args, extra):
+    from src import daemon
+
+    if args.status or args.stop:
+        try:
+            result = daemon.request("shutdown" if args.stop else "status")
+        except (daemon.DaemonUnavailable, daemon.DaemonError) as e:
+            print(f"⚠️ {e}")
+            sys.exit(1)
+        print("🛑 Daemon stopping" if args.stop else json.dumps(result, indent=2))
+        return
+    daemon.FlightLensDaemon().serve()
+
+
+# -------------------------------------------------------------------
+# Entry point
+# -------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="flightlens", description="FlightLens aviation RAG assistant")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="Parse PDFs into chunks and the procedure index")
+    p.set_defaults(func=cmd_ingest, passthrough=True)
+
+    p = sub.add_parser("index", help="Embed chunks and publish a FAISS index version")
+    p.add_argument("--sharded", action="store_true", help="Build per-manual shards (pass --force to rebuild all)")
+    p.set_defaults(func=cmd_index, passthrough=True)
+
+    p = sub.add_parser("query", help="Answer a question from the manuals")
+    p.add_argument("question")
+    p.add_argument("--source", help="Only retrieve from this document")
+    p.add_argument("--pages", help="Page range, e.g. 40-45 (0-based, inclusive)")
+    p.add_argument("--section", help="Section path prefix")
+    p.add_argument("--routed", action="store_true", help="Use the query router (METAR, telemetry, checklists)")
+    p.add_argument("--sources", action="store_true", help="List the source chunks")
+    p.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    p.add_argument("--no-stream", action="store_true", help="Print the answer when complete")
+    p.add_argument("--no-daemon", action="store_true", help="Load the models in this process")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("metar", help="Fetch and decode METARs")
+    p.add_argument("stations", nargs="+", help="ICAO codes, e.g. KDFW")
+    p.add_argument("--raw", action="store_true", help="Raw report only")
+    p.set_defaults(func=cmd_metar)
+
+    p = sub.add_parser("eval", help="Run an evaluation suite")
+    p.add_argument("suite", choices=list(EVAL_SUITES), help="rag = answer quality (run_eval.py)")
+    p.set_defaults(func=cmd_eval, passthrough=True)
+
+    p = sub.add_parser("bench", help="Run a benchmark")
+    p.add_argument("suite", choices=list(BENCH_SUITES), help="run = offline pipeline benchmark (run.py)")
+    p.set_defaults(func=cmd_bench, passthrough=True)
+
+    p = sub.add_parser("daemon", help="Serve queries with the models kept loaded")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="Show the running daemon")
+    group.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    p.set_defaults(func=cmd_daemon)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, "passthrough", False):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.func(args, extra)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+daemon.py — Local FlightLens query daemon
+- Loads the RAG service (embeddings, FAISS index, LLM) once and keeps it resident
+- Serves queries over a Unix socket, so repeated `flightlens query` calls
+  skip the model load
+- Newly published index versions are hot-swapped by RAGService's watcher
+  (or immediately with a "reload" request, sent by `flightlens index`)
+- Serves /metrics on FLIGHTLENS_METRICS_PORT when FLIGHTLENS_METRICS=1
+
+The socket lives in $XDG_RUNTIME_DIR, or in a private (0700) per-user
+directory under the temp dir; clients only connect to a socket owned by
+their own user.
+
+Protocol: newline-delimited JSON over the socket. The client sends one
+request line, {"op": "query" | "status" | "reload" | "shutdown", ...}; the
+daemon answers with {"token": ...} lines while streaming, then a final
+{"result": {...}} or {"error": "..."} line.
+
+Usage:
+    flightlens daemon              (foreground; Ctrl+C to stop)
+    flightlens daemon --status | --stop
+"""
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from src.utils import instrumentation as inst
+
+load_dotenv()
+
+def _uid():
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def default_socket_path() -> Path:
+    """$XDG_RUNTIME_DIR/flightlens.sock, else <tmp>/flightlens-<uid>/daemon.sock."""
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return Path(runtime) / "flightlens.sock"
+    return Path(tempfile.gettempdir()) / f"flightlens-{_uid()}" / "daemon.sock"
+
+
+SOCKET_PATH = Path(os.getenv("FLIGHTLENS_SOCKET") or default_socket_path())
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = float(os.getenv("FLIGHTLENS_DAEMON_TIMEOUT", "300"))
+WATCH_INTERVAL = 10.0
+
+
+class DaemonUnavailable(ConnectionError):
+    """No daemon is listening on the socket."""
+
+
+class DaemonError(RuntimeError):
+    """The daemon received the request but could not serve it."""
+
+
+# -------------------------------------------------------------------
+# Server
+# -------------------------------------------------------------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            op = request.pop("op")
+        except (ValueError, KeyError, AttributeError) as e:
+            self._send({"error": f"Bad request: {e}"})
+            return
+
+        stream = request.pop("stream", False)
+        on_token = (lambda text: self._send({"token": text})) if stream else None
+        daemon = self.server.flightlens
+        try:
+            with inst.span("daemon.request", op=op):
+                result = daemon.handle(op, request, on_token)
+        except (BrokenPipeError, ConnectionResetError):
+            return  # client went away mid-answer
+        except Exception as e:
+            inst.inc("daemon_requests_total", op=op, status="error")
+            self._send({"error": f"{type(e).__name__}: {e}"})
+            return
+        inst.inc("daemon_requests_total", op=op, status="ok")
+        self._send({"result": result})
+        if op == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def _send(self, message: Dict):
+        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FlightLensDaemon:
+    """
+    Resident RAG service behind a Unix socket.
+
+    Args:
+        path: Socket path (default FLIGHTLENS_SOCKET)
+        service: Loaded RAGService (default: get_service(), loaded in serve())
+    """
+
+    def __init__(self, path: Path = SOCKET_PATH, service=None):
+        self.path = Path(path)
+        self.service = service
+        self.started = time.time()
+        self.requests = 0
+        self._router = None
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def handle(self, op: str, request: Dict, on_token: Callable[[str], None] = None) -> Dict:
+        self.requests += 1
+        if op == "query":
+            return self.query(on_token=on_token, **request)
+        if op == "status":
+            return self.status()
+        if op == "reload":
+            self.service.reload()
+            return {"reloading": True, "index_version": self.service.version}
+        if op == "shutdown":
+            return {"stopping": True}
+        raise ValueError(f"Unknown op '{op}'")
+
+    def query(self, query: str, source: str = None, page_range=None, section: str = None,
+              routed: bool = False, on_token: Callable[[str], None] = None) -> Dict:
+        """Answer from the resident engine (same result shape as answer_question_with_sources)."""
+        from src.rag.filtering import MetadataFilter
+
+        flt = MetadataFilter(source=source, page_range=tuple(page_range) if page_range else None,
+                             section=section)
+        start = time.perf_counter()
+        if routed:
+            from src.rag.router import answer_routed
+
+            with self.service.acquire() as engine:
+                result = answer_routed(query, engine=engine, router=self._get_router(engine), filter=flt)
+        else:
+            answer, docs = self.service.answer(query, filter=flt, on_token=on_token)
+            result = {
+                "answer": answer,
+                "sources": [{"content": d.page_content[:300] + "...", "metadata": d.metadata} for d in docs],
+                "num_sources": len(docs),
+            }
+        result["index_version"] = self.service.version
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _get_router(self, engine):
+        """One QueryRouter per embedding model (embeddings survive index swaps)."""
+        from src.rag.router import QueryRouter
+
+        if self._router is None or self._router[0] is not engine.embeddings:
+            self._router = (engine.embeddings, QueryRouter(engine.embeddings))
+        return self._router[1]
+
+    def status(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "index_version": self.service.version,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def serve(self, watch_interval: float = WATCH_INTERVAL, ready: threading.Event = None):
+        """Load the models (unless a service was given) and serve until shutdown."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise SystemExit("❌ The FlightLens daemon needs Unix domain sockets")
+        _private_dir(self.path.parent)
+        if is_running(self.path):
+            raise SystemExit(f"❌ A FlightLens daemon is already running on {self.path}")
+        self.path.unlink(missing_ok=True)   # stale socket from a killed daemon
+
+        if self.service is None:
+            from src.rag.service import get_service
+
+            print("Loading models and index...")
+            self.service = get_service()
+        self.service.start_watching(watch_interval)
+        inst.serve_if_enabled()
+
+        with _Server(str(self.path), _Handler) as server:
+            server.flightlens = self
+            os.chmod(self.path, 0o600)
+            self.started = time.time()
+            print(f"✅ FlightLens daemon ready on {self.path} (index {self.service.version})")
+            if ready is not None:
+                ready.set()
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.service.stop_watching()
+                self.path.unlink(missing_ok=True)
+                print("👋 FlightLens daemon stopped")
+
+
+def _private_dir(path: Path):
+    """Create the socket directory (0700) and refuse one other users can write to."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(path)
+    if os.path.islink(path) or st.st_uid != _uid() or st.st_mode & 0o022:
+        raise SystemExit(f"❌ {path} must be a directory owned by you and not writable by others "
+                         "(set FLIGHTLENS_SOCKET to a socket path in a private directory)")
+
+
+# -------------------------------------------------------------------
+# Client
+# -------------------------------------------------------------------
+def request(op: str, path: Path = SOCKET_PATH, on_token: Callable[[str], None] = None,
+            timeout: float = REQUEST_TIMEOUT, **params) -> Dict:
+    """
+    Send one request to the daemon
+
+    Args:
+        on_token: Receives the answer text as it is generated (query only)
+
+    Raises:
+        DaemonUnavailable: No daemon on the socket, or the socket belongs to another user
+        DaemonError: The daemon failed to serve the request
+    """
+    try:
+        owner = os.stat(path).st_uid
+    except OSError as e:
+        raise DaemonUnavailable(f"No FlightLens daemon on {path}") from e
+    if owner != _uid():
+        raise DaemonUnavailable(f"{path} is owned by uid {owner}, not you; not connecting")
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(f"No FlightLens daemon on {path}") from e
+
+    sock.settimeout(timeout)
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps({"op": op, "stream": on_token is not None, **params}) + "\n").encode("utf-8"))
+        f.flush()
+        for line in f:
+            message = json.loads(line)
+            if "token" in message:
+                on_token(message["token"])
+            elif "error" in message:
+                raise DaemonError(message["error"])
+            else:
+                return message["result"]
+    raise DaemonError("Daemon closed the connection without answering")
+
+
+def is_running(path: Path = SOCKET_PATH) -> bool:
+    try:
+        request("status", path, timeout=CONNECT_TIMEOUT)
+        return True
+    except (DaemonUnavailable, DaemonError, OSError, ValueError):
+        return False
+
+
+def query(text: str, path: Path = SOCKET_PATH, on_token: Callable[[str], None] = None,
+          **params) -> Optional[Dict]:
+    """Answer through the daemon; None when no daemon is running."""
+    try:
+        return request("query", path, on_token=on_token, query=text, **params)
+    except DaemonUnavailable:
+        return None
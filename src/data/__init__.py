@@ -1,23 +1,21 @@
 """
 FlightLens Data Processing Package
 Document ingestion, chunking, and FAISS embedding generation
-"""
 
-from src.data.ingest import (
-    load_pdfs,
-    split_docs,
-    save_chunks
-)
+Exports are resolved on first access (see src/utils/lazy.py).
+"""
 
-from src.data.embed_faiss import (
-    load_chunks
-)
+from src.utils.lazy import lazy_exports
 
-__all__ = [
+_EXPORTS = {
     # Ingestion functions
-    'load_pdfs',
-    'split_docs',
-    'save_chunks',
+    'load_pdfs': 'src.data.ingest',
+    'split_docs': 'src.data.ingest',
+    'save_chunks': 'src.data.ingest',
     # Embedding functions
-    'load_chunks'
-]
+    'load_chunks': 'src.data.embed_faiss',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,265 @@
+"""
+chunker.py - Structure-aware chunking for POH / FAA text
+- Detects headings, checklists and numbered steps
+- Keeps procedures intact (never splits a step list unless it is oversized)
+- Records section path and chunk position in metadata
+- Packs whole blocks instead of overlapping windows, so far fewer
+  characters are embedded twice
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils import instrumentation as inst
+
+MAX_CHARS = 900         # soft limit for a packed chunk
+MIN_CHARS = 200         # merge smaller trailing blocks into the previous chunk
+PROCEDURE_MAX = 2000    # intact procedures may exceed MAX_CHARS up to this
+
+_NUMBERED_HEADING = re.compile(r"^\s*(?:SECTION|CHAPTER)\s+\d+\b|^\s*\d+(?:\.\d+){0,3}\s+[A-Z][A-Za-z]")
+_CAPS_HEADING = re.compile(r"^\s*[A-Z][A-Z0-9 /()&,'\-]{3,78}$")
+_BLOCK_HEAD = re.compile(r"^\s*(CHECKLIST|PROCEDURE|PROCEDURES|WARNING|CAUTION|NOTE)\b")
+_STEP = re.compile(
+    r"^\s*(?:\d{1,2}[.)]|[a-z][.)]|[•\-*])\s+\S"
+    r"|^\s*[A-Za-z][\w /()'\-]{1,40}?(?:\s*\.{2,}|\s+[-–]{1,2})\s*[A-Z0-9]"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class Block:
+    kind: str                   # "heading" | "procedure" | "text"
+    lines: List[str]
+    section: Tuple[str, ...]
+    page: Optional[int]
+    steps: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+@dataclass
+class Chunk:
+    text: str
+    metadata: Dict = field(default_factory=dict)
+
+    @property
+    def page_content(self) -> str:
+        """Same attribute name as a LangChain Document, so save_chunks() takes either."""
+        return self.text
+
+
+# -------------------------------------------------------------------
+# Block detection
+# -------------------------------------------------------------------
+def _heading_level(line: str) -> Optional[int]:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 80 or _STEP.match(line):
+        return None
+    if _NUMBERED_HEADING.match(stripped):
+        m = re.match(r"^\s*(\d+(?:\.\d+)*)", stripped)
+        return m.group(1).count(".") + 1 if m else 1
+    if _CAPS_HEADING.match(stripped) and sum(c.isalpha() for c in stripped) >= 4:
+        return 2
+    return None
+
+
+def split_blocks(pages: Iterable[Tuple[str, Optional[int]]]) -> List[Block]:
+    """
+    Split page texts into headings, procedures and paragraphs
+
+    Args:
+        pages: (text, page) tuples of one document in reading order
+
+    Returns:
+        Blocks carrying their section path and start page
+    """
+    blocks: List[Block] = []
+    section: List[Tuple[int, str]] = []
+    current: Optional[Block] = None
+
+    def flush():
+        nonlocal current
+        if current and current.text:
+            blocks.append(current)
+        current = None
+
+    def path():
+        return tuple(title for _, title in section)
+
+    for text, page in pages:
+        lines = text.splitlines()
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            following = lines[i + 1:i + 3]
+            starts_procedure = bool(_BLOCK_HEAD.match(line)) or (
+                _heading_level(line) is not None and any(_STEP.match(n) for n in following)
+            )
+
+            if starts_procedure and not (current and current.kind == "procedure" and _STEP.match(line)):
+                flush()
+                current = Block("procedure", [stripped], path() + (stripped,), page)
+                continue
+
+            if current and current.kind == "procedure":
+                if _STEP.match(line):
+                    current.lines.append(line.rstrip())
+                    current.steps += 1
+                    continue
+                if stripped and line.startswith((" ", "\t")) and current.steps:
+                    current.lines.append(line.rstrip())
+                    continue
+                if not stripped:
+                    continue
+                if not current.steps and len(current.lines) < 3:
+                    current.lines.append(stripped)
+                    continue
+                flush()
+
+            level = _heading_level(line)
+            if level is not None:
+                flush()
+                while section and section[-1][0] >= level:
+                    section.pop()
+                section.append((level, stripped))
+                blocks.append(Block("heading", [stripped], path(), page))
+                continue
+
+            if not stripped:
+                flush()
+                continue
+
+            if current is None:
+                current = Block("text", [], path(), page)
+            current.lines.append(stripped)
+
+    flush()
+    return blocks
+
+
+# -------------------------------------------------------------------
+# Packing
+# -------------------------------------------------------------------
+def _split_long(text: str, limit: int) -> List[str]:
+    """Sentence-boundary split for paragraphs longer than the limit."""
+    parts, buf = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        if buf and len(buf) + len(sentence) + 1 > limit:
+            parts.append(buf)
+            buf = sentence
+        else:
+            buf = f"{buf} {sentence}".strip()
+    if buf:
+        parts.append(buf)
+    return parts
+
+
+def pack_blocks(blocks: List[Block], max_chars: int = MAX_CHARS) -> List[Chunk]:
+    """
+    Pack consecutive blocks of the same section into chunks up to max_chars.
+    Headings are carried as a prefix of the first chunk of their section.
+    """
+    chunks: List[Chunk] = []
+    state = {"buf": [], "section": (), "page": None, "kind": "text", "body": False}
+
+    def size():
+        return sum(len(b) + 2 for b in state["buf"])
+
+    def emit():
+        text = "\n\n".join(state["buf"]).strip()
+        if text:
+            chunks.append(Chunk(text, {
+                "page": state["page"],
+                "section": " > ".join(state["section"]),
+                "block_type": state["kind"],
+            }))
+        state.update(buf=[], kind="text", body=False)
+
+    def add(block: Block, text: str, kind: str = None):
+        if not state["buf"] or not state["body"]:
+            # Heading-only prefix takes the section of the first body block
+            state["section"] = block.section
+            if not state["buf"]:
+                state["page"] = block.page
+        state["buf"].append(text)
+        if kind:
+            state["kind"] = kind
+        if block.kind != "heading":
+            state["body"] = True
+
+    for block in blocks:
+        text = block.text
+
+        if block.kind == "heading":
+            if state["body"] and size() >= MIN_CHARS:
+                emit()
+            add(block, text)
+            continue
+
+        if state["body"] and (
+            size() + len(text) > max_chars
+            or (block.section != state["section"] and size() >= MIN_CHARS)
+        ):
+            emit()
+
+        if block.kind == "procedure":
+            if len(text) <= PROCEDURE_MAX:
+                add(block, text, "procedure")
+                continue
+            # Oversized procedure: split between steps, repeating the title
+            title, steps = block.lines[0], block.lines[1:]
+            part = [title]
+            for step in steps:
+                if len("\n".join(part)) + len(step) > max_chars and len(part) > 1:
+                    add(block, "\n".join(part), "procedure")
+                    emit()
+                    part = [f"{title} (cont.)"]
+                part.append(step)
+            add(block, "\n".join(part), "procedure")
+            continue
+
+        if len(text) > max_chars:
+            pieces = _split_long(text, max(max_chars - size(), MIN_CHARS))
+            for piece in pieces[:-1]:
+                add(block, piece)
+                emit()
+            text = pieces[-1]
+        add(block, text)
+
+    emit()
+    return chunks
+
+
+def chunk_document(pages: Iterable[Tuple[str, Optional[int]]], source: str,
+                   max_chars: int = MAX_CHARS) -> List[Chunk]:
+    """Chunk one document; adds source and chunk position (index, total) to metadata."""
+    with inst.span("ingest.chunk_document", source=source):
+        chunks = pack_blocks(split_blocks(pages), max_chars=max_chars)
+    for i, ch in enumerate(chunks):
+        ch.metadata.update({"source": source, "chunk_index": i, "chunk_count": len(chunks)})
+    return chunks
+
+
+def structured_split(docs, max_chars: int = MAX_CHARS) -> List[Chunk]:
+    """
+    Structure-aware replacement for split_docs()
+
+    Args:
+        docs: LangChain page Documents (as returned by load_pdfs)
+
+    Returns:
+        Chunks with source, page, section, block_type and chunk position metadata
+    """
+    by_source: Dict[str, List[Tuple[str, Optional[int]]]] = {}
+    for d in docs:
+        by_source.setdefault(d.metadata.get("source"), []).append(
+            (d.page_content, d.metadata.get("page"))
+        )
+
+    chunks: List[Chunk] = []
+    for source, pages in by_source.items():
+        pages.sort(key=lambda p: p[1] or 0)
+        chunks.extend(chunk_document(pages, source, max_chars=max_chars))
+    return chunks
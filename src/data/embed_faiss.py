@@ -3,22 +3,27 @@ embed_faiss.py - Final Working Version
 - No manual embedding
 - FAISS.from_texts() handles embedding
 - Progress printed every 100 chunks
+- Embedding model from the shared model registry (same as query time)
+- Published as a new index version (see index_store.py); the running
+  app picks it up without a restart
 """
 
-import os, json
+import os
 from dotenv import load_dotenv
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+
+from src.data.index_store import IndexStore
+from src.utils import instrumentation as inst
+from src.utils.files import read_chunks
+from src.utils.model_registry import EMBED_MODEL, embedding_fingerprint, make_embeddings
 
 load_dotenv()
 
 CHUNK_FILE = os.getenv("PROCESSED_DATA_PATH", "data/processed") + "/chunks.jsonl"
 INDEX_DIR = os.getenv("FAISS_INDEX_PATH", "models/faiss_index")
-EMBED_MODEL = os.getenv("FLIGHTLENS_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 def load_chunks():
-    with open(CHUNK_FILE, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f]
+    """Chunk records (from chunks.bin when ingest wrote one, else chunks.jsonl)."""
+    return read_chunks(CHUNK_FILE)
 
 if __name__ == "__main__":
     data = load_chunks()
@@ -28,7 +33,9 @@ if __name__ == "__main__":
     print(f"Loaded {len(texts)} chunks.")
     print(f"Using embedding model: {EMBED_MODEL}")
 
-    embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+    from langchain_community.vectorstores import FAISS
+
+    embeddings = make_embeddings(EMBED_MODEL)
 
     # Fake progress log (embedding happens inside FAISS)
     for i in range(0, len(texts), 100):
@@ -37,14 +44,20 @@ if __name__ == "__main__":
     print("Building FAISS index... (embedding handled internally)")
 
     # ⭐ THIS is the correct FAISS call — no errors
-    db = FAISS.from_texts(
-        texts=texts,
-        embedding=embeddings,
-        metadatas=metadatas
+    with inst.span("index.embed_and_build", chunks=len(texts), model=EMBED_MODEL):
+        db = FAISS.from_texts(
+            texts=texts,
+            embedding=embeddings,
+            metadatas=metadatas
+        )
+
+    version = IndexStore(INDEX_DIR).publish(
+        db,
+        EMBED_MODEL,
+        chunk_count=len(texts),
+        extra={"embedding": embedding_fingerprint(EMBED_MODEL)},
     )
 
-    os.makedirs(INDEX_DIR, exist_ok=True)
-    db.save_local(INDEX_DIR)
-
-    print(f"FAISS index saved → {INDEX_DIR}")
+    print(f"FAISS index saved → {INDEX_DIR} (version {version})")
     print("DONE.")
+    inst.dump_if_enabled("embed_faiss")
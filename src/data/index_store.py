@@ -0,0 +1,214 @@
+"""
+index_store.py - Versioned FAISS index directories
+Layout under FAISS_INDEX_PATH:
+    versions/<version>/index.faiss, index.pkl, manifest.json
+    CURRENT   (name of the active version, replaced atomically)
+
+- New builds are written to a hidden directory and renamed into place,
+  then CURRENT is swapped with os.replace, so readers never see a torn index
+- manifest.json records embedding model, chunk count, build time and checksum
+- A plain legacy index (index.faiss directly in the root) is still readable
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from src.utils import instrumentation as inst
+
+load_dotenv()
+
+INDEX_DIR = os.getenv("FAISS_INDEX_PATH", "models/faiss_index")
+KEEP_VERSIONS = int(os.getenv("FLIGHTLENS_KEEP_INDEX_VERSIONS", "3"))
+
+MANIFEST_FILE = "manifest.json"
+POINTER_FILE = "CURRENT"
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+
+class IndexManifestError(RuntimeError):
+    """Index on disk is missing, corrupt, or incompatible with the query encoder."""
+
+
+def file_checksum(paths: List[Path]) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def version_key(version: str) -> tuple:
+    """Sort key for YYYYmmdd_HHMMSS[_n] names: numeric parts compare as numbers, so _10 follows _9."""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in version.split("_"))
+
+
+class IndexStore:
+    """Versioned index directories with an atomic CURRENT pointer."""
+
+    def __init__(self, root: str = INDEX_DIR):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def current_version(self) -> Optional[str]:
+        pointer = self.root / POINTER_FILE
+        if not pointer.exists():
+            return None
+        return pointer.read_text(encoding="utf-8").strip() or None
+
+    def version_path(self, version: Optional[str]) -> Path:
+        if version is None:
+            return self.root  # legacy un-versioned index
+        return self.versions_dir / version
+
+    def current_path(self) -> Path:
+        path = self.version_path(self.current_version())
+        if not (path / INDEX_FILES[0]).exists():
+            raise IndexManifestError(f"No FAISS index found at {path}")
+        return path
+
+    def read_manifest(self, version: Optional[str] = None) -> Optional[Dict]:
+        """Manifest of a version (default: current). None for legacy indexes."""
+        if version is None:
+            version = self.current_version()
+        path = self.version_path(version) / MANIFEST_FILE
+        if version is None or not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def index_dimension(self, version: Optional[str] = None) -> Optional[int]:
+        """Vector dimension stored in a version's index.faiss (memory-mapped; vectors are not read)."""
+        path = self.version_path(version) / INDEX_FILES[0]
+        if not path.exists():
+            return None
+        import faiss
+
+        return int(faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY).d)
+
+    def check(self, embed_model: str, version: Optional[str] = None, verify: bool = False,
+              fingerprint: Dict = None) -> Optional[Dict]:
+        """
+        Refuse indexes built with a different embedding model than the query encoder
+
+        Args:
+            embed_model: Query-time embedding model name
+            version: Version to check (default: current)
+            verify: Also recompute the file checksum
+            fingerprint: Query encoder fingerprint (see model_registry.embedding_fingerprint)
+                         to compare dimension, normalization and tokenizer
+
+        Returns:
+            The manifest (None for legacy indexes, of which only the
+            dimension can be checked)
+        """
+        if version is None:
+            version = self.current_version()
+        manifest = self.read_manifest(version)
+        if manifest is None:
+            dimension = fingerprint.get("dimension") if fingerprint else None
+            built = self.index_dimension(version) if dimension else None
+            if built is not None and built != dimension:
+                raise IndexManifestError(
+                    f"Index at {self.version_path(version)} (no manifest) has dimension {built} but the "
+                    f"query encoder '{fingerprint.get('name')}' produces {dimension}. Rebuild the index "
+                    f"(python -m src.data.embed_faiss) or set FLIGHTLENS_EMBEDDING_MODEL to the model it was built with."
+                )
+            return None
+
+        built_with = manifest.get("embedding_model")
+        if built_with != embed_model:
+            raise IndexManifestError(
+                f"Index version {version} was built with '{built_with}' but the query encoder "
+                f"is '{embed_model}'. Rebuild the index or set FLIGHTLENS_EMBEDDING_MODEL={built_with}."
+            )
+
+        if fingerprint and manifest.get("embedding"):
+            from src.utils.model_registry import ModelRegistryError, check_fingerprint
+
+            try:
+                check_fingerprint(manifest["embedding"], fingerprint)
+            except ModelRegistryError as e:
+                raise IndexManifestError(f"Index version {version}: {e}") from e
+
+        if verify:
+            path = self.version_path(version)
+            digest = file_checksum([path / name for name in INDEX_FILES])
+            if digest != manifest.get("checksum"):
+                raise IndexManifestError(f"Checksum mismatch for index version {version}")
+        return manifest
+
+    def list_versions(self) -> List[str]:
+        """Version names, oldest first."""
+        if not self.versions_dir.exists():
+            return []
+        names = [p.name for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        return sorted(names, key=version_key)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def publish(self, db, embed_model: str, chunk_count: int, extra: Dict = None) -> str:
+        """
+        Save a FAISS vector store as a new version and make it current
+
+        Returns:
+            The new version name
+        """
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        n = 1
+        while (self.versions_dir / version).exists():
+            version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{n}"
+            n += 1
+
+        staging = self.versions_dir / f".{version}.building"
+        shutil.rmtree(staging, ignore_errors=True)
+        with inst.span("index.save", version=version):
+            db.save_local(str(staging))
+
+        manifest = {
+            "version": version,
+            "embedding_model": embed_model,
+            "chunk_count": chunk_count,
+            "vector_count": int(db.index.ntotal),
+            "dimension": int(db.index.d),
+            "build_time": datetime.now().isoformat(timespec="seconds"),
+            "checksum": file_checksum([staging / name for name in INDEX_FILES]),
+        }
+        manifest.update(extra or {})
+        with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(staging, self.versions_dir / version)
+        self._set_current(version)
+        self.prune()
+        return version
+
+    def _set_current(self, version: str):
+        tmp = self.root / f".{POINTER_FILE}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.root / POINTER_FILE)
+
+    def rollback(self, version: str):
+        """Point CURRENT at an older version."""
+        if version not in self.list_versions():
+            raise IndexManifestError(f"Unknown index version: {version}")
+        self._set_current(version)
+
+    def prune(self, keep: int = KEEP_VERSIONS):
+        """Delete all but the newest `keep` versions (never the current one)."""
+        current = self.current_version()
+        for version in self.list_versions()[:-keep] if keep > 0 else []:
+            if version != current:
+                shutil.rmtree(self.versions_dir / version, ignore_errors=True)
@@ -2,26 +2,40 @@
 Improved ingest.py
 - Adds metadata (source filename, page)
 - Better chunking for aviation procedures
+  (structure-aware by default, FLIGHTLENS_CHUNKER=recursive for the old splitter)
 - Cleaner JSONL structure for RAG
+- Extracts the emergency procedure index for fast checklist lookup
 """
 
-import os, json
-from pathlib import Path
-from langchain.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import os
+
+from src.data.chunker import structured_split
+from src.utils import instrumentation as inst
+from src.utils.files import chunk_store_path, write_chunk_store, write_jsonl
 
 RAW_PATH = "data/raw"
 OUT_FILE = "data/processed/chunks.jsonl"
+CHUNK_STRATEGY = os.getenv("FLIGHTLENS_CHUNKER", "structured")
+CHUNK_SIZE = int(os.getenv("FLIGHTLENS_CHUNK_SIZE", "700"))
+CHUNK_OVERLAP = int(os.getenv("FLIGHTLENS_CHUNK_OVERLAP", "150"))
+
+# Optional metadata written by the structure-aware chunker
+EXTRA_METADATA = ("section", "block_type", "chunk_index", "chunk_count")
 
 
 def load_pdfs():
     """Load all PDFs with metadata (source + page)."""
+    from langchain.document_loaders import PyPDFLoader
+
     docs = []
     for file in os.listdir(RAW_PATH):
         if file.lower().endswith(".pdf"):
             path = os.path.join(RAW_PATH, file)
-            loader = PyPDFLoader(path)
-            loaded_docs = loader.load()
+            with inst.span("ingest.parse_pdf", file=file) as span:
+                loader = PyPDFLoader(path)
+                loaded_docs = loader.load()
+                span.set(pages=len(loaded_docs))
+            inst.inc("ingest_pages_total", len(loaded_docs))
 
             # Add source metadata
             for d in loaded_docs:
@@ -31,14 +45,33 @@ def load_pdfs():
     return docs
 
 
-def split_docs(docs):
+def split_docs(docs, strategy: str = None, chunk_size: int = None, chunk_overlap: int = None):
     """
     Enhanced chunking for aviation documents.
-    Uses structured separators to preserve checklists & procedures.
+
+    strategy="structured" (default) detects headings, checklists and numbered
+    steps and keeps procedures intact (see chunker.py); strategy="recursive"
+    uses fixed-size windows with structured separators.
+
+    chunk_size / chunk_overlap default to FLIGHTLENS_CHUNK_SIZE / _OVERLAP;
+    the structured chunker uses chunk_size only when given explicitly.
     """
+    strategy = strategy or CHUNK_STRATEGY
+    with inst.span("ingest.chunk", strategy=strategy, pages=len(docs)):
+        chunks = _split(docs, strategy, chunk_size, chunk_overlap)
+    inst.inc("ingest_chunks_total", len(chunks), strategy=strategy)
+    return chunks
+
+
+def _split(docs, strategy: str, chunk_size: int = None, chunk_overlap: int = None):
+    if strategy == "structured":
+        return structured_split(docs, max_chars=chunk_size) if chunk_size else structured_split(docs)
+
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=700,
-        chunk_overlap=150,
+        chunk_size=chunk_size or CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap,
         separators=[
             "\nCHECKLIST",
             "\nPROCEDURE",
@@ -53,20 +86,25 @@ def split_docs(docs):
 
 
 def save_chunks(chunks):
-    """Save as JSONL for embedding."""
-    Path(os.path.dirname(OUT_FILE)).mkdir(parents=True, exist_ok=True)
-
-    with open(OUT_FILE, "w", encoding="utf-8") as f:
-        for ch in chunks:
-            item = {
-                "text": ch.page_content,
-                "metadata": {
-                    "source": ch.metadata.get("source"),
-                    "page": ch.metadata.get("page")
-                }
+    """Save as JSONL for embedding, plus the binary chunk store (chunks.bin) the loaders prefer."""
+    items = []
+    for ch in chunks:
+        item = {
+            "text": ch.page_content,
+            "metadata": {
+                "source": ch.metadata.get("source"),
+                "page": ch.metadata.get("page")
             }
-            json.dump(item, f)
-            f.write("\n")
+        }
+        for key in EXTRA_METADATA:
+            if key in ch.metadata:
+                item["metadata"][key] = ch.metadata[key]
+        items.append(item)
+
+    with inst.span("ingest.save_chunks", chunks=len(items)):
+        write_jsonl(OUT_FILE, items)
+        # Written after the JSONL so the store is never older than it
+        write_chunk_store(chunk_store_path(OUT_FILE), items)
 
 
 if __name__ == "__main__":
@@ -75,3 +113,10 @@ if __name__ == "__main__":
     save_chunks(chunks)
 
     print(f"Saved {len(chunks)} chunks → {OUT_FILE}")
+
+    from src.rag.procedures import ProcedureIndex, PROCEDURE_FILE
+
+    procedures = ProcedureIndex.from_documents(docs)
+    procedures.save()
+    print(f"Saved {len(procedures)} procedures → {PROCEDURE_FILE}")
+    inst.dump_if_enabled("ingest")
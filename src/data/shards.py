@@ -0,0 +1,199 @@
+"""
+shards.py - Per-manual FAISS shards
+- One FAISS index per source document (or document group)
+- registry.json records each shard's sources, chunk count and checksum,
+  plus the embedding model and its fingerprint (checked before loading)
+- Rebuilds only shards whose chunks changed; drops shards whose manuals are gone
+- Each build is written to a new directory and swapped in by rewriting the
+  registry, so a loader always finds a complete shard; the replaced
+  directories are deleted on the following build
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from src.data.index_store import IndexManifestError
+from src.utils import instrumentation as inst
+
+load_dotenv()
+
+SHARD_DIR = os.getenv("FAISS_SHARD_PATH", "models/faiss_shards")
+REGISTRY_FILE = "registry.json"
+
+
+def shard_name(source: Optional[str]) -> str:
+    """Default grouping: one shard per source document, named after the file stem."""
+    stem = Path(source or "unknown").stem.lower()
+    return re.sub(r"[^a-z0-9_-]+", "_", stem) or "unknown"
+
+
+def group_chunks(chunks: List[Dict], group_by: Callable[[Optional[str]], str] = shard_name) -> Dict[str, List[Dict]]:
+    groups: Dict[str, List[Dict]] = {}
+    for ch in chunks:
+        groups.setdefault(group_by(ch["metadata"].get("source")), []).append(ch)
+    return groups
+
+
+def checksum(chunks: List[Dict]) -> str:
+    """Content hash of a shard's chunks (text + metadata, in order)."""
+    h = hashlib.sha256()
+    for ch in chunks:
+        h.update(ch["text"].encode("utf-8"))
+        h.update(json.dumps(ch["metadata"], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_registry(shard_dir: str = SHARD_DIR) -> Dict:
+    path = Path(shard_dir) / REGISTRY_FILE
+    if not path.exists():
+        return {"shards": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_registry(registry: Dict, shard_dir: str = SHARD_DIR):
+    path = Path(shard_dir) / REGISTRY_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp, path)
+
+
+def check_registry(embed_model: str, fingerprint: Dict = None, shard_dir: str = SHARD_DIR) -> Dict:
+    """
+    Refuse shards built with a different embedding model than the query encoder
+
+    Args:
+        embed_model: Query-time embedding model name
+        fingerprint: Query encoder fingerprint (see model_registry.embedding_fingerprint)
+
+    Returns:
+        The registry
+    """
+    registry = load_registry(shard_dir)
+    built_with = registry.get("embedding_model")
+    if built_with is not None and built_with != embed_model:
+        raise IndexManifestError(
+            f"Shards in {shard_dir} were built with '{built_with}' but the query encoder "
+            f"is '{embed_model}'. Rebuild with `flightlens index --sharded --force`."
+        )
+    if fingerprint and registry.get("embedding"):
+        from src.utils.model_registry import ModelRegistryError, check_fingerprint
+
+        try:
+            check_fingerprint(registry["embedding"], fingerprint)
+        except ModelRegistryError as e:
+            raise IndexManifestError(f"Shards in {shard_dir}: {e}") from e
+    return registry
+
+
+def build_shards(chunks: List[Dict], embeddings, embed_model: str,
+                 shard_dir: str = SHARD_DIR, force: bool = False,
+                 group_by: Callable[[Optional[str]], str] = shard_name,
+                 fingerprint: Dict = None) -> Dict:
+    """
+    Build or update per-source FAISS shards
+
+    Args:
+        chunks: Chunk dicts as stored in chunks.jsonl
+        embeddings: LangChain embeddings object
+        embed_model: Embedding model name (recorded in the registry)
+        shard_dir: Root directory for shards + registry.json
+        force: Rebuild every shard even if unchanged
+        group_by: Maps a source filename to its shard name
+        fingerprint: Embedding model fingerprint (recorded in the registry)
+
+    Returns:
+        The updated registry
+    """
+    from langchain_community.vectorstores import FAISS
+
+    Path(shard_dir).mkdir(parents=True, exist_ok=True)
+    try:
+        registry = check_registry(embed_model, fingerprint, shard_dir)
+    except IndexManifestError as e:
+        print(f"{e}; rebuilding all shards")
+        force = True
+        registry = {"shards": {}}
+
+    shards = registry.setdefault("shards", {})
+    groups = group_chunks(chunks, group_by)
+    retired = registry.get("retired", [])
+    replaced = []
+
+    for name, group in sorted(groups.items()):
+        digest = checksum(group)
+        entry = shards.get(name)
+        path = Path(shard_dir) / entry["path"] if entry else None
+
+        unchanged = not force and entry and entry["checksum"] == digest and path.exists()
+        inst.cache_result("shard_build", bool(unchanged))
+        if unchanged:
+            print(f"  {name}: unchanged ({len(group)} chunks)")
+            continue
+
+        print(f"  {name}: building ({len(group)} chunks)...")
+        with inst.span("index.build_shard", shard=name, chunks=len(group)):
+            db = FAISS.from_texts(
+                texts=[c["text"] for c in group],
+                embedding=embeddings,
+                metadatas=[c["metadata"] for c in group],
+            )
+        built_at = datetime.now()
+        dirname = f"{name}@{built_at.strftime('%Y%m%d_%H%M%S_%f')}"
+        tmp = Path(shard_dir) / f".{dirname}.building"
+        shutil.rmtree(tmp, ignore_errors=True)
+        db.save_local(str(tmp))
+        os.replace(tmp, Path(shard_dir) / dirname)
+        if entry:
+            replaced.append(entry["path"])
+
+        shards[name] = {
+            "path": dirname,
+            "sources": sorted({c["metadata"].get("source") or "" for c in group}),
+            "chunks": len(group),
+            "checksum": digest,
+            "built_at": built_at.isoformat(timespec="seconds"),
+        }
+
+    for name in sorted(set(shards) - set(groups)):
+        print(f"  {name}: source removed, dropping shard")
+        replaced.append(shards.pop(name)["path"])
+
+    # Old directories stay until the next build, for loaders that read the previous registry
+    registry["retired"] = replaced
+    registry["embedding_model"] = embed_model
+    if fingerprint:
+        registry["embedding"] = fingerprint
+    save_registry(registry, shard_dir)
+    for path in retired:
+        shutil.rmtree(Path(shard_dir) / path, ignore_errors=True)
+    return registry
+
+
+if __name__ == "__main__":
+    import sys
+
+    from src.data.embed_faiss import load_chunks
+    from src.utils.model_registry import EMBED_MODEL, embedding_fingerprint, make_embeddings
+
+    data = load_chunks()
+    print(f"Loaded {len(data)} chunks.")
+    print(f"Using embedding model: {EMBED_MODEL}")
+
+    registry = build_shards(
+        data,
+        make_embeddings(EMBED_MODEL),
+        EMBED_MODEL,
+        force="--force" in sys.argv,
+        fingerprint=embedding_fingerprint(EMBED_MODEL),
+    )
+    print(f"{len(registry['shards'])} shards → {SHARD_DIR}")
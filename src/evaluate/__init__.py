@@ -5,14 +5,19 @@ Provides:
 - Question dataset
 - RAG evaluation runner
 - Metrics helpers
+
+Exports are resolved on first access (see src/utils/lazy.py), so the
+metrics and retrieval evaluation import without the RAG chain.
 """
 
-from .test_dataset import ALL_QUESTIONS
-from .eval import run_full_eval
-from .metrics import summarize_results
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "ALL_QUESTIONS": "src.evaluate.test_dataset",
+    "run_full_eval": "src.evaluate.eval",
+    "summarize_results": "src.evaluate.metrics",
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    "ALL_QUESTIONS",
-    "run_full_eval",
-    "summarize_results",
-]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
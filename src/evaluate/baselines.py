@@ -4,15 +4,16 @@ Baseline Comparisons for FlightLens
 Provides a simple BM25 retrieval baseline using the chunked documents.
 """
 
-import json
 import os
 from pathlib import Path
 from typing import List, Dict
 
+import numpy as np
 from rank_bm25 import BM25Okapi
 from dotenv import load_dotenv
 
-from evaluate.metrics import evaluate_pair
+from evaluate.metrics import evaluate_batch
+from src.utils.files import chunk_store_path, read_chunk_texts
 
 load_dotenv()
 
@@ -30,15 +31,21 @@ class BM25RetrievalBaseline:
         self.bm25 = None
 
     def load_corpus(self):
-        if not self.chunk_file.exists():
+        if not self.chunk_file.exists() and not chunk_store_path(self.chunk_file).exists():
             raise FileNotFoundError(f"Chunk file not found: {self.chunk_file}")
-        with open(self.chunk_file, "r", encoding="utf-8") as f:
-            for line in f:
-                obj = json.loads(line)
-                self.texts.append(obj["text"])
+        self.texts = read_chunk_texts(self.chunk_file)
         self.tokenized_texts = [t.lower().split() for t in self.texts]
         self.bm25 = BM25Okapi(self.tokenized_texts)
 
+    def retrieve(self, question: str, k: int = 3) -> np.ndarray:
+        """Positions (in chunks.jsonl order) of the top-k chunks, best first."""
+        if self.bm25 is None:
+            self.load_corpus()
+        scores = self.bm25.get_scores(question.lower().split())
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
     def answer_question(self, question: str, k: int = 3) -> str:
         if self.bm25 is None:
             self.load_corpus()
@@ -56,23 +63,19 @@ def run_bm25_baseline(questions: List[Dict]) -> List[Dict]:
     bm = BM25RetrievalBaseline()
     bm.load_corpus()
 
-    results = []
-    for q in questions:
-        qid = q["id"]
-        question = q["question"]
-        gt = q["ground_truth"]
-
-        answer = bm.answer_question(question)
-        m = evaluate_pair(answer, gt)
+    answers = [bm.answer_question(q["question"]) for q in questions]
+    scores = evaluate_batch(answers, [q["ground_truth"] for q in questions])
 
+    results = []
+    for q, answer, m in zip(questions, answers, scores):
         results.append({
-            "id": qid,
-            "question": question,
-            "ground_truth": gt,
+            "id": q["id"],
+            "question": q["question"],
+            "ground_truth": q["ground_truth"],
             "answer": answer,
-            "f1": m["f1"],
-            "exact_match": m["exact_match"],
-            "length_ratio": m["length_ratio"],
+            "category": q.get("category", "unknown"),
+            "difficulty": q.get("difficulty", "unknown"),
+            **m,
         })
     return results
 
@@ -0,0 +1,115 @@
+"""
+Chunking comparison report for FlightLens
+
+Compares the structure-aware chunker against the RecursiveCharacterTextSplitter
+baseline on the raw manuals:
+- chunk count and total characters embedded (embedding cost)
+- duplicated characters from overlap
+- procedures kept intact in a single chunk
+- BM25 retrieval recall@k over ALL_QUESTIONS
+"""
+
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+# ---------------------------------------------------------
+# FIX PYTHONPATH
+# ---------------------------------------------------------
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from rank_bm25 import BM25Okapi
+
+from src.data.ingest import load_pdfs, split_docs
+from src.evaluate.metrics import tokenize
+from src.evaluate.test_dataset import ALL_QUESTIONS
+from src.rag.procedures import ProcedureIndex
+
+RECALL_KS = (1, 3, 5)
+ANSWER_COVERAGE = 0.5   # share of ground-truth tokens a chunk must contain to count as a hit
+
+
+def _answers(chunk_tokens: set, gt_tokens: set) -> bool:
+    if not gt_tokens:
+        return False
+    return len(chunk_tokens & gt_tokens) / len(gt_tokens) >= ANSWER_COVERAGE
+
+
+def retrieval_recall(texts: List[str], questions: List[Dict]) -> Dict[str, float]:
+    """BM25 recall@k: a question is a hit if any top-k chunk covers its ground truth."""
+    tokenized = [tokenize(t) for t in texts]
+    token_sets = [set(t) for t in tokenized]
+    bm25 = BM25Okapi(tokenized)
+
+    hits = {k: 0 for k in RECALL_KS}
+    for q in questions:
+        scores = bm25.get_scores(tokenize(q["question"]))
+        ranked = sorted(range(len(texts)), key=lambda i: -scores[i])[:max(RECALL_KS)]
+        gt = set(tokenize(q["ground_truth"]))
+        first_hit = next((r for r, i in enumerate(ranked) if _answers(token_sets[i], gt)), None)
+        for k in RECALL_KS:
+            if first_hit is not None and first_hit < k:
+                hits[k] += 1
+
+    n = max(len(questions), 1)
+    return {f"recall@{k}": hits[k] / n for k in RECALL_KS}
+
+
+def chunking_stats(chunks, page_chars: int, procedures) -> Dict[str, float]:
+    texts = [c.page_content for c in chunks]
+    total = sum(len(t) for t in texts)
+    intact = sum(1 for p in procedures if any(p.text in t for t in texts))
+
+    return {
+        "chunks": len(texts),
+        "total_chars": total,
+        "avg_chunk_chars": total / max(len(texts), 1),
+        "duplicated_chars": max(total - page_chars, 0),
+        "procedures_intact": intact,
+        "procedures_total": len(procedures),
+    }
+
+
+def compare_chunkers(docs) -> Dict[str, Dict]:
+    page_chars = sum(len(d.page_content.strip()) for d in docs)
+    procedures = ProcedureIndex.from_documents(docs).procedures
+
+    report = {"pages": len(docs), "page_chars": page_chars}
+    for strategy in ("recursive", "structured"):
+        print(f"Chunking with {strategy} splitter...")
+        chunks = split_docs(docs, strategy=strategy)
+        stats = chunking_stats(chunks, page_chars, procedures)
+        stats.update(retrieval_recall([c.page_content for c in chunks], ALL_QUESTIONS))
+        report[strategy] = stats
+    return report
+
+
+def print_report(report: Dict):
+    keys = [k for k in report["structured"]]
+    print("\n==========================================")
+    print(" Chunking Comparison")
+    print("==========================================")
+    print(f"Pages: {report['pages']}   Page chars: {report['page_chars']}\n")
+    print(f"{'metric':<20}{'recursive':>14}{'structured':>14}")
+    for k in keys:
+        a, b = report["recursive"][k], report["structured"][k]
+        fmt = "{:>14.3f}" if isinstance(a, float) else "{:>14}"
+        print(f"{k:<20}" + fmt.format(a) + fmt.format(b))
+
+
+if __name__ == "__main__":
+    output_dir = project_root / "evaluation" / "results"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    report = compare_chunkers(load_pdfs())
+    print_report(report)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out = output_dir / f"chunking_report_{timestamp}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved → {out}")
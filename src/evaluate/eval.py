@@ -1,8 +1,9 @@
 """
 Core evaluation logic for FlightLens RAG.
 
-- Loads RAG answer function
-- Runs over ALL_QUESTIONS
+- Loads the RAG engine once
+- Runs over ALL_QUESTIONS through the query router
+  (METAR / telemetry injected for routes that need them)
 - Computes metrics per question
 """
 
@@ -15,7 +16,9 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from src.rag.chain import answer_question
+from src.rag.chain import RAGEngine
+from src.rag.router import QueryRouter, answer_routed
+from src.utils.context_simconnect import MSFSContext
 from evaluate.test_dataset import ALL_QUESTIONS
 from evaluate.metrics import evaluate_pair
 
@@ -27,12 +30,16 @@ def run_full_eval() -> List[Dict]:
     Returns:
         List of result dicts, each including:
         - id, question, ground_truth
-        - answer
+        - answer, route
         - category, difficulty, requires_context
         - f1, exact_match, length_ratio
     """
     results: List[Dict] = []
 
+    engine = RAGEngine()
+    router = QueryRouter(engine.embeddings)
+    sim = MSFSContext()
+
     for q in ALL_QUESTIONS:
         qid = q["id"]
         question = q["question"]
@@ -41,11 +48,11 @@ def run_full_eval() -> List[Dict]:
         difficulty = q.get("difficulty", "unknown")
         requires_context = q.get("requires_context", [])
 
-        # For now, we do NOT inject METAR/telemetry, but we keep the annotation.
         try:
-            answer = answer_question(question)
+            routed = answer_routed(question, engine=engine, router=router, sim=sim)
+            answer, route = routed["answer"], routed["route"]
         except Exception as e:
-            answer = f"[ERROR during answer generation: {e}]"
+            answer, route = f"[ERROR during answer generation: {e}]", "error"
 
         m = evaluate_pair(answer, gt)
 
@@ -54,6 +61,7 @@ def run_full_eval() -> List[Dict]:
             "question": question,
             "ground_truth": gt,
             "answer": answer,
+            "route": route,
             "category": category,
             "difficulty": difficulty,
             "requires_context": ",".join(requires_context),
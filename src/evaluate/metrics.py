@@ -6,77 +6,218 @@ Provides:
 - token-level F1
 - exact match
 - length ratio
+- ROUGE-L and embedding cosine similarity
+- batch scoring and per-category / difficulty breakdowns
 - summary helpers
+
+Each distinct string is normalized and tokenized once (cached), so scoring
+many configurations against the same references does not redo that work.
 """
 
 import re
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+METRIC_KEYS = ("f1", "exact_match", "length_ratio", "rouge_l", "semantic_sim")
+BREAKDOWN_KEYS = ("category", "difficulty")
+
+
+class Analyzed(NamedTuple):
+    """Normalized form of one string, computed once."""
+    normalized: str
+    tokens: Tuple[str, ...]
+    token_set: FrozenSet[str]
+
+
+@lru_cache(maxsize=65536)
+def _analyze(text: str) -> Analyzed:
+    normalized = _SPACES.sub(" ", _PUNCT.sub(" ", text.lower())).strip()
+    tokens = tuple(normalized.split())
+    return Analyzed(normalized, tokens, frozenset(tokens))
+
+
+def analyze(text: Optional[str]) -> Analyzed:
+    return _analyze(text or "")
 
 
 def normalize(text: str) -> str:
     """Lowercase, remove extra spaces and simple punctuation."""
-    if text is None:
-        return ""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s]", " ", text)  # remove punctuation
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return analyze(text).normalized
 
 
 def tokenize(text: str) -> List[str]:
-    return normalize(text).split()
+    return list(analyze(text).tokens)
 
 
-def token_f1(pred: str, ref: str) -> float:
-    """Simple F1 over token overlap."""
-    pred_tokens = tokenize(pred)
-    ref_tokens = tokenize(ref)
-
-    if not pred_tokens or not ref_tokens:
+# -------------------------------------------------------------------
+# Pairwise metrics (on analyzed strings)
+# -------------------------------------------------------------------
+def _f1(pred: Analyzed, ref: Analyzed) -> float:
+    if not pred.token_set or not ref.token_set:
         return 0.0
-
-    pred_set = set(pred_tokens)
-    ref_set = set(ref_tokens)
-    overlap = pred_set.intersection(ref_set)
-
+    overlap = len(pred.token_set & ref.token_set)
     if not overlap:
         return 0.0
+    precision = overlap / len(pred.token_set)
+    recall = overlap / len(ref.token_set)
+    return 2 * precision * recall / (precision + recall)
 
-    precision = len(overlap) / len(pred_set)
-    recall = len(overlap) / len(ref_set)
-    if precision + recall == 0:
+
+def _length_ratio(pred: Analyzed, ref: Analyzed) -> float:
+    if not ref.tokens:
         return 0.0
+    return len(pred.tokens) / len(ref.tokens)
+
+
+def _lcs_length(a: Sequence[str], b: Sequence[str]) -> int:
+    """Longest common subsequence length, O(len(a) * len(b)) time, O(len(b)) memory."""
+    if len(a) < len(b):
+        a, b = b, a
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        curr = [0]
+        for j, y in enumerate(b, 1):
+            curr.append(prev[j - 1] + 1 if x == y else max(prev[j], curr[j - 1]))
+        prev = curr
+    return prev[-1]
 
+
+def _rouge_l(pred: Analyzed, ref: Analyzed) -> float:
+    """ROUGE-L F-measure over normalized tokens (as rouge-score's rougeL without stemming)."""
+    if not pred.tokens or not ref.tokens:
+        return 0.0
+    # Tokens that never occur in the other string cannot be part of the LCS
+    a = [t for t in pred.tokens if t in ref.token_set]
+    b = [t for t in ref.tokens if t in pred.token_set]
+    lcs = _lcs_length(a, b) if a and b else 0
+    if not lcs:
+        return 0.0
+    precision = lcs / len(pred.tokens)
+    recall = lcs / len(ref.tokens)
     return 2 * precision * recall / (precision + recall)
 
 
+def token_f1(pred: str, ref: str) -> float:
+    """Simple F1 over token overlap."""
+    return _f1(analyze(pred), analyze(ref))
+
+
 def exact_match(pred: str, ref: str) -> bool:
     """Strict normalized string equality."""
-    return normalize(pred) == normalize(ref)
+    return analyze(pred).normalized == analyze(ref).normalized
 
 
 def length_ratio(pred: str, ref: str) -> float:
     """Ratio of predicted length to reference length."""
-    pred_len = len(tokenize(pred))
-    ref_len = len(tokenize(ref))
-    if ref_len == 0:
-        return 0.0
-    return pred_len / ref_len
+    return _length_ratio(analyze(pred), analyze(ref))
+
+
+def rouge_l(pred: str, ref: str) -> float:
+    return _rouge_l(analyze(pred), analyze(ref))
 
 
 def evaluate_pair(pred: str, ref: str) -> Dict[str, float]:
     """Compute all metrics for a single prediction-reference pair."""
+    p, r = analyze(pred), analyze(ref)
     return {
-        "f1": token_f1(pred, ref),
-        "exact_match": 1.0 if exact_match(pred, ref) else 0.0,
-        "length_ratio": length_ratio(pred, ref),
+        "f1": _f1(p, r),
+        "exact_match": 1.0 if p.normalized == r.normalized else 0.0,
+        "length_ratio": _length_ratio(p, r),
     }
 
 
+# -------------------------------------------------------------------
+# Batch scoring
+# -------------------------------------------------------------------
+def semantic_similarity(preds: Sequence[str], refs: Sequence[str], embeddings) -> List[float]:
+    """
+    Cosine similarity of each prediction/reference pair
+
+    All distinct strings are embedded in one embed_documents call.
+    """
+    import numpy as np
+
+    unique = list(dict.fromkeys(list(preds) + list(refs)))
+    position = {text: i for i, text in enumerate(unique)}
+    vectors = np.asarray(embeddings.embed_documents(unique), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    p = vectors[[position[t] for t in preds]]
+    r = vectors[[position[t] for t in refs]]
+    return np.einsum("ij,ij->i", p, r).tolist()
+
+
+def evaluate_batch(preds: Sequence[str], refs: Sequence[str], rouge: bool = True,
+                   embeddings=None) -> List[Dict[str, float]]:
+    """
+    Metrics for whole result sets
+
+    Args:
+        preds, refs: Parallel lists of predictions and references
+        rouge: Also compute ROUGE-L
+        embeddings: LangChain embeddings object; adds "semantic_sim" when given
+    """
+    preds = [p or "" for p in preds]
+    refs = [r or "" for r in refs]
+    scores = []
+    for pred, ref in zip(preds, refs):
+        p, r = analyze(pred), analyze(ref)
+        m = {
+            "f1": _f1(p, r),
+            "exact_match": 1.0 if p.normalized == r.normalized else 0.0,
+            "length_ratio": _length_ratio(p, r),
+        }
+        if rouge:
+            m["rouge_l"] = _rouge_l(p, r)
+        scores.append(m)
+
+    if embeddings is not None and preds:
+        for m, sim in zip(scores, semantic_similarity(preds, refs, embeddings)):
+            m["semantic_sim"] = sim
+    return scores
+
+
+def score_records(records: List[Dict], rouge: bool = True, embeddings=None) -> List[Dict]:
+    """Add (or refresh) metric fields on result records in place, in one batch."""
+    scores = evaluate_batch([r.get("answer") for r in records], [r.get("ground_truth") for r in records],
+                            rouge=rouge, embeddings=embeddings)
+    for record, m in zip(records, scores):
+        record.update(m)
+    return records
+
+
+def breakdown(records: List[Dict], by: Sequence[str] = BREAKDOWN_KEYS) -> Dict[str, Dict]:
+    """
+    Mean metrics per group (pandas group-by)
+
+    Returns:
+        {group column: {group value: {metric: mean, ..., "n": count}}}
+    """
+    import pandas as pd
+
+    if not records:
+        return {}
+    df = pd.DataFrame(records)
+    metrics = [k for k in METRIC_KEYS if k in df.columns]
+    out = {}
+    for column in by:
+        if column not in df.columns:
+            continue
+        grouped = df.groupby(column)[metrics]
+        table = grouped.mean()
+        table["n"] = grouped.size()
+        out[column] = table.round(4).to_dict(orient="index")
+    return out
+
+
 def summarize_results(records: List[Dict]) -> Dict[str, float]:
     """
     Aggregate metrics across all records.
-    Expects each record to include keys: 'f1', 'exact_match', 'length_ratio'.
+    Expects each record to include keys: 'f1', 'exact_match', 'length_ratio'
+    (plus 'rouge_l' / 'semantic_sim' when batch-scored).
     """
     if not records:
         return {"f1": 0.0, "exact_match": 0.0, "length_ratio": 0.0}
@@ -85,8 +226,12 @@ def summarize_results(records: List[Dict]) -> Dict[str, float]:
         vals = [r.get(key, 0.0) for r in records]
         return sum(vals) / max(len(vals), 1)
 
-    return {
+    summary = {
         "f1": avg("f1"),
         "exact_match": avg("exact_match"),
         "length_ratio": avg("length_ratio"),
     }
+    for key in ("rouge_l", "semantic_sim"):
+        if any(key in r for r in records):
+            summary[key] = avg(key)
+    return summary
@@ -0,0 +1,273 @@
+"""
+Retrieval-only evaluation for FlightLens
+
+Scores retrievers against the gold labels in test_dataset.py without running
+the LLM, so retrieval tuning does not pay FLAN-T5 decode cost:
+- dense (FAISS index), BM25 (baselines.py) and hybrid (reciprocal rank fusion)
+- recall@k, hit@k, MRR and nDCG@k for several k from one ranking at max k
+- p50 / p95 / p99 per-query search latency
+
+Relevance is a (questions x chunks) boolean matrix built once; every metric
+is computed with NumPy over the (questions x k) hit matrix.
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------
+# FIX PYTHONPATH
+# ---------------------------------------------------------
+project_root = Path(__file__).resolve().parents[2]
+src_root = project_root / "src"
+for p in (project_root, src_root):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from src.evaluate.test_dataset import ALL_QUESTIONS
+from src.rag.filtering import CHUNK_FILE
+from src.utils.files import read_chunks
+
+DEFAULT_KS = (1, 3, 5, 10)
+RRF_K = 60   # reciprocal rank fusion constant
+
+
+# ---------------------------------------------------------
+# GOLD LABELS
+# ---------------------------------------------------------
+def load_corpus(chunk_file: str = CHUNK_FILE) -> List[Dict]:
+    return read_chunks(chunk_file)
+
+
+def relevance_matrix(questions: List[Dict], chunks: List[Dict]) -> np.ndarray:
+    """
+    Boolean (questions x chunks) matrix of gold chunks
+
+    A chunk is relevant to a question if it contains every gold term, or if
+    it lies on one of the question's gold pages.
+    """
+    texts = [c["text"].lower() for c in chunks]
+    pages = {}
+    for i, c in enumerate(chunks):
+        meta = c.get("metadata", {})
+        pages.setdefault((meta.get("source"), meta.get("page")), []).append(i)
+
+    rel = np.zeros((len(questions), len(chunks)), dtype=bool)
+    for qi, q in enumerate(questions):
+        gold = q.get("gold") or {}
+        terms = [t.lower() for t in gold.get("terms", [])]
+        if terms:
+            rel[qi] = [all(t in text for t in terms) for text in texts]
+        for p in gold.get("pages", []):
+            rel[qi, pages.get((p["source"], p["page"]), [])] = True
+    return rel
+
+
+# ---------------------------------------------------------
+# METRICS (vectorized)
+# ---------------------------------------------------------
+def hit_matrix(ranked: np.ndarray, relevance: np.ndarray) -> np.ndarray:
+    """(questions x k) booleans: is the chunk at each rank relevant? (-1 = no result)"""
+    rows = np.arange(ranked.shape[0])[:, None]
+    return np.where(ranked >= 0, relevance[rows, np.maximum(ranked, 0)], False)
+
+
+def retrieval_metrics(hits: np.ndarray, n_relevant: np.ndarray, ks: Sequence[int] = DEFAULT_KS) -> Dict[str, float]:
+    """
+    Mean retrieval metrics over questions that have at least one gold chunk
+
+    Args:
+        hits: (questions x max_k) boolean hit matrix, best rank first
+        n_relevant: Gold chunk count per question
+        ks: Cutoffs to report
+
+    recall@k is capped (relevant retrieved / min(relevant, k)) so questions
+    with many gold chunks can still reach 1.0.
+    """
+    labeled = n_relevant > 0
+    hits = hits[labeled]
+    n_rel = n_relevant[labeled]
+    if hits.shape[0] == 0:
+        return {"labeled_questions": 0}
+
+    max_k = hits.shape[1]
+    ranks = np.arange(1, max_k + 1)
+    discounts = 1.0 / np.log2(ranks + 1)
+    cum_hits = np.cumsum(hits, axis=1)
+    cum_dcg = np.cumsum(hits * discounts, axis=1)
+    ideal = np.cumsum(discounts)
+
+    first = np.where(hits.any(axis=1), hits.argmax(axis=1) + 1, 0)
+    out = {
+        "labeled_questions": int(hits.shape[0]),
+        "mrr": float(np.mean(np.where(first > 0, 1.0 / np.maximum(first, 1), 0.0))),
+    }
+    for k in ks:
+        kk = min(k, max_k)
+        capped = np.minimum(n_rel, kk)
+        out[f"recall@{k}"] = float(np.mean(cum_hits[:, kk - 1] / capped))
+        out[f"hit@{k}"] = float(np.mean(cum_hits[:, kk - 1] > 0))
+        out[f"ndcg@{k}"] = float(np.mean(cum_dcg[:, kk - 1] / ideal[capped - 1]))
+    return out
+
+
+def latency_stats(latencies: np.ndarray) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(latencies * 1000.0, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "mean_ms": float(latencies.mean() * 1000.0)}
+
+
+# ---------------------------------------------------------
+# RETRIEVERS
+# Each returns (ranked positions (questions x k), per-query seconds)
+# ---------------------------------------------------------
+def _pad(rows: List[np.ndarray], k: int) -> np.ndarray:
+    out = np.full((len(rows), k), -1, dtype=np.int64)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r[:k]
+    return out
+
+
+class BM25Retriever:
+    name = "bm25"
+
+    def __init__(self, chunk_file: str = CHUNK_FILE):
+        from src.evaluate.baselines import BM25RetrievalBaseline
+
+        self.bm = BM25RetrievalBaseline(Path(chunk_file))
+        self.bm.load_corpus()
+
+    def search(self, questions: List[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        rows, lat = [], np.zeros(len(questions))
+        for i, q in enumerate(questions):
+            start = time.perf_counter()
+            rows.append(self.bm.retrieve(q, k))
+            lat[i] = time.perf_counter() - start
+        return _pad(rows, k), lat
+
+
+class DenseRetriever:
+    """FAISS index search; FAISS ids are mapped back to chunks.jsonl positions by text."""
+    name = "dense"
+
+    def __init__(self, chunks: List[Dict], embeddings=None, db=None):
+        from src.rag.chain import load_embeddings, load_vectorstore
+
+        self.embeddings = embeddings or load_embeddings()
+        self.db = db or load_vectorstore(self.embeddings)
+
+        position = {}
+        for i, c in enumerate(chunks):
+            position.setdefault(c["text"], i)
+        store = self.db.docstore
+        self.to_position = np.array(
+            [position.get(store.search(self.db.index_to_docstore_id[i]).page_content, -1)
+             for i in range(self.db.index.ntotal)],
+            dtype=np.int64,
+        )
+        missing = int((self.to_position < 0).sum())
+        if missing:
+            print(f"⚠️  {missing} indexed chunks are not in {CHUNK_FILE}; rebuild the index?")
+
+    def search(self, questions: List[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        vectors = np.asarray(self.embeddings.embed_documents(questions), dtype=np.float32)
+        encode_each = (time.perf_counter() - start) / len(questions)
+
+        ids = np.full((len(questions), k), -1, dtype=np.int64)
+        lat = np.zeros(len(questions))
+        for i in range(len(questions)):
+            start = time.perf_counter()
+            _, found = self.db.index.search(vectors[i:i + 1], k)
+            lat[i] = time.perf_counter() - start + encode_each
+            ids[i] = found[0]
+        return np.where(ids >= 0, self.to_position[np.maximum(ids, 0)], -1), lat
+
+
+class HybridRetriever:
+    """Reciprocal rank fusion of dense and BM25 rankings."""
+    name = "hybrid"
+
+    def __init__(self, dense: DenseRetriever, bm25: BM25Retriever, depth: int = 50, rrf_k: int = RRF_K):
+        self.dense = dense
+        self.bm25 = bm25
+        self.depth = depth
+        self.rrf_k = rrf_k
+
+    def search(self, questions: List[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        depth = max(self.depth, k)
+        d_ranked, d_lat = self.dense.search(questions, depth)
+        b_ranked, b_lat = self.bm25.search(questions, depth)
+
+        rows, lat = [], d_lat + b_lat
+        weights = 1.0 / (self.rrf_k + np.arange(1, depth + 1))
+        for i in range(len(questions)):
+            start = time.perf_counter()
+            ids = np.concatenate([d_ranked[i], b_ranked[i]])
+            w = np.concatenate([weights, weights])[ids >= 0]
+            ids = ids[ids >= 0]
+            uniq, inverse = np.unique(ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=w)
+            rows.append(uniq[np.argsort(-scores, kind="stable")])
+            lat[i] += time.perf_counter() - start
+        return _pad(rows, k), lat
+
+
+# ---------------------------------------------------------
+# RUN
+# ---------------------------------------------------------
+def evaluate_retrievers(retrievers, questions: List[Dict], relevance: np.ndarray,
+                        ks: Sequence[int] = DEFAULT_KS) -> Dict[str, Dict]:
+    texts = [q["question"] for q in questions]
+    n_relevant = relevance.sum(axis=1)
+    max_k = max(ks)
+
+    report = {}
+    for r in retrievers:
+        ranked, lat = r.search(texts, max_k)
+        metrics = retrieval_metrics(hit_matrix(ranked, relevance), n_relevant, ks)
+        metrics.update(latency_stats(lat))
+        report[r.name] = metrics
+    return report
+
+
+def print_report(report: Dict[str, Dict], ks: Sequence[int]):
+    cols = ["mrr"] + [f"{m}@{k}" for m in ("recall", "ndcg") for k in ks] + ["p50_ms", "p95_ms", "p99_ms"]
+    print("\n" + "retriever".ljust(10) + "".join(c.rjust(11) for c in cols))
+    for name, m in report.items():
+        print(name.ljust(10) + "".join(f"{m.get(c, 0.0):11.3f}" for c in cols))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlightLens retrieval-only evaluation")
+    parser.add_argument("--k", type=int, nargs="+", default=list(DEFAULT_KS))
+    parser.add_argument("--retrievers", nargs="+", default=["bm25", "dense", "hybrid"],
+                        choices=["bm25", "dense", "hybrid"])
+    args = parser.parse_args()
+
+    chunks = load_corpus()
+    relevance = relevance_matrix(ALL_QUESTIONS, chunks)
+    print(f"{len(chunks)} chunks, {int((relevance.sum(axis=1) > 0).sum())}/{len(ALL_QUESTIONS)} questions with gold chunks")
+
+    bm25 = BM25Retriever() if {"bm25", "hybrid"} & set(args.retrievers) else None
+    dense = DenseRetriever(chunks) if {"dense", "hybrid"} & set(args.retrievers) else None
+    available = {"bm25": bm25, "dense": dense}
+    if "hybrid" in args.retrievers:
+        available["hybrid"] = HybridRetriever(dense, bm25)
+
+    report = evaluate_retrievers([available[n] for n in args.retrievers], ALL_QUESTIONS, relevance, args.k)
+    print_report(report, args.k)
+
+    output_dir = project_root / "evaluation" / "results"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    out = output_dir / f"retrieval_eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, "w") as f:
+        json.dump({"chunks": len(chunks), "ks": args.k, "retrievers": report}, f, indent=2)
+    print(f"\nSaved → {out}")
@@ -22,51 +22,41 @@ sys.path.insert(0, str(src_root))
 # IMPORTS (MATCH YOUR REAL FILES)
 # ---------------------------------------------------------
 from src.evaluate.test_dataset import ALL_QUESTIONS
-from src.evaluate.metrics import summarize_results, evaluate_pair
+from src.evaluate.metrics import breakdown, score_records, summarize_results
 from src.evaluate.baselines import run_bm25_baseline
-from src.rag.chain import answer_question
+from src.evaluate.runner import CheckpointMismatch, EvalRunner, engine_answer_fns, engine_config
+from src.utils import instrumentation as inst
 
 
 # ---------------------------------------------------------
 # RAG EVALUATION
 # ---------------------------------------------------------
-def run_rag_eval():
-    results = []
+CHECKPOINT_FILE = project_root / "evaluation" / "results" / "rag_checkpoint.jsonl"
 
+
+def run_rag_eval(workers=4, batch_size=1, checkpoint=CHECKPOINT_FILE, resume=True):
+    """
+    Evaluate the RAG system on ALL_QUESTIONS
+
+    One warm engine is shared by all workers; each result is appended to
+    `checkpoint` as it completes, so an interrupted run resumes where it
+    stopped (only under the same index version and models).
+    """
     print("\n==========================================")
     print(" Evaluating FlightLens RAG System")
     print("==========================================\n")
-    print(f"Total questions: {len(ALL_QUESTIONS)}\n")
-
-    for i, item in enumerate(ALL_QUESTIONS, 1):
-
-        qid = item["id"]
-        question = item["question"]
-        ground_truth = item["ground_truth"]
-
-        print(f"[{i}/{len(ALL_QUESTIONS)}] {qid}: {question[:70]}")
-
-        try:
-            answer = answer_question(question)
-        except Exception as e:
-            answer = f"[ERROR] {e}"
+    print(f"Total questions: {len(ALL_QUESTIONS)}  (workers={workers}, batch_size={batch_size})\n")
 
-        m = evaluate_pair(answer, ground_truth)
-
-        results.append({
-            "id": qid,
-            "question": question,
-            "ground_truth": ground_truth,
-            "answer": answer,
-            "category": item["category"],
-            "difficulty": item["difficulty"],
-            "requires_context": ",".join(item.get("requires_context", [])),
-            "f1": m["f1"],
-            "exact_match": m["exact_match"],
-            "length_ratio": m["length_ratio"],
-        })
-
-    return results
+    answer_fn, batch_answer_fn = engine_answer_fns()
+    runner = EvalRunner(
+        checkpoint,
+        answer_fn=answer_fn,
+        batch_answer_fn=batch_answer_fn,
+        workers=workers,
+        batch_size=batch_size,
+        config=engine_config(),
+    )
+    return runner.run(ALL_QUESTIONS, resume=resume)
 
 
 # ---------------------------------------------------------
@@ -95,6 +85,8 @@ def save_results(rag_results, bm25_results, output_dir):
     summary = {
         "rag": rag_summary,
         "bm25": bm25_summary,
+        "rag_breakdown": breakdown(rag_results),
+        "bm25_breakdown": breakdown(bm25_results),
         "total_questions": len(rag_results)
     }
 
@@ -111,12 +103,32 @@ def save_results(rag_results, bm25_results, output_dir):
 # MAIN
 # ---------------------------------------------------------
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlightLens evaluation")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel workers sharing one engine")
+    parser.add_argument("--batch-size", type=int, default=1, help="Questions per batched embed/LLM call")
+    parser.add_argument("--fresh", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
     output_dir = project_root / "evaluation" / "results"
 
     print("\nRunning RAG evaluation...")
-    rag_results = run_rag_eval()
+    try:
+        rag_results = run_rag_eval(workers=args.workers, batch_size=args.batch_size, resume=not args.fresh)
+    except CheckpointMismatch as e:
+        print(f"❌ {e} (use --fresh)")
+        sys.exit(1)
 
     print("\nRunning BM25 baseline evaluation...")
     bm25_results = run_bm25_baseline(ALL_QUESTIONS)
 
+    # ROUGE-L + semantic similarity for both systems, reusing the warm embedding model
+    from src.rag.service import get_service
+
+    embeddings = get_service().engine.embeddings
+    score_records(rag_results, embeddings=embeddings)
+    score_records(bm25_results, embeddings=embeddings)
+
     save_results(rag_results, bm25_results, output_dir)
+    inst.dump_if_enabled("run_eval")
@@ -0,0 +1,239 @@
+"""
+Parallel, resumable evaluation engine for FlightLens
+
+- One warm engine shared by every question
+- Questions answered by a worker pool, or in batches (one batched
+  embedding + LLM call per batch)
+- Each result appended to a JSONL checkpoint as soon as it completes
+- Re-running skips questions already in the checkpoint; failed questions
+  are checkpointed with "error": true and retried
+- The checkpoint's first line records the engine configuration (index
+  version, models, top-k); resuming under a different one is refused
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.evaluate.metrics import evaluate_pair
+from src.utils import instrumentation as inst
+
+AnswerFn = Callable[[str], str]
+BatchAnswerFn = Callable[[List[str]], List[str]]
+
+
+class CheckpointMismatch(RuntimeError):
+    """The checkpoint was written for a different index or model configuration."""
+
+
+def load_checkpoint(path: Path) -> Dict[str, Dict]:
+    """
+    Completed records by question id (a torn last line from a crash is
+    ignored; failed questions are left out so they run again)
+    """
+    done: Dict[str, Dict] = {}
+    if not path.exists():
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "id" not in record:
+                continue  # config header
+            if record.get("error"):
+                done.pop(record["id"], None)
+            else:
+                done[record["id"]] = record
+    return done
+
+
+def read_checkpoint_config(path: Path) -> Optional[Dict]:
+    """Engine configuration from the checkpoint header (None if there is none)."""
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError:
+            return None
+    return header.get("config") if "id" not in header else None
+
+
+def truncate_torn_tail(path: Path):
+    """Drop a partially written last line so new appends start on a fresh line."""
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def make_record(item: Dict, answer: str, seconds: float, error: Exception = None) -> Dict:
+    if error is not None:
+        answer = f"[ERROR] {error}"
+    m = evaluate_pair(answer, item["ground_truth"])
+    record = {
+        "id": item["id"],
+        "question": item["question"],
+        "ground_truth": item["ground_truth"],
+        "answer": answer,
+        "category": item.get("category", "unknown"),
+        "difficulty": item.get("difficulty", "unknown"),
+        "requires_context": ",".join(item.get("requires_context", [])),
+        "f1": m["f1"],
+        "exact_match": m["exact_match"],
+        "length_ratio": m["length_ratio"],
+        "latency_s": round(seconds, 3),
+    }
+    if error is not None:
+        record["error"] = True
+    return record
+
+
+class EvalRunner:
+    """
+    Runs questions through an answer function and checkpoints every result.
+
+    Args:
+        checkpoint: JSONL file results are appended to
+        answer_fn: Single-question answer function (worker-pool mode)
+        batch_answer_fn: Batched answer function (used when batch_size > 1)
+        workers: Worker threads for single-question mode
+        batch_size: Questions per batched call
+        config: Engine configuration the answers depend on (see engine_config);
+                a checkpoint written under another configuration is not resumed
+    """
+
+    def __init__(self, checkpoint: Path, answer_fn: AnswerFn = None,
+                 batch_answer_fn: BatchAnswerFn = None, workers: int = 4, batch_size: int = 1,
+                 config: Dict = None):
+        if answer_fn is None and batch_answer_fn is None:
+            raise ValueError("answer_fn or batch_answer_fn is required")
+        self.checkpoint = Path(checkpoint)
+        self.answer_fn = answer_fn
+        self.batch_answer_fn = batch_answer_fn
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.config = json.loads(json.dumps(config)) if config is not None else None
+        self._lock = threading.Lock()
+
+    def _append(self, record: Dict):
+        with self._lock:
+            with open(self.checkpoint, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _answer_one(self, item: Dict) -> Dict:
+        start = time.perf_counter()
+        try:
+            answer, error = self.answer_fn(item["question"]), None
+        except Exception as e:
+            answer, error = "", e
+        return make_record(item, answer, time.perf_counter() - start, error)
+
+    def _answer_batch(self, items: List[Dict]) -> List[Dict]:
+        start = time.perf_counter()
+        try:
+            answers, error = self.batch_answer_fn([it["question"] for it in items]), None
+        except Exception as e:
+            answers, error = [""] * len(items), e
+        per_item = (time.perf_counter() - start) / len(items)
+        return [make_record(it, a, per_item, error) for it, a in zip(items, answers)]
+
+    def run(self, questions: List[Dict], resume: bool = True) -> List[Dict]:
+        """
+        Evaluate all questions not yet in the checkpoint
+
+        Returns:
+            All successful records (resumed + new) in dataset order;
+            failed questions are checkpointed but left out
+
+        Raises:
+            CheckpointMismatch: The checkpoint belongs to another configuration
+                                (rerun with resume=False)
+        """
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and self.checkpoint.exists():
+            self.checkpoint.unlink()
+
+        truncate_torn_tail(self.checkpoint)
+        fresh = not self.checkpoint.exists() or self.checkpoint.stat().st_size == 0
+        if self.config is not None:
+            if fresh:
+                self._append({"config": self.config})
+            elif read_checkpoint_config(self.checkpoint) != self.config:
+                raise CheckpointMismatch(
+                    f"{self.checkpoint} was written for {read_checkpoint_config(self.checkpoint)}, "
+                    f"not {self.config}; start a fresh run"
+                )
+        done = load_checkpoint(self.checkpoint)
+        todo = [q for q in questions if q["id"] not in done]
+        print(f"Checkpoint: {len(done)} done, {len(todo)} to run → {self.checkpoint}")
+
+        use_batches = self.batch_answer_fn is not None and (self.batch_size > 1 or self.answer_fn is None)
+        if use_batches:
+            jobs = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+            task = self._answer_batch
+        else:
+            jobs = todo
+            task = self._answer_one
+
+        completed, failed = len(done), 0
+        inst.set_gauge("eval_queue_depth", len(jobs))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(task, job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                inst.add_gauge("eval_queue_depth", -1)
+                for record in result if isinstance(result, list) else [result]:
+                    self._append(record)
+                    if record.get("error"):
+                        failed += 1
+                        print(f"❌ {record['id']}: {record['answer']}")
+                        continue
+                    done[record["id"]] = record
+                    completed += 1
+                    print(f"[{completed}/{len(questions)}] {record['id']}  F1={record['f1']:.3f}  "
+                          f"({record['latency_s']:.2f}s)")
+
+        if failed:
+            print(f"⚠️  {failed} questions failed; they will be retried on the next run")
+        return [done[q["id"]] for q in questions if q["id"] in done]
+
+
+def engine_config() -> Dict:
+    """What the answers depend on: index version, models and retrieval depth."""
+    from src.rag.chain import INDEX_MODE, TOP_K
+    from src.rag.service import get_service
+    from src.utils.model_registry import EMBED_MODEL, LLM_MODEL
+
+    return {
+        "index_version": get_service().version,
+        "index_mode": INDEX_MODE,
+        "embedding_model": EMBED_MODEL,
+        "llm_model": LLM_MODEL,
+        "top_k": TOP_K,
+    }
+
+
+def engine_answer_fns() -> Tuple[AnswerFn, BatchAnswerFn]:
+    """Answer functions bound to the shared warm RAG service."""
+    from src.rag.service import get_service
+
+    service = get_service()
+
+    def answer(question: str) -> str:
+        return service.answer(question)[0]
+
+    def answer_batch(questions: List[str]) -> List[str]:
+        return [a for a, _ in service.answer_batch(questions)]
+
+    return answer, answer_batch
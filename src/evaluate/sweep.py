@@ -0,0 +1,321 @@
+"""
+Parameter sweep for FlightLens retrieval
+
+Explores chunking strategy, chunk size, overlap, embedding model, FAISS
+index type and k, and reports a quality-vs-latency-vs-memory Pareto table.
+
+Each configuration only pays for what changed:
+- PDFs are parsed once and cached as pages.jsonl
+- chunk embeddings are cached per model, keyed by text hash, so chunks
+  shared between configurations (or earlier runs) are never re-embedded
+- one worker process per (strategy, chunk size, overlap, model) group
+  chunks and embeds once, then evaluates every index type and k
+
+Quality is retrieval quality against the gold labels in test_dataset.py
+(see retrieval_eval.py); no LLM is run.
+
+Usage:
+    python -m src.evaluate.sweep --chunk-sizes 500 700 900 --overlaps 0 150 \\
+        --ks 3 5 --index-types flat hnsw --workers 3
+"""
+
+import sys
+import json
+import hashlib
+import itertools
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# ---------------------------------------------------------
+# FIX PYTHONPATH
+# ---------------------------------------------------------
+project_root = Path(__file__).resolve().parents[2]
+src_root = project_root / "src"
+for p in (project_root, src_root):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from src.evaluate.retrieval_eval import hit_matrix, relevance_matrix, retrieval_metrics
+from src.evaluate.test_dataset import ALL_QUESTIONS
+
+CACHE_DIR = project_root / "evaluation" / "sweep_cache"
+PAGES_FILE = CACHE_DIR / "pages.jsonl"
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+PARETO_OBJECTIVES = (("ndcg", "max"), ("p95_ms", "min"), ("index_mb", "min"))
+
+
+# ---------------------------------------------------------
+# CACHED PAGES
+# ---------------------------------------------------------
+def load_pages(refresh: bool = False) -> List[Dict]:
+    """Parsed PDF pages, parsed once and cached as JSONL."""
+    if PAGES_FILE.exists() and not refresh:
+        with open(PAGES_FILE, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    from src.data.ingest import load_pdfs
+
+    pages = [{"text": d.page_content, "metadata": d.metadata} for d in load_pdfs()]
+    PAGES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = PAGES_FILE.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(json.dumps(page, default=str) + "\n")
+    os.replace(tmp, PAGES_FILE)
+    print(f"Cached {len(pages)} parsed pages → {PAGES_FILE}")
+    return pages
+
+
+def chunk_pages(pages: List[Dict], strategy: str, chunk_size: int, overlap: int) -> List[Dict]:
+    from langchain_core.documents import Document
+
+    from src.data.ingest import split_docs
+
+    docs = [Document(page_content=p["text"], metadata=dict(p["metadata"])) for p in pages]
+    chunks = split_docs(docs, strategy=strategy, chunk_size=chunk_size, chunk_overlap=overlap)
+    return [{"text": c.page_content,
+             "metadata": {"source": c.metadata.get("source"), "page": c.metadata.get("page")}}
+            for c in chunks]
+
+
+# ---------------------------------------------------------
+# CACHED EMBEDDINGS
+# ---------------------------------------------------------
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed chunk embeddings for one model.
+
+    Each process appends its new vectors as a separate part file, so
+    parallel workers never write to the same file.
+    """
+
+    def __init__(self, model: str, root: Path = CACHE_DIR / "embeddings"):
+        self.dir = Path(root) / re.sub(r"[^A-Za-z0-9._-]+", "--", model)
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.hits = 0
+        self.misses = 0
+        if self.dir.exists():
+            for part in sorted(self.dir.glob("*.npz")):
+                data = np.load(part)
+                self.vectors.update(zip(data["keys"].tolist(), data["vectors"]))
+
+    def embed(self, texts: List[str], embeddings) -> np.ndarray:
+        keys = [text_key(t) for t in texts]
+        missing = {k: t for k, t in zip(keys, texts) if k not in self.vectors}
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+
+        if missing:
+            new = np.asarray(embeddings.embed_documents(list(missing.values())), dtype=np.float32)
+            self.vectors.update(zip(missing.keys(), new))
+            self.dir.mkdir(parents=True, exist_ok=True)
+            part = self.dir / f"{os.getpid()}_{uuid.uuid4().hex[:8]}.npz"
+            np.savez(part, keys=np.array(list(missing.keys())), vectors=new)
+        return np.stack([self.vectors[k] for k in keys]).astype(np.float32)
+
+
+def get_embeddings(model: str):
+    """"hashing" selects the offline stand-in embedder from the benchmark suite."""
+    if model == "hashing":
+        from src.bench.run import HashingEmbeddings
+
+        return HashingEmbeddings()
+    from src.utils.model_registry import make_embeddings
+
+    return make_embeddings(model)
+
+
+# ---------------------------------------------------------
+# INDEXES
+# ---------------------------------------------------------
+def build_index(vectors: np.ndarray, index_type: str):
+    import faiss
+
+    n, d = vectors.shape
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(d)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, 32)
+    elif index_type == "ivf":
+        nlist = max(1, min(int(np.sqrt(n)), n // 39))   # FAISS wants ~39 training points per list
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(d), d, nlist)
+        index.train(vectors)
+        index.nprobe = min(8, nlist)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    index.add(vectors)
+    return index
+
+
+def index_mb(index) -> float:
+    import faiss
+
+    return faiss.serialize_index(index).nbytes / 1e6
+
+
+# ---------------------------------------------------------
+# ONE GROUP (runs in a worker process)
+# ---------------------------------------------------------
+def run_group(group: Dict) -> List[Dict]:
+    from src.bench.run import peak_rss_mb
+
+    start = time.perf_counter()
+    pages = load_pages()
+    chunks = chunk_pages(pages, group["strategy"], group["chunk_size"], group["overlap"])
+    chunk_s = time.perf_counter() - start
+
+    relevance = relevance_matrix(ALL_QUESTIONS, chunks)
+    n_relevant = relevance.sum(axis=1)
+
+    embeddings = get_embeddings(group["model"])
+    cache = EmbeddingCache(group["model"])
+    start = time.perf_counter()
+    vectors = cache.embed([c["text"] for c in chunks], embeddings)
+    embed_s = time.perf_counter() - start
+    queries = np.asarray(embeddings.embed_documents([q["question"] for q in ALL_QUESTIONS]), dtype=np.float32)
+
+    rows = []
+    for index_type in group["index_types"]:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        build_s = time.perf_counter() - start
+        size_mb = index_mb(index)
+
+        for k in group["ks"]:
+            ranked = np.full((len(queries), k), -1, dtype=np.int64)
+            latencies = np.zeros(len(queries))
+            for i in range(len(queries)):
+                t0 = time.perf_counter()
+                _, ids = index.search(queries[i:i + 1], k)
+                latencies[i] = time.perf_counter() - t0
+                ranked[i] = ids[0]
+
+            m = retrieval_metrics(hit_matrix(ranked, relevance), n_relevant, ks=(k,))
+            p50, p95 = np.percentile(latencies * 1000.0, [50, 95])
+            rows.append({
+                "strategy": group["strategy"],
+                "chunk_size": group["chunk_size"],
+                "overlap": group["overlap"],
+                "model": group["model"],
+                "index_type": index_type,
+                "k": k,
+                "recall": m.get(f"recall@{k}", 0.0),
+                "mrr": m.get("mrr", 0.0),
+                "ndcg": m.get(f"ndcg@{k}", 0.0),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "index_mb": size_mb,
+                "worker_peak_rss_mb": peak_rss_mb(),
+                "chunks": len(chunks),
+                "chunk_s": chunk_s,
+                "embed_s": embed_s,
+                "build_s": build_s,
+                "embedding_cache_hits": cache.hits,
+                "embedding_cache_misses": cache.misses,
+            })
+    print(f"  done: {group['strategy']} size={group['chunk_size']} overlap={group['overlap']} "
+          f"model={group['model']} ({len(chunks)} chunks, {cache.misses} embedded)")
+    return rows
+
+
+# ---------------------------------------------------------
+# GRID + PARETO
+# ---------------------------------------------------------
+def make_groups(strategies: Sequence[str], chunk_sizes: Sequence[int], overlaps: Sequence[int],
+                models: Sequence[str], index_types: Sequence[str], ks: Sequence[int]) -> List[Dict]:
+    groups = []
+    for strategy, size, overlap, model in itertools.product(strategies, chunk_sizes, overlaps, models):
+        if strategy == "structured" and overlap != overlaps[0]:
+            continue   # the structured chunker does not overlap
+        if overlap >= size:
+            continue
+        groups.append({
+            "strategy": strategy,
+            "chunk_size": size,
+            "overlap": 0 if strategy == "structured" else overlap,
+            "model": model,
+            "index_types": list(index_types),
+            "ks": list(ks),
+        })
+    return groups
+
+
+def pareto_front(rows: List[Dict], objectives=PARETO_OBJECTIVES) -> List[bool]:
+    """True for rows no other row beats on every objective (and strictly on one)."""
+    signs = np.array([1.0 if d == "max" else -1.0 for _, d in objectives])
+    scores = np.array([[r[key] for key, _ in objectives] for r in rows], dtype=float) * signs
+    if len(scores) == 0:
+        return []
+    ge = (scores[:, None, :] <= scores[None, :, :]).all(axis=2)   # [i, j]: j at least as good as i
+    gt = (scores[:, None, :] < scores[None, :, :]).any(axis=2)
+    dominated = (ge & gt).any(axis=1)
+    return (~dominated).tolist()
+
+
+def run_sweep(groups: List[Dict], workers: int = 2) -> List[Dict]:
+    load_pages()   # parse once in the parent; workers read the cache
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_group, g) for g in groups]
+        for future in as_completed(futures):
+            rows.extend(future.result())
+    for row, on_front in zip(rows, pareto_front(rows)):
+        row["pareto"] = on_front
+    return rows
+
+
+def print_table(rows: List[Dict]):
+    cols = ["strategy", "chunk_size", "overlap", "model", "index_type", "k",
+            "recall", "ndcg", "p95_ms", "index_mb", "worker_peak_rss_mb"]
+    print("\n  " + " ".join(f"{c[:10]:>10}" for c in cols))
+    for r in sorted(rows, key=lambda r: (-r["pareto"], -r["ndcg"], r["p95_ms"])):
+        cells = [f"{r[c]:10.3f}" if isinstance(r[c], float) else f"{str(r[c])[-10:]:>10}" for c in cols]
+        print(("★ " if r["pareto"] else "  ") + " ".join(cells))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.utils.model_registry import EMBED_MODEL
+
+    parser = argparse.ArgumentParser(description="FlightLens retrieval parameter sweep")
+    parser.add_argument("--strategies", nargs="+", default=["recursive"], choices=["recursive", "structured"])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 700, 900])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 150])
+    parser.add_argument("--models", nargs="+", default=[EMBED_MODEL], help='Embedding models ("hashing" = offline stand-in)')
+    parser.add_argument("--index-types", nargs="+", default=["flat", "hnsw"], choices=list(INDEX_TYPES))
+    parser.add_argument("--ks", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--refresh-pages", action="store_true", help="Re-parse the PDFs")
+    args = parser.parse_args()
+
+    if args.refresh_pages:
+        load_pages(refresh=True)
+
+    groups = make_groups(args.strategies, args.chunk_sizes, args.overlaps, args.models, args.index_types, args.ks)
+    print(f"{len(groups)} chunking/model groups × {len(args.index_types)} index types × {len(args.ks)} k values")
+    rows = run_sweep(groups, workers=args.workers)
+    print_table(rows)
+
+    output_dir = project_root / "evaluation" / "results"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with open(output_dir / f"sweep_{stamp}.json", "w") as f:
+        json.dump({"grid": vars(args), "rows": rows}, f, indent=2, default=str)
+
+    import pandas as pd
+
+    pd.DataFrame(rows).to_csv(output_dir / f"sweep_{stamp}.csv", index=False)
+    print(f"\nSaved → {output_dir}/sweep_{stamp}.json / .csv  (★ = Pareto-optimal)")
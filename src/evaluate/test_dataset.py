@@ -9,6 +9,10 @@ Each question entry:
     "category": str,
     "difficulty": "easy" | "medium" | "hard",
     "requires_context": [] or ["metar"] or ["telemetry"] ...
+    "gold": {                          # retrieval labels (see retrieval_eval.py)
+        "terms": [str, ...],           # a chunk is relevant if it contains all terms
+        "pages": [{"source": str, "page": int}, ...],  # or lies on one of these pages
+    },
 }
 """
 
@@ -25,6 +29,7 @@ ALL_QUESTIONS = [
         "category": "emergency_procedure",
         "difficulty": "high",
         "requires_context": [],
+        "gold": {"terms": ["engine fire", "mixture"], "pages": []},
     },
     {
         "id": "E002",
@@ -37,6 +42,7 @@ ALL_QUESTIONS = [
         "category": "emergency_procedure",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["smoke", "electrical"], "pages": []},
     },
     {
         "id": "E003",
@@ -48,6 +54,7 @@ ALL_QUESTIONS = [
         "category": "emergency_procedure",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["depressurization", "oxygen"], "pages": []},
     },
 
     # Weather / METAR
@@ -58,6 +65,7 @@ ALL_QUESTIONS = [
         "category": "weather",
         "difficulty": "easy",
         "requires_context": [],
+        "gold": {"terms": ["overcast", "ovc"], "pages": []},
     },
     {
         "id": "W002",
@@ -66,6 +74,7 @@ ALL_QUESTIONS = [
         "category": "weather",
         "difficulty": "easy",
         "requires_context": [],
+        "gold": {"terms": ["visibility", "statute miles"], "pages": []},
     },
     {
         "id": "W003",
@@ -74,6 +83,7 @@ ALL_QUESTIONS = [
         "category": "weather",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["ao2"], "pages": []},
     },
 
     # Regulations / Rules
@@ -87,6 +97,7 @@ ALL_QUESTIONS = [
         "category": "regulation",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["congested area"], "pages": []},
     },
     {
         "id": "R002",
@@ -99,6 +110,7 @@ ALL_QUESTIONS = [
         "category": "regulation",
         "difficulty": "easy",
         "requires_context": [],
+        "gold": {"terms": ["airworthiness", "registration"], "pages": []},
     },
 
     # Navigation / Performance
@@ -112,6 +124,7 @@ ALL_QUESTIONS = [
         "category": "performance",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["maneuvering speed"], "pages": []},
     },
     {
         "id": "N002",
@@ -123,6 +136,7 @@ ALL_QUESTIONS = [
         "category": "performance",
         "difficulty": "medium",
         "requires_context": [],
+        "gold": {"terms": ["bank", "stall speed"], "pages": []},
     },
 
     # Context-dependent examples (for future METAR/telemetry-aware RAG)
@@ -137,6 +151,7 @@ ALL_QUESTIONS = [
         "category": "weather",
         "difficulty": "high",
         "requires_context": ["metar"],
+        "gold": {"terms": ["vfr", "visibility", "ceiling"], "pages": []},
     },
     {
         "id": "C002",
@@ -148,5 +163,6 @@ ALL_QUESTIONS = [
         "category": "telemetry_reasoning",
         "difficulty": "medium",
         "requires_context": ["telemetry"],
+        "gold": {"terms": ["cruise", "trim"], "pages": []},
     },
 ]
@@ -1,14 +1,17 @@
 """
 FlightLens Integrations Package
 External data sources: METAR weather and SimConnect telemetry
+
+Exports are resolved on first access (see src/utils/lazy.py).
 """
 
-from src.integrations.aviation_weather import (
-    get_metar,
-    decode_metar
-)
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    'get_metar': 'src.integrations.aviation_weather',
+    'decode_metar': 'src.integrations.aviation_weather',
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'get_metar',
-    'decode_metar'
-]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,20 +1,58 @@
 import requests
-from metar import Metar
 import os
+import re
+import threading
+import time
+from typing import Optional
 from dotenv import load_dotenv
 
+from src.utils import instrumentation as inst
+
 load_dotenv()
 
 OPENWEATHER_KEY = os.getenv("OPENWEATHER_API_KEY", "")
 WEATHERAPI_KEY = os.getenv("WEATHERAPI_KEY", "")
+AVIATION_WEATHER_URL = os.getenv(
+    "AVIATION_WEATHER_URL", "https://aviationweather.gov/adds/dataserver_current/httpparam"
+)
+
+# METARs are issued hourly; re-fetching within a few minutes only adds latency
+METAR_CACHE_TTL = float(os.getenv("FLIGHTLENS_METAR_CACHE_TTL", "300"))
+_metar_cache = {}
+_metar_cache_lock = threading.Lock()
+
 
 def get_metar(icao_code: str) -> str:
     """
-    Fetch METAR with fallback chain:
+    Fetch METAR (real reports are cached for METAR_CACHE_TTL seconds per
+    station; the mock fallback is not, so the next call retries the APIs)
+    """
+    key = icao_code.upper()
+    now = time.monotonic()
+    with _metar_cache_lock:
+        cached = _metar_cache.get(key)
+    hit = cached is not None and now - cached[0] < METAR_CACHE_TTL
+    inst.cache_result("metar", hit)
+    if hit:
+        return cached[1]
+
+    with inst.span("weather.get_metar", station=key):
+        result = _fetch_metar(icao_code)
+    if result is None:
+        print(f"⚠️  All APIs failed. Using mock data for {icao_code}")
+        inst.inc("weather_requests_total", provider="mock", status="ok")
+        return _get_mock_metar(icao_code)
+    with _metar_cache_lock:
+        _metar_cache[key] = (now, result)
+    return result
+
+
+def _fetch_metar(icao_code: str) -> Optional[str]:
+    """
+    Fetch METAR with fallback chain (None if every provider fails):
     1. Aviation Weather API
     2. OpenWeatherMap API
     3. WeatherAPI
-    4. Mock data
     """
     # Try Aviation Weather API first
     result = _try_aviation_weather_api(icao_code)
@@ -32,16 +70,14 @@ def get_metar(icao_code: str) -> str:
         result = _try_weatherapi(icao_code)
         if result:
             return result
-    
-    # Fall back to mock
-    print(f"⚠️  All APIs failed. Using mock data for {icao_code}")
-    return _get_mock_metar(icao_code)
+
+    return None
 
 
 def _try_aviation_weather_api(icao: str) -> str:
     """Try aviation weather API"""
     try:
-        url = "https://aviationweather.gov/adds/dataserver_current/httpparam"
+        url = AVIATION_WEATHER_URL
         params = {
             "dataSource": "metars",
             "requestType": "retrieve",
@@ -51,14 +87,17 @@ def _try_aviation_weather_api(icao: str) -> str:
         }
         headers = {"User-Agent": "FlightLens/1.0"}
         
-        response = requests.get(url, params=params, headers=headers, timeout=3)
+        with inst.span("weather.fetch", provider="aviationweather"):
+            response = requests.get(url, params=params, headers=headers, timeout=3)
         response.raise_for_status()
         data = response.json()
         
         if data.get("data", {}).get("METAR"):
+            inst.inc("weather_requests_total", provider="aviationweather", status="ok")
             return data["data"]["METAR"][0]["raw_text"]
     except:
         pass
+    inst.inc("weather_requests_total", provider="aviationweather", status="failed")
     return None
 
 
@@ -106,7 +145,8 @@ def _try_weatherapi(icao: str) -> str:
             "aqi": "no"
         }
         
-        response = requests.get(url, params=params, timeout=3)
+        with inst.span("weather.fetch", provider="weatherapi"):
+            response = requests.get(url, params=params, timeout=3)
         response.raise_for_status()
         data = response.json()
         
@@ -122,10 +162,12 @@ def _try_weatherapi(icao: str) -> str:
         
         metar = f"METAR {icao} Z {wind_deg:03d}{wind_kt:02d}KT {temp:.0f}°C A{pressure_inhg:.2f}"
         print(f"✅ Real-time weather from WeatherAPI: {icao}")
+        inst.inc("weather_requests_total", provider="weatherapi", status="ok")
         return metar
     
     except Exception as e:
         print(f"⚠️  WeatherAPI error: {e}")
+        inst.inc("weather_requests_total", provider="weatherapi", status="failed")
         return None
 
 
@@ -140,8 +182,117 @@ def _get_mock_metar(icao: str) -> str:
 
 def decode_metar(raw_text: str) -> str:
     """Decode METAR string"""
+    from metar import Metar
+
     try:
         report = Metar.Metar(raw_text)
         return report.string()
     except Exception as e:
         return f"Error decoding: {e}"
+
+
+# -------------------------------------------------------------------
+# METAR group glossary (for questions about individual groups)
+# -------------------------------------------------------------------
+CLOUD_COVER = {
+    "FEW": "Few clouds (1/8-2/8 coverage)",
+    "SCT": "Scattered clouds (3/8-4/8 coverage)",
+    "BKN": "Broken cloud layer (5/8-7/8 coverage, a ceiling)",
+    "OVC": "Overcast cloud layer (8/8 coverage, a ceiling)",
+    "VV": "Vertical visibility into an obscuration (indefinite ceiling)",
+}
+
+SIMPLE_GROUPS = {
+    "SKC": "Sky clear (manual station)",
+    "CLR": "No clouds below 12,000 ft (automated station)",
+    "CAVOK": "Ceiling and visibility OK",
+    "RMK": "Start of the remarks section",
+    "AO1": "Automated station without a precipitation sensor",
+    "AO2": "Automated station with a precipitation sensor",
+    "AUTO": "Fully automated report",
+    "COR": "Corrected report",
+    "SPECI": "Special (unscheduled) weather report",
+}
+
+WEATHER_CODES = {
+    "RA": "rain", "SN": "snow", "DZ": "drizzle", "TS": "thunderstorm",
+    "BR": "mist", "FG": "fog", "HZ": "haze", "GR": "hail", "FZ": "freezing",
+    "SH": "showers", "UP": "unknown precipitation",
+}
+
+_CLOUD_RE = re.compile(r"^(FEW|SCT|BKN|OVC|VV)(\d{3})(CB|TCU)?$")
+_VIS_RE = re.compile(r"^(P|M)?(\d+|\d/\d|\d \d/\d)SM$")
+_WIND_RE = re.compile(r"^(\d{3}|VRB)(\d{2,3})(?:G(\d{2,3}))?KT$")
+_TEMP_RE = re.compile(r"^(M?\d{2})/(M?\d{2})?$")
+_ALT_RE = re.compile(r"^A(\d{4})$")
+_WX_RE = re.compile(r"^([-+]|VC)?((?:RA|SN|DZ|TS|BR|FG|HZ|GR|FZ|SH|UP)+)$")
+_GROUP_SPLIT = re.compile(r"[\s'\"(),?]+")
+
+
+def _explain_group(group: str):
+    if group in SIMPLE_GROUPS:
+        return SIMPLE_GROUPS[group]
+
+    m = _CLOUD_RE.match(group)
+    if m:
+        cover, height, kind = m.groups()
+        text = f"{CLOUD_COVER[cover]} with base at {int(height) * 100} ft AGL"
+        if kind:
+            text += " (cumulonimbus)" if kind == "CB" else " (towering cumulus)"
+        return text
+
+    m = _VIS_RE.match(group)
+    if m:
+        prefix, vis = m.groups()
+        qualifier = {"P": "more than ", "M": "less than "}.get(prefix, "")
+        return f"Visibility {qualifier}{vis} statute miles"
+
+    m = _WIND_RE.match(group)
+    if m:
+        direction, speed, gust = m.groups()
+        text = "Wind variable" if direction == "VRB" else f"Wind from {direction}°"
+        text += f" at {int(speed)} kt"
+        if gust:
+            text += f" gusting {int(gust)} kt"
+        return text
+
+    m = _TEMP_RE.match(group)
+    if m:
+        temp, dew = (v.replace("M", "-") if v else None for v in m.groups())
+        text = f"Temperature {int(temp)}°C"
+        if dew:
+            text += f", dew point {int(dew)}°C"
+        return text
+
+    m = _ALT_RE.match(group)
+    if m:
+        return f"Altimeter setting {int(m.group(1)) / 100:.2f} inHg"
+
+    m = _WX_RE.match(group)
+    if m:
+        intensity, codes = m.groups()
+        words = [WEATHER_CODES[codes[i:i + 2]] for i in range(0, len(codes), 2)]
+        prefix = {"-": "light ", "+": "heavy ", "VC": "in the vicinity: "}.get(intensity, "")
+        return (prefix + " ".join(words)).capitalize()
+
+    return None
+
+
+def explain_metar_groups(text: str) -> str:
+    """
+    Explain recognisable METAR groups appearing in free text
+    (e.g. "What does OVC003 mean?" → overcast at 300 ft AGL).
+
+    Returns:
+        One line per recognised group, or an empty string
+    """
+    lines = []
+    seen = set()
+    for group in _GROUP_SPLIT.split(text.upper()):
+        if not group or group in seen:
+            continue
+        seen.add(group)
+        meaning = _explain_group(group)
+        if meaning:
+            lines.append(f"{group}: {meaning}")
+    return "\n".join(lines)
@@ -1,14 +1,20 @@
 """
 FlightLens RAG Module
-Exports RAG utilities from chain.py
+Exports RAG utilities from chain.py and router.py
+
+Exports are resolved on first access (see src/utils/lazy.py), so importing
+src.rag.procedures or src.rag.router does not load LangChain or transformers.
 """
 
-from src.rag.chain import (
-    answer_question,
-    answer_question_with_sources,
-)
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "answer_question": "src.rag.chain",
+    "answer_question_with_sources": "src.rag.chain",
+    "answer_routed": "src.rag.router",
+    "route_query": "src.rag.router",
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    "answer_question",
-    "answer_question_with_sources",
-]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
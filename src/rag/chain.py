@@ -3,15 +3,29 @@ chain.py — FlightLens RAG Chain
 Uses:
 - MPNet embeddings (from FAISS index)
 - Local HuggingFace generation model (FLAN-T5)
-- FAISS retriever
+- FAISS retriever (single index, or per-manual shards searched in parallel)
 """
 
 import os
+import queue
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List
+
 from dotenv import load_dotenv
-from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings, HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+
+from src.data.index_store import IndexStore
+from src.data.shards import check_registry
+from src.rag.filtering import FilteredSearch, MetadataFilter
+from src.rag.sharded import ShardedIndex
+from src.utils import instrumentation as inst
+from src.utils.model_registry import (
+    EMBED_MODEL,
+    LLM_MODEL,
+    embedding_fingerprint,
+    make_embeddings,
+    resolve_model,
+)
 
 load_dotenv()
 
@@ -19,75 +33,320 @@ load_dotenv()
 # Paths
 # -------------------------------------------------------------------
 INDEX_DIR = os.getenv("FAISS_INDEX_PATH", "models/faiss_index")
-EMBED_MODEL = os.getenv("FLIGHTLENS_EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
-LLM_MODEL = os.getenv("FLIGHTLENS_LLM_MODEL", "google/flan-t5-base")
+INDEX_MODE = os.getenv("FLIGHTLENS_INDEX_MODE", "single")  # "single" | "sharded"
+TOP_K = int(os.getenv("FLIGHTLENS_TOP_K", "3"))
+LLM_MAX_LENGTH = 512
+STREAM_TIMEOUT = float(os.getenv("FLIGHTLENS_STREAM_TIMEOUT", "120"))   # max seconds between tokens
 
 
 # -------------------------------------------------------------------
-# Load RAG Chain
+# Component Loaders
 # -------------------------------------------------------------------
-def get_chain():
-    """Initialize the Retrieval-Augmented Generation (RAG) chain."""
-
+def load_embeddings():
+    """Load the query embedding model."""
     print(f"Loading embeddings: {EMBED_MODEL}")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+    with inst.span("rag.load_embeddings", model=EMBED_MODEL):
+        return make_embeddings(EMBED_MODEL)
 
-    print(f"Loading FAISS index from: {INDEX_DIR}")
-    db = FAISS.load_local(
-        INDEX_DIR,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
 
-    retriever = db.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 3}
-    )
+def load_vectorstore(embeddings, path=None):
+    """Load the FAISS index built by src/data/embed_faiss.py (current version by default)."""
+    from langchain_community.vectorstores import FAISS
+
+    path = str(path or IndexStore(INDEX_DIR).current_path())
+    print(f"Loading FAISS index from: {path}")
+    with inst.span("rag.load_index", path=path):
+        return FAISS.load_local(
+            path,
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+
+
+def load_llm():
+    """Load the local FLAN-T5 generation pipeline."""
+    from langchain_huggingface import HuggingFacePipeline
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
 
     print(f"Loading LLM model: {LLM_MODEL}")
-    tokenizer = AutoTokenizer.from_pretrained(LLM_MODEL)
-    model = AutoModelForSeq2SeqLM.from_pretrained(LLM_MODEL)
+    with inst.span("rag.load_llm", model=LLM_MODEL):
+        model_dir = resolve_model(LLM_MODEL)
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_dir)
 
     pipe = pipeline(
         "text2text-generation",
         model=model,
         tokenizer=tokenizer,
-        max_length=512
+        max_length=LLM_MAX_LENGTH
     )
 
-    llm = HuggingFacePipeline(pipeline=pipe)
+    return HuggingFacePipeline(pipeline=pipe)
 
-    chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=retriever,
-        chain_type="stuff"
-    )
 
-    return chain
+# -------------------------------------------------------------------
+# RAG Engine
+# -------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _engine_retriever_class():
+    """EngineRetriever, defined on first use so importing chain.py does not load LangChain."""
+    from langchain_core.retrievers import BaseRetriever
+
+    class EngineRetriever(BaseRetriever):
+        """LangChain retriever backed by RAGEngine.retrieve (used for sharded indexes)."""
+
+        engine: Any
+
+        def _get_relevant_documents(self, query: str, *, run_manager=None) -> List:
+            return self.engine.retrieve(query)
+
+    return EngineRetriever
+
+
+class RAGEngine:
+    """
+    Loaded embeddings, FAISS index and LLM.
+    Exposes retrieval and generation as separate stages so callers
+    (e.g. the query router) can skip or overlap them.
+    """
+
+    def __init__(self, k: int = TOP_K, index_mode: str = None, index_version: str = None,
+                 embeddings=None, llm=None):
+        """
+        Args:
+            k: Chunks retrieved per query
+            index_mode: "single" or "sharded" (default: FLIGHTLENS_INDEX_MODE)
+            index_version: Index version to load (default: CURRENT)
+            embeddings, llm: Already-loaded components to reuse (index hot-swap)
+        """
+        self.k = k
+        sharded = (index_mode or INDEX_MODE) == "sharded"
+
+        # Refuse a mismatched index before paying for any model load
+        store = IndexStore(INDEX_DIR)
+        if sharded:
+            check_registry(EMBED_MODEL, fingerprint=embedding_fingerprint(EMBED_MODEL))
+        else:
+            self.index_version = index_version or store.current_version()
+            self.manifest = store.check(
+                EMBED_MODEL,
+                self.index_version,
+                fingerprint=embedding_fingerprint(EMBED_MODEL),
+            )
+
+        self.embeddings = embeddings or load_embeddings()
+
+        if sharded:
+            self.index_version = None
+            self.manifest = None
+            self.db = None
+            self.shards = ShardedIndex.load(self.embeddings)
+            self.retriever = _engine_retriever_class()(engine=self)
+        else:
+            self.db = load_vectorstore(self.embeddings, store.version_path(self.index_version))
+            self.shards = None
+            self.retriever = self.db.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": k}
+            )
+
+        self.llm = llm or load_llm()
+
+        from langchain.chains import RetrievalQA
+
+        self.chain = RetrievalQA.from_chain_type(
+            llm=self.llm,
+            retriever=self.retriever,
+            chain_type="stuff"
+        )
+
+        self._filtered = None
+
+    def close(self):
+        """Drop the index and everything built on it (embeddings and LLM are left to their other users)."""
+        if self.shards is not None:
+            self.shards.close()
+        self.db = None
+        self.shards = None
+        self.retriever = None
+        self.chain = None
+        self._filtered = None
+
+    @property
+    def filtered(self) -> FilteredSearch:
+        """Metadata-filtered search (column/bitmap build deferred to first filtered query)."""
+        if self._filtered is None:
+            self._filtered = FilteredSearch(self.db)
+        return self._filtered
+
+    def retrieve(self, query: str, k: int = None, embedding=None,
+                 filter: MetadataFilter = None):
+        """Top-k chunks for a query (reuses a precomputed query embedding if given)."""
+        k = k or self.k
+        filtered = filter is not None and not filter.is_empty()
+        with inst.span("rag.retrieve", k=k, sharded=self.shards is not None, filtered=filtered):
+            if embedding is None and (self.shards is not None or filtered):
+                with inst.span("rag.embed_query"):
+                    embedding = self.embeddings.embed_query(query)
+            if self.shards is not None:
+                return self.shards.search_by_vector(embedding, k, filter)
+            if filtered:
+                return self.filtered.search_by_vector(embedding, k, filter)
+            if embedding is not None:
+                return self.db.similarity_search_by_vector(list(embedding), k=k)
+            return self.db.similarity_search(query, k=k)
+
+    def build_prompt(self, query: str, docs) -> str:
+        """The chain's "stuff" prompt for a question and its retrieved chunks."""
+        with inst.span("rag.prompt", docs=len(docs)):
+            prompt = self.chain.combine_documents_chain.llm_chain.prompt
+            return prompt.format(context="\n\n".join(d.page_content for d in docs), question=query)
+
+    def answer(self, query: str, filter: MetadataFilter = None,
+               on_token: Callable[[str], None] = None):
+        """
+        Retrieve once and answer with the chain's stuff prompt
+
+        Args:
+            on_token: Called with each piece of text as it is generated
+                      (streams the answer instead of one blocking call)
+
+        Returns:
+            (answer, source Documents)
+        """
+        with inst.span("rag.answer"):
+            docs = self.retrieve(query, filter=filter)
+            prompt = self.build_prompt(query, docs)
+            if on_token is None:
+                answer = self.generate(prompt)
+            else:
+                pieces = []
+                for text in self.generate_stream(prompt):
+                    pieces.append(text)
+                    on_token(text)
+                answer = "".join(pieces)
+        inst.inc("rag_requests_total")
+        return answer, docs
+
+    def answer_batch(self, queries: List[str], filter: MetadataFilter = None):
+        """
+        Answer several questions with one batched embedding call and one
+        batched LLM call
+
+        Returns:
+            List of (answer, source Documents), in input order
+        """
+        with inst.span("rag.answer_batch", batch=len(queries)):
+            with inst.span("rag.embed_query", batch=len(queries)):
+                vectors = self.embeddings.embed_documents(queries)
+            all_docs = [self.retrieve(q, embedding=v, filter=filter) for q, v in zip(queries, vectors)]
+            prompts = [self.build_prompt(q, docs) for q, docs in zip(queries, all_docs)]
+            with inst.span("rag.generate", batch=len(prompts)):
+                answers = self.llm.batch(prompts)
+        inst.inc("rag_requests_total", len(queries))
+        for answer in answers:
+            self._count_tokens(answer)
+        return list(zip(answers, all_docs))
+
+    def _count_tokens(self, answer: str):
+        """Record tokens generated for one request (tokenizes only when metrics are on)."""
+        if not inst.enabled():
+            return
+        tokenizer = getattr(getattr(self.llm, "pipeline", None), "tokenizer", None)
+        if tokenizer is not None:
+            n = len(tokenizer(answer, add_special_tokens=False)["input_ids"])
+            inst.observe("llm_tokens_generated", n, buckets=inst.TOKEN_BUCKETS)
+            inst.inc("llm_tokens_generated_total", n)
+
+    def generate(self, prompt: str) -> str:
+        """Run the LLM on a fully formatted prompt."""
+        with inst.span("rag.generate"):
+            answer = self.llm.invoke(prompt)
+        self._count_tokens(answer)
+        return answer
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Run the LLM on a prompt, yielding text as tokens are decoded
+
+        generate() runs on a background thread and feeds a
+        TextIteratorStreamer; LLMs without a transformers pipeline yield
+        the whole answer at once.
+
+        Raises:
+            The generation thread's exception, or TimeoutError when no
+            text arrives for STREAM_TIMEOUT seconds
+        """
+        pipe = getattr(self.llm, "pipeline", None)
+        if pipe is None:
+            yield self.generate(prompt)
+            return
+
+        from transformers import TextIteratorStreamer
+
+        streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                        timeout=STREAM_TIMEOUT)
+        inputs = pipe.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=LLM_MAX_LENGTH)
+        errors = []
+
+        def run():
+            try:
+                pipe.model.generate(**inputs, streamer=streamer, max_length=LLM_MAX_LENGTH)
+            except BaseException as e:
+                errors.append(e)
+                streamer.end()   # unblock the consumer
+
+        worker = threading.Thread(target=run, name="llm-stream", daemon=True)
+        pieces = []
+        with inst.span("rag.generate", streaming=True):
+            worker.start()
+            try:
+                for text in streamer:
+                    if text:
+                        pieces.append(text)
+                        yield text
+            except queue.Empty:
+                raise TimeoutError(f"LLM produced no text for {STREAM_TIMEOUT:.0f}s") from None
+            worker.join()
+            if errors:
+                raise errors[0]
+        self._count_tokens("".join(pieces))
+
+
+# -------------------------------------------------------------------
+# Load RAG Chain
+# -------------------------------------------------------------------
+def get_chain():
+    """Initialize the Retrieval-Augmented Generation (RAG) chain."""
+    return RAGEngine().chain
 
 
 # -------------------------------------------------------------------
 # Main QA Functions
 # -------------------------------------------------------------------
 def answer_question(query: str) -> str:
-    """Basic RAG answer only."""
+    """Basic RAG answer only (shared warm engine, see service.py)."""
     try:
-        chain = get_chain()
-        result = chain.invoke({"query": query})
-        return result["result"]
+        from src.rag.service import get_service
+
+        answer, _ = get_service().answer(query)
+        return answer
     except Exception as e:
         return f"Error: {str(e)}"
 
 
-def answer_question_with_sources(query: str):
-    """Return answer + top source chunks."""
+def answer_question_with_sources(query: str, source: str = None,
+                                 page_range=None, section: str = None, on_token=None):
+    """
+    Return answer + top source chunks.
+    Optionally restricted to one source document, page range or section;
+    on_token receives the answer text as it is generated.
+    """
     try:
-        chain = get_chain()
-        retriever = chain.retriever
+        from src.rag.service import get_service
 
-        docs = retriever.get_relevant_documents(query)
-        result = chain.invoke({"query": query})
-        answer = result["result"]
+        flt = MetadataFilter(source=source, page_range=page_range, section=section)
+        answer, docs = get_service().answer(query, filter=flt, on_token=on_token)
 
         sources = []
         for doc in docs:
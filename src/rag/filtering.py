@@ -0,0 +1,219 @@
+"""
+filtering.py — Metadata-filtered FAISS search
+Restricts vector search to a source document, page range and/or section
+inside FAISS itself:
+- chunk metadata is turned into NumPy columns once at load time
+- per-source bitmaps are precomputed
+- the filter is passed to FAISS as an IDSelectorBitmap, so only matching
+  vectors are scored (no over-fetching and post-filtering in Python)
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.utils.files import open_chunk_store
+
+CHUNK_FILE = os.getenv("PROCESSED_DATA_PATH", "data/processed") + "/chunks.jsonl"
+SELECTOR_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """Which chunks a query may retrieve. Unset fields match everything."""
+    source: Union[str, Tuple[str, ...], None] = None
+    page_range: Optional[Tuple[int, int]] = None     # inclusive, 0-based like chunk metadata
+    section: Optional[str] = None                    # section path prefix
+
+    def __post_init__(self):
+        # Lists (e.g. from JSON requests) become tuples, so filters stay hashable cache keys
+        if self.source is not None and not isinstance(self.source, str):
+            object.__setattr__(self, "source", tuple(self.source))
+        if self.page_range is not None:
+            object.__setattr__(self, "page_range", tuple(int(p) for p in self.page_range))
+
+    def is_empty(self) -> bool:
+        return self.source is None and self.page_range is None and self.section is None
+
+    def sources(self) -> Tuple[str, ...]:
+        if self.source is None:
+            return ()
+        return (self.source,) if isinstance(self.source, str) else tuple(self.source)
+
+
+class FilteredSearch:
+    """
+    FAISS search with metadata filters compiled to ID-selector bitmaps.
+
+    Args:
+        db: LangChain FAISS vector store (index + docstore)
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.index = db.index
+        n = self.index.ntotal
+
+        self._doc_ids = [db.index_to_docstore_id[i] for i in range(n)]
+        metas = [db.docstore.search(doc_id).metadata for doc_id in self._doc_ids]
+
+        # Columnar metadata: interned source / section codes, integer pages
+        self.source_names = sorted({m.get("source") or "" for m in metas})
+        src_code = {s: i for i, s in enumerate(self.source_names)}
+        self.section_names = sorted({m.get("section") or "" for m in metas})
+        sec_code = {s: i for i, s in enumerate(self.section_names)}
+
+        self.source_codes = np.fromiter((src_code[m.get("source") or ""] for m in metas), np.int32, n)
+        self.section_codes = np.fromiter((sec_code[m.get("section") or ""] for m in metas), np.int32, n)
+        self.pages = np.fromiter(
+            (m.get("page") if m.get("page") is not None else -1 for m in metas), np.int32, n
+        )
+
+        self._source_masks = {
+            name: self.source_codes == code for name, code in src_code.items()
+        }
+        self._bitmaps: "OrderedDict[MetadataFilter, object]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Filter compilation
+    # ------------------------------------------------------------------
+    def mask(self, flt: MetadataFilter) -> np.ndarray:
+        """Boolean mask over FAISS ids for a filter (vectorised over all chunks)."""
+        mask = np.ones(self.index.ntotal, dtype=bool)
+
+        if flt.source is not None:
+            src = np.zeros_like(mask)
+            for name in flt.sources():
+                if name in self._source_masks:
+                    src |= self._source_masks[name]
+            mask &= src
+
+        if flt.page_range is not None:
+            lo, hi = flt.page_range
+            mask &= (self.pages >= lo) & (self.pages <= hi)
+
+        if flt.section:
+            codes = [i for i, s in enumerate(self.section_names) if s.startswith(flt.section)]
+            mask &= np.isin(self.section_codes, codes)
+
+        return mask
+
+    def selector(self, flt: MetadataFilter):
+        """
+        IDSelectorBitmap for a filter (LRU-cached).
+
+        FAISS only keeps a raw pointer to the bitmap, so the array is pinned on
+        the selector itself; callers must hold the selector until the search
+        returns (SearchParameters does not keep it alive).
+        """
+        import faiss
+
+        sel = self._bitmaps.get(flt)
+        if sel is not None:
+            self._bitmaps.move_to_end(flt)
+            return sel
+
+        bitmap = np.packbits(self.mask(flt), bitorder="little")
+        sel = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        sel.referenced_objects = [bitmap]
+        self._bitmaps[flt] = sel
+        if len(self._bitmaps) > SELECTOR_CACHE_SIZE:
+            self._bitmaps.popitem(last=False)
+        return sel
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def search_by_vector(self, embedding: Sequence[float], k: int = 3,
+                         flt: Optional[MetadataFilter] = None) -> List:
+        """Top-k Documents for a query embedding under a metadata filter."""
+        import faiss
+
+        x = np.asarray([embedding], dtype=np.float32)
+        if getattr(self.db, "_normalize_L2", False):
+            faiss.normalize_L2(x)
+
+        if flt is None or flt.is_empty():
+            _, ids = self.index.search(x, k)
+        else:
+            sel = self.selector(flt)
+            params = faiss.SearchParameters(sel=sel)
+            _, ids = self.index.search(x, k, params=params)
+
+        return [self.db.docstore.search(self._doc_ids[i]) for i in ids[0] if i >= 0]
+
+    def search(self, query: str, k: int = 3, flt: Optional[MetadataFilter] = None) -> List:
+        return self.search_by_vector(self.db.embedding_function.embed_query(query), k, flt)
+
+
+def list_sources(chunk_file: str = CHUNK_FILE) -> List[str]:
+    """Source documents present in chunks.jsonl (for UI selectors)."""
+    store = open_chunk_store(chunk_file)
+    if store is not None:
+        with store:
+            return [s for s in store.values("source") if s] if "source" in store.columns else []
+    if not os.path.exists(chunk_file):
+        return []
+    sources = set()
+    with open(chunk_file, "r", encoding="utf-8") as f:
+        for line in f:
+            source = json.loads(line)["metadata"].get("source")
+            if source:
+                sources.add(source)
+    return sorted(sources)
+
+
+# -------------------------------------------------------------------
+# Benchmark: filtered vs unfiltered vs post-filtered latency
+# -------------------------------------------------------------------
+def benchmark(db, queries: List[str], k: int = 3, repeats: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Time unfiltered search, bitmap-filtered search per source, and
+    LangChain's over-fetch + post-filter for the same sources.
+    """
+    fs = FilteredSearch(db)
+    vectors = db.embedding_function.embed_documents(queries)
+
+    def timed(fn):
+        samples = []
+        for _ in range(repeats):
+            for vec in vectors:
+                t0 = time.perf_counter()
+                fn(vec)
+                samples.append((time.perf_counter() - t0) * 1000)
+        arr = np.asarray(samples)
+        return {"mean_ms": float(arr.mean()), "p95_ms": float(np.percentile(arr, 95))}
+
+    results = {"unfiltered": timed(lambda v: fs.search_by_vector(v, k))}
+    for source in fs.source_names:
+        flt = MetadataFilter(source=source)
+        results[f"bitmap[{source}]"] = timed(lambda v: fs.search_by_vector(v, k, flt))
+        results[f"postfilter[{source}]"] = timed(
+            lambda v: db.similarity_search_by_vector(v, k=k, filter={"source": source}, fetch_k=20 * k)
+        )
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    project_root = Path(__file__).resolve().parents[2]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    from src.evaluate.test_dataset import ALL_QUESTIONS
+    from src.rag.chain import load_embeddings, load_vectorstore
+
+    db = load_vectorstore(load_embeddings())
+    print(f"Index: {db.index.ntotal} vectors")
+
+    results = benchmark(db, [q["question"] for q in ALL_QUESTIONS])
+    print(f"\n{'search':<48}{'mean ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<48}{r['mean_ms']:>10.3f}{r['p95_ms']:>10.3f}")
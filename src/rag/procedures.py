@@ -0,0 +1,231 @@
+"""
+procedures.py — FlightLens Emergency Procedure Index
+Extracted at ingest time from the raw manual pages:
+- CHECKLIST / PROCEDURE / WARNING blocks and ALL-CAPS titled step lists
+- Keyed by normalized procedure title
+- Word inverted index over title content words; a checklist is only
+  returned when every word of its title appears in the question
+Returns verbatim checklists in milliseconds without invoking the LLM.
+"""
+
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROCEDURE_FILE = os.getenv("PROCESSED_DATA_PATH", "data/processed") + "/procedures.json"
+
+MIN_STEPS = 2
+MATCH_THRESHOLD = 0.7
+
+# Words that carry no procedure identity (question framing, block labels)
+STOPWORDS = {
+    "a", "an", "the", "of", "for", "in", "on", "to", "and", "or", "with", "at",
+    "what", "whats", "is", "are", "how", "should", "do", "does", "i", "we", "you",
+    "pilot", "steps", "step", "respond", "immediate", "action", "actions",
+    "procedure", "procedures", "checklist", "checklists", "warning", "emergency",
+    "emergencies", "during", "when", "there", "my", "our", "be", "taken",
+}
+
+_KEYWORD_HEAD = re.compile(r"^\s*(CHECKLIST|PROCEDURE|PROCEDURES|WARNING)\b[\s:.\-–]*(.*)$")
+_CAPS_TITLE = re.compile(r"^\s*[A-Z][A-Z0-9 /()&,'\-]{3,78}$")
+_STEP = re.compile(
+    r"^\s*(?:\d{1,2}[.)]|[a-z][.)]|[•\-*])\s+\S"         # 1. / a) / bullets
+    r"|^\s*[A-Za-z][\w /()'\-]{1,40}?(?:\s*\.{2,}|\s+[-–]{1,2})\s*[A-Z0-9]"  # Item .... ACTION
+)
+
+
+@dataclass
+class Procedure:
+    title: str
+    key: str
+    text: str
+    source: Optional[str]
+    page: Optional[int]
+
+
+@dataclass
+class ProcedureMatch:
+    procedure: Procedure
+    score: float
+
+
+# -------------------------------------------------------------------
+# Normalization
+# -------------------------------------------------------------------
+def normalize_title(text: str) -> str:
+    """Lowercase, drop punctuation and framing words: 'ENGINE FIRE - IN FLIGHT' → 'engine fire flight'."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding so 'fires' matches 'fire' (aviation titles are short noun phrases)."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def title_words(text: str) -> frozenset:
+    """Content words of a title or question, plural-folded."""
+    return frozenset(_stem(w) for w in normalize_title(text).split())
+
+
+# -------------------------------------------------------------------
+# Extraction
+# -------------------------------------------------------------------
+def extract_procedures(pages: Iterable[Tuple[str, Optional[str], Optional[int]]]) -> List[Procedure]:
+    """
+    Find titled step lists in page text
+
+    Args:
+        pages: (text, source, page) tuples in reading order
+
+    Returns:
+        Procedures with at least MIN_STEPS steps
+    """
+    procedures = []
+    current = None  # [title, lines, steps, source, page]
+
+    def close():
+        if current and current[2] >= MIN_STEPS:
+            title, lines, _, source, page = current
+            key = normalize_title(title)
+            if key:
+                procedures.append(Procedure(title, key, "\n".join(lines).strip(), source, page))
+
+    for text, source, page in pages:
+        lines = text.splitlines()
+        for i, line in enumerate(lines):
+            title = _title_of(line, lines[i + 1:i + 3], in_steps=bool(current and current[2]))
+            if title:
+                close()
+                current = [title, [line.strip()], 0, source, page]
+                continue
+            if current is None:
+                continue
+            if _STEP.match(line):
+                current[1].append(line.rstrip())
+                current[2] += 1
+            elif line.strip() and current[2] and line.startswith((" ", "\t")):
+                current[1].append(line.rstrip())  # wrapped step text
+            elif not line.strip():
+                continue
+            elif current[2]:
+                close()
+                current = None
+            elif len(current[1]) < 3:
+                current[1].append(line.strip())  # preamble before the first step
+            else:
+                current = None
+
+    close()
+    return procedures
+
+
+def _title_of(line: str, following: List[str], in_steps: bool) -> Optional[str]:
+    m = _KEYWORD_HEAD.match(line)
+    if m:
+        return m.group(2).strip() or m.group(1)
+    if in_steps and _STEP.match(line):
+        return None  # an all-caps "ITEM - ACTION" step, not a new title
+    if _CAPS_TITLE.match(line) and any(_STEP.match(nxt) for nxt in following):
+        return line.strip()
+    return None
+
+
+# -------------------------------------------------------------------
+# Index
+# -------------------------------------------------------------------
+class ProcedureIndex:
+    """Title → verbatim checklist lookup over a word inverted index."""
+
+    def __init__(self, procedures: List[Procedure]):
+        self.procedures = procedures
+        self._words = [title_words(p.key) for p in procedures]
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, words in enumerate(self._words):
+            for w in words:
+                self._postings[w].append(idx)
+
+    def __len__(self):
+        return len(self.procedures)
+
+    @classmethod
+    def from_documents(cls, docs) -> "ProcedureIndex":
+        """Build from LangChain page Documents (as returned by load_pdfs)."""
+        pages = [(d.page_content, d.metadata.get("source"), d.metadata.get("page")) for d in docs]
+        pages.sort(key=lambda p: (p[1] or "", p[2] or 0))
+        return cls(extract_procedures(pages))
+
+    def lookup(self, query: str, threshold: float = MATCH_THRESHOLD) -> Optional[ProcedureMatch]:
+        """
+        Best-matching procedure for a question, if confident
+
+        Every content word of the title must appear in the question
+        ("engine fire on the ground" never matches ENGINE FIRE DURING
+        FLIGHT); the score is then the Dice coefficient of the two word
+        sets, so a question that is mostly about something else stays
+        below the threshold and goes to the LLM instead.
+        """
+        q_words = title_words(query)
+        if not q_words:
+            return None
+
+        shared = Counter()
+        for w in q_words:
+            for idx in self._postings.get(w, ()):
+                shared[idx] += 1
+
+        best, best_score = None, 0.0
+        for idx, n in shared.items():
+            t_words = self._words[idx]
+            if n < len(t_words):
+                continue
+            score = 2.0 * n / (len(q_words) + len(t_words))
+            if score > best_score:
+                best, best_score = idx, score
+
+        if best is None or best_score < threshold:
+            return None
+        return ProcedureMatch(self.procedures[best], best_score)
+
+    def save(self, path: str = PROCEDURE_FILE):
+        from src.utils.files import atomic_write
+
+        # Atomic, so a running process never reloads a half-written file
+        with atomic_write(path, "w") as f:
+            json.dump([asdict(p) for p in self.procedures], f, indent=1)
+
+    @classmethod
+    def load(cls, path: str = PROCEDURE_FILE) -> "ProcedureIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([Procedure(**p) for p in json.load(f)])
+
+
+@lru_cache(maxsize=1)
+def _load_procedure_index(path: str, mtime_ns: int) -> ProcedureIndex:
+    return ProcedureIndex.load(path)
+
+
+def get_procedure_index(path: str = PROCEDURE_FILE) -> Optional[ProcedureIndex]:
+    """
+    Process-wide procedure index, or None if ingest has not produced one.
+    Cached per file modification time, so a re-ingest is picked up on the next call.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load_procedure_index(path, mtime_ns)
+
+
+def format_procedure(match: ProcedureMatch) -> str:
+    p = match.procedure
+    where = f" ({p.source}, p. {p.page + 1})" if p.source and p.page is not None else ""
+    return f"{p.text}\n\nSource: verbatim checklist{where}"
@@ -0,0 +1,327 @@
+"""
+router.py — FlightLens Query Router
+Picks the specialised prompt for a question without an LLM call:
+- Keyword/regex rules first (microseconds)
+- Embedding-centroid classifier for anything the rules don't catch
+Then fetches only what the route needs (retrieval, METAR, telemetry),
+concurrently, and skips retrieval for pure METAR-decoding questions.
+Emergency questions matching an extracted checklist are answered verbatim
+from the procedure index without loading any model.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.rag.procedures import format_procedure, get_procedure_index
+from src.rag.prompts import format_prompt
+
+
+# -------------------------------------------------------------------
+# Routes
+# -------------------------------------------------------------------
+@dataclass(frozen=True)
+class Route:
+    name: str
+    prompt: str             # prompt type for format_prompt()
+    retrieval: bool
+    metar: bool
+    telemetry: bool
+
+
+ROUTES = {
+    "metar": Route("metar", "weather", retrieval=False, metar=True, telemetry=False),
+    "emergency": Route("emergency", "emergency", retrieval=True, metar=False, telemetry=False),
+    "decision": Route("decision", "decision", retrieval=True, metar=True, telemetry=True),
+    "rag": Route("rag", "rag", retrieval=True, metar=False, telemetry=False),
+}
+
+DEFAULT_ROUTE = "rag"
+
+# Ordered: first match wins
+KEYWORD_RULES = [
+    ("emergency", re.compile(
+        r"\b(emergenc\w*|fire|smoke|fumes|depressuri[sz]ation|mayday|pan.pan|ditch\w*|"
+        r"forced landing|engine (failure|out|inoperative)|power loss|spin recovery)\b", re.I)),
+    ("decision", re.compile(
+        r"\b(given (the )?current|current (metar|conditions|weather|state)|should (i|we)|"
+        r"can (i|we)\b[^.?!]{0,40}?\b(depart|take ?off|continue|land|go)|is (this|it) (a )?(safe|stable)|"
+        r"aircraft is at|(our|my) (altitude|fuel|airspeed|heading)|divert|go.around)\b", re.I)),
+    ("metar", re.compile(
+        r"\b(metar|taf|decode|rmk)\b|"
+        r"\b(FEW|SCT|BKN|OVC|VV)\d{3}\b|\b\d{3}\d{2,3}(G\d{2,3})?KT\b|\b(P|M)?\d+SM\b|\bA\d{4}\b", re.I)),
+]
+
+# Exemplars for the embedding-centroid classifier
+ROUTE_EXEMPLARS = {
+    "emergency": [
+        "What are the steps for an engine fire during flight?",
+        "How should a pilot respond to smoke in the cockpit?",
+        "What is the immediate action for rapid depressurization?",
+        "Electrical failure in flight checklist",
+        "What to do after an engine failure after takeoff?",
+    ],
+    "decision": [
+        "Given current conditions, should I continue to my destination?",
+        "Is this a stable approach at my current speed and altitude?",
+        "Do I have enough fuel to reach the alternate?",
+        "With this weather can we depart VFR?",
+    ],
+    "metar": [
+        "What does OVC003 in a METAR indicate?",
+        "How is visibility reported in a METAR?",
+        "Decode this weather report",
+        "What does the wind group 18010KT mean?",
+    ],
+    "rag": [
+        "What is maneuvering speed?",
+        "What documents are required on board an aircraft?",
+        "How does bank angle affect stall speed?",
+        "What is the minimum safe altitude over a congested area?",
+    ],
+}
+
+# Full METAR report embedded in a question
+_REPORT_RE = re.compile(r"\b(?:METAR|SPECI)\s+[A-Z]{4}\s+\d{6}Z(?:\s+[A-Z0-9/+\-]+)*")
+# US/Canada/Pacific ICAO identifiers, minus common aviation abbreviations
+_ICAO_RE = re.compile(r"\b[KCP][A-Z]{3}\b")
+_NOT_STATIONS = {"KIAS", "KTAS", "KCAS", "PROB", "PAPI", "CTAF", "CFIT"}
+
+
+def extract_station(text: str) -> Optional[str]:
+    """First ICAO station identifier written in capitals, if any."""
+    for match in _ICAO_RE.finditer(text):
+        if match.group(0) not in _NOT_STATIONS:
+            return match.group(0)
+    return None
+
+
+# -------------------------------------------------------------------
+# Embedding-centroid classifier
+# -------------------------------------------------------------------
+class CentroidClassifier:
+    """
+    Nearest-centroid route classifier over sentence embeddings.
+    Centroids are built once from ROUTE_EXEMPLARS with a single batched call.
+    """
+
+    def __init__(self, embed_documents: Callable[[List[str]], List[List[float]]],
+                 exemplars: Dict[str, List[str]] = None, min_score: float = 0.35):
+        exemplars = exemplars or ROUTE_EXEMPLARS
+        self.min_score = min_score
+        self.labels = list(exemplars)
+
+        texts, owners = [], []
+        for label, examples in exemplars.items():
+            texts.extend(examples)
+            owners.extend([label] * len(examples))
+
+        vecs = _unit(np.asarray(embed_documents(texts), dtype=np.float32))
+        owners = np.asarray(owners)
+        self.centroids = _unit(np.stack([vecs[owners == label].mean(axis=0) for label in self.labels]))
+
+    def classify(self, query_vec) -> Optional[str]:
+        scores = self.centroids @ _unit(np.asarray(query_vec, dtype=np.float32))
+        best = int(np.argmax(scores))
+        return self.labels[best] if scores[best] >= self.min_score else None
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norm, 1e-12)
+
+
+# -------------------------------------------------------------------
+# Router
+# -------------------------------------------------------------------
+class QueryRouter:
+    """Keyword rules, then (optionally) the embedding-centroid classifier."""
+
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings
+        self._classifier = None
+
+    def route(self, query: str):
+        """
+        Pick a route for a query
+
+        Returns:
+            (Route, query embedding or None). The embedding is returned so
+            retrieval can reuse it instead of encoding the query twice.
+        """
+        for name, pattern in KEYWORD_RULES:
+            if pattern.search(query):
+                return ROUTES[name], None
+
+        if self.embeddings is None:
+            return ROUTES[DEFAULT_ROUTE], None
+
+        if self._classifier is None:
+            self._classifier = CentroidClassifier(self.embeddings.embed_documents)
+
+        vec = self.embeddings.embed_query(query)
+        name = self._classifier.classify(vec) or DEFAULT_ROUTE
+        return ROUTES[name], vec
+
+
+def route_query(query: str) -> str:
+    """Route name from keyword rules only (no model load)."""
+    return QueryRouter().route(query)[0].name
+
+
+def _metar_context(query: str, icao: Optional[str]) -> str:
+    from src.integrations.aviation_weather import get_metar, decode_metar, explain_metar_groups
+
+    report = _REPORT_RE.search(query)
+    if report:
+        raw = report.group(0).strip()
+    else:
+        station = icao or extract_station(query)
+        raw = get_metar(station) if station else None
+
+    parts = []
+    if raw:
+        parts.extend([raw, decode_metar(raw)])
+    groups = "" if report else explain_metar_groups(query)
+    if groups:
+        parts.append(groups)
+    return "\n".join(parts) if parts else "Not available"
+
+
+def _telemetry_context(sim) -> str:
+    if sim is None:
+        return "Not available"
+    if hasattr(sim, "get_trend_summary"):
+        return sim.get_trend_summary()
+    return sim.get_contextual_summary()
+
+
+def answer_procedure(query: str, procedures=None) -> Optional[Dict]:
+    """
+    Fast path for emergency questions: verbatim checklist lookup.
+
+    Returns:
+        Answer dictionary, or None when the question is not an emergency
+        or no procedure title matches confidently
+    """
+    if procedures is None:
+        procedures = get_procedure_index()
+    if not procedures or route_query(query) != "emergency":
+        return None
+
+    match = procedures.lookup(query)
+    if match is None:
+        return None
+
+    p = match.procedure
+    return {
+        "answer": format_procedure(match),
+        "route": "procedure",
+        "sources": [{"content": p.text[:300] + "...", "metadata": {"source": p.source, "page": p.page}}],
+        "num_sources": 1,
+        "metar": None,
+        "telemetry": None,
+        "match_score": match.score,
+    }
+
+
+def routed_prompt(query: str, route: Route, engine, query_vec=None, icao: str = None,
+                  sim=None, filter=None, docs=None, metar: str = None):
+    """
+    Fetch what a route needs (chunks, METAR, telemetry) concurrently and
+    format its prompt
+
+    Args:
+        query_vec: Query embedding from the router (reused for retrieval)
+        docs: Chunks already retrieved for this query (retrieval is skipped)
+        metar: METAR context already fetched (the fetch is skipped)
+
+    Returns:
+        (prompt, docs, metar, telemetry)
+    """
+    need_docs = route.retrieval and docs is None
+    need_metar = route.metar and metar is None
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        docs_f = pool.submit(engine.retrieve, query, None, query_vec, filter) if need_docs else None
+        metar_f = pool.submit(_metar_context, query, icao) if need_metar else None
+        telem_f = pool.submit(_telemetry_context, sim) if route.telemetry else None
+
+        if docs_f:
+            docs = docs_f.result()
+        if metar_f:
+            metar = metar_f.result()
+        telemetry = telem_f.result() if telem_f else "Not available"
+
+    docs = docs if route.retrieval else []
+    metar = metar if route.metar else "Not available"
+    context = "\n\n".join(d.page_content for d in docs)
+    prompt = format_prompt(
+        route.prompt,
+        context=context,
+        question=query,
+        metar=metar,
+        weather=metar,
+        telemetry=telemetry,
+    )
+    return prompt, docs, metar, telemetry
+
+
+def answer_routed(query: str, engine=None, router: QueryRouter = None,
+                  icao: str = None, sim=None, procedures=None, filter=None,
+                  on_token: Callable[[str], None] = None) -> Dict:
+    """
+    Answer a question through the matching specialised prompt.
+
+    Args:
+        query: Pilot question
+        engine: Loaded RAGEngine (created if not given)
+        router: QueryRouter (one bound to the engine's embeddings if not given)
+        icao: Station to fetch METAR for (otherwise detected in the question)
+        sim: MSFSContext for telemetry (otherwise "Not available")
+        procedures: ProcedureIndex for the emergency fast path
+                    (defaults to the one written by ingest, if any)
+        filter: MetadataFilter restricting retrieval (e.g. to one POH)
+        on_token: Called with each piece of text as it is generated
+                  (a verbatim checklist arrives in one piece)
+
+    Returns:
+        Dictionary with answer, route, sources, metar and telemetry used
+    """
+    fast = answer_procedure(query, procedures)
+    if fast is not None:
+        if on_token:
+            on_token(fast["answer"])
+        return fast
+
+    if engine is None:
+        from src.rag.chain import RAGEngine
+        engine = RAGEngine()
+    if router is None:
+        router = QueryRouter(engine.embeddings)
+
+    route, query_vec = router.route(query)
+    prompt, docs, metar, telemetry = routed_prompt(query, route, engine, query_vec, icao, sim, filter)
+
+    if on_token is None:
+        answer = engine.generate(prompt)
+    else:
+        pieces = []
+        for text in engine.generate_stream(prompt):
+            pieces.append(text)
+            on_token(text)
+        answer = "".join(pieces)
+
+    return {
+        "answer": answer,
+        "route": route.name,
+        "sources": [
+            {"content": d.page_content[:300] + "...", "metadata": d.metadata}
+            for d in docs
+        ],
+        "num_sources": len(docs),
+        "metar": metar if route.metar else None,
+        "telemetry": telemetry if route.telemetry else None,
+    }
@@ -0,0 +1,169 @@
+"""
+service.py — Long-running RAG service with zero-downtime index hot-swap
+- Holds the active RAGEngine for the process
+- Watches the index CURRENT pointer (or reloads on demand)
+- Loads a new index version in the background, reusing the warm
+  embedding model and LLM, and swaps it in atomically
+- The old engine is retired only after its in-flight queries drain
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Optional
+
+from src.data.index_store import IndexStore, IndexManifestError
+from src.rag.chain import INDEX_DIR, RAGEngine
+from src.utils import instrumentation as inst
+
+WATCH_INTERVAL = float(os.getenv("FLIGHTLENS_INDEX_WATCH_S", "10"))   # 0 = reload on request only
+
+
+class _Slot:
+    """An engine plus the number of queries currently using it."""
+
+    def __init__(self, engine: RAGEngine):
+        self.engine = engine
+        self.refs = 0
+        self.retired = False
+
+
+class RAGService:
+    """
+    Process-wide owner of the active RAGEngine.
+
+    Usage:
+        with service.acquire() as engine:
+            answer, docs = engine.answer(query)
+    """
+
+    def __init__(self, engine_factory: Callable[..., RAGEngine] = RAGEngine,
+                 store: IndexStore = None, drain_timeout: float = 60.0):
+        self._factory = engine_factory
+        self.store = store or IndexStore(INDEX_DIR)
+        self.drain_timeout = drain_timeout
+
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._slot = _Slot(engine_factory())
+        self._reloading = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def engine(self) -> RAGEngine:
+        return self._slot.engine
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._slot.engine.index_version
+
+    # ------------------------------------------------------------------
+    # Query side
+    # ------------------------------------------------------------------
+    @contextmanager
+    def acquire(self):
+        """Pin the current engine for the duration of one query."""
+        with self._lock:
+            slot = self._slot
+            slot.refs += 1
+        try:
+            with inst.track_inflight("rag_inflight_requests"):
+                yield slot.engine
+        finally:
+            with self._lock:
+                slot.refs -= 1
+                if slot.retired and slot.refs == 0:
+                    self._drained.notify_all()
+
+    def answer(self, query: str, filter=None, on_token=None):
+        with self.acquire() as engine:
+            return engine.answer(query, filter=filter, on_token=on_token)
+
+    def answer_batch(self, queries, filter=None):
+        with self.acquire() as engine:
+            return engine.answer_batch(queries, filter=filter)
+
+    # ------------------------------------------------------------------
+    # Reload side
+    # ------------------------------------------------------------------
+    def reload(self, block: bool = False) -> Optional[threading.Thread]:
+        """
+        Load the CURRENT index version if it differs from the active one.
+
+        Args:
+            block: Wait for load + swap + drain instead of running in the background
+        """
+        if block:
+            self._reload()
+            return None
+        thread = threading.Thread(target=self._reload, name="index-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def _reload(self):
+        if not self._reloading.acquire(blocking=False):
+            return  # a reload is already in progress
+        try:
+            old = self._slot.engine
+            target = self.store.current_version()
+            if old.shards is None and target == old.index_version:
+                return  # sharded engines always reload (shards swap individually)
+            try:
+                new_engine = self._factory(
+                    index_version=target,
+                    embeddings=old.embeddings,
+                    llm=old.llm,
+                )
+            except IndexManifestError as e:
+                print(f"⚠️  Index version {target} rejected: {e}")
+                return
+
+            with self._lock:
+                old_slot = self._slot
+                self._slot = _Slot(new_engine)
+                old_slot.retired = True
+                print(f"✅ Swapped index {old.index_version} → {target}")
+                inst.inc("index_swaps_total")
+
+                # Drain: wait for queries still pinned to the old engine
+                drained = self._drained.wait_for(lambda: old_slot.refs == 0, timeout=self.drain_timeout)
+
+            if drained:
+                # Release the old index, retriever, chain and filter bitmaps
+                # (embeddings + LLM live on in the new engine)
+                old_slot.engine.close()
+            else:
+                print(f"⚠️  {old_slot.refs} queries still running on index {old.index_version}; "
+                      "leaving it to the garbage collector")
+        finally:
+            self._reloading.release()
+
+    def start_watching(self, interval: float = 10.0):
+        """Poll the CURRENT pointer and hot-swap new versions as they are published."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                if self.engine.shards is None and self.store.current_version() != self.version:
+                    self._reload()
+
+        self._watcher = threading.Thread(target=watch, name="index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+
+@lru_cache(maxsize=1)
+def get_service() -> RAGService:
+    """
+    The process-wide RAG service (engine loaded on first use), watching
+    for newly published index versions every FLIGHTLENS_INDEX_WATCH_S seconds
+    """
+    service = RAGService()
+    if WATCH_INTERVAL > 0:
+        service.start_watching(WATCH_INTERVAL)
+    return service
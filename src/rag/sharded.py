@@ -0,0 +1,115 @@
+"""
+sharded.py — Fan-out search over per-manual FAISS shards
+- Loads every shard listed in the registry written by src/data/shards.py
+- Searches shards concurrently in a thread pool (FAISS releases the GIL)
+- Merges per-shard top-k with a heap
+- Source filters prune whole shards before searching
+"""
+
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from src.data.shards import SHARD_DIR, load_registry
+from src.rag.filtering import FilteredSearch, MetadataFilter
+from src.utils import instrumentation as inst
+
+
+class Shard:
+    def __init__(self, name: str, db, sources: List[str]):
+        self.name = name
+        self.db = db
+        self.sources = set(sources)
+        self._filtered = None
+
+    @property
+    def filtered(self) -> FilteredSearch:
+        if self._filtered is None:
+            self._filtered = FilteredSearch(self.db)
+        return self._filtered
+
+
+class ShardedIndex:
+    """Concurrent top-k search across FAISS shards."""
+
+    def __init__(self, shards: List[Shard], max_workers: int = None):
+        self.shards = shards
+        workers = max_workers or min(len(shards), os.cpu_count() or 1) or 1
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard")
+
+    def __len__(self):
+        return len(self.shards)
+
+    def close(self):
+        """Stop the search threads (the index is unusable afterwards)."""
+        self._pool.shutdown(wait=True)
+
+    @classmethod
+    def load(cls, embeddings, shard_dir: str = SHARD_DIR, max_workers: int = None) -> "ShardedIndex":
+        from langchain_community.vectorstores import FAISS
+
+        registry = load_registry(shard_dir)
+        if not registry["shards"]:
+            raise FileNotFoundError(f"No shards registered in {shard_dir}")
+
+        shards = []
+        for name, entry in sorted(registry["shards"].items()):
+            db = FAISS.load_local(
+                str(Path(shard_dir) / entry["path"]),
+                embeddings,
+                allow_dangerous_deserialization=True
+            )
+            shards.append(Shard(name, db, entry["sources"]))
+        print(f"Loaded {len(shards)} FAISS shards from: {shard_dir}")
+        return cls(shards, max_workers=max_workers)
+
+    def _search_shard(self, shard: Shard, x: np.ndarray, k: int, flt: Optional[MetadataFilter]):
+        import faiss
+
+        inst.add_gauge("shard_queue_depth", -1)
+        index = shard.db.index
+        q = x.copy()
+        if getattr(shard.db, "_normalize_L2", False):
+            faiss.normalize_L2(q)
+
+        needs_filter = flt is not None and not flt.is_empty() and not (
+            flt.page_range is None and flt.section is None and shard.sources <= set(flt.sources())
+        )
+        with inst.span("rag.shard_search", shard=shard.name, filtered=needs_filter):
+            if needs_filter:
+                sel = shard.filtered.selector(flt)
+                params = faiss.SearchParameters(sel=sel)
+                dist, ids = index.search(q, k, params=params)
+            else:
+                dist, ids = index.search(q, k)
+
+        # Heap key: smaller is better for both metrics
+        sign = -1.0 if index.metric_type == faiss.METRIC_INNER_PRODUCT else 1.0
+        return [(sign * float(d), shard.name, int(i)) for d, i in zip(dist[0], ids[0]) if i >= 0]
+
+    def search_by_vector(self, embedding: Sequence[float], k: int = 3,
+                         flt: Optional[MetadataFilter] = None) -> List:
+        """Merged top-k Documents across all (matching) shards."""
+        x = np.asarray([embedding], dtype=np.float32)
+
+        shards = self.shards
+        if flt is not None and flt.source is not None:
+            wanted = set(flt.sources())
+            shards = [s for s in shards if s.sources & wanted]
+        if not shards:
+            return []
+
+        inst.add_gauge("shard_queue_depth", len(shards))
+        futures = [self._pool.submit(self._search_shard, s, x, k, flt) for s in shards]
+        hits = heapq.nsmallest(k, (hit for f in futures for hit in f.result()))
+
+        by_name = {s.name: s for s in shards}
+        docs = []
+        for _, name, i in hits:
+            db = by_name[name].db
+            docs.append(db.docstore.search(db.index_to_docstore_id[i]))
+        return docs
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.uia import asr
+from src.uia.asr import ASRBackendError, backend_available, load_backend, word_error_rate, word_errors
+
+
+def test_word_errors():
+    assert word_errors("Squawk seven zero zero zero", "squawk seven zero zero zero.") == 0
+    assert word_errors("wind two niner zero", "wind two nine zero") == 1       # substitution
+    assert word_errors("tune tower now", "tune tower") == 1                    # deletion
+    assert word_errors("tune tower", "please tune the tower") == 2             # insertions
+
+
+def test_corpus_wer_weights_by_reference_length():
+    refs = ["one two three four", "five"]
+    hyps = ["one two three four", "six"]
+    assert word_error_rate(refs, hyps) == pytest.approx(1 / 5)
+
+
+def test_unknown_backend():
+    with pytest.raises(ASRBackendError):
+        load_backend("whisper.cpp", "base")
+
+
+def test_backend_available_checks_the_configured_packages(monkeypatch):
+    monkeypatch.setitem(asr.BACKENDS, "stdlib", type("Stdlib", (), {"requires": ("json", "wave")}))
+    monkeypatch.setitem(asr.BACKENDS, "missing", type("Missing", (), {"requires": ("json", "no_such_asr")}))
+    assert backend_available("stdlib")
+    assert not backend_available("missing")
+    assert not backend_available("whisper.cpp")
+
+
+def test_fixture_clips_cover_every_transcript():
+    from src.bench.asr import load_fixtures, load_transcripts
+
+    clips = load_fixtures()
+    assert [c[0] for c in clips] == [t["id"] for t in load_transcripts()]
+    assert all(1.0 < len(audio) / 16000 < 10.0 for _, audio, _ in clips)
@@ -0,0 +1,54 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.corpus import make_chunks, make_pages, write_pdf
+from src.bench.run import compare, run_benchmarks
+
+
+def test_synthetic_corpus_is_deterministic_pdf(tmp_path):
+    pages = make_pages(3, seed=1)
+    assert pages == make_pages(3, seed=1) and pages != make_pages(3, seed=2)
+    assert all(page.startswith("SECTION 1\n") and re.search(r"^1\. .+ -- ", page, re.M) for page in pages)
+    assert {c["metadata"]["source"] for c in make_chunks(8)} == {f"synthetic_{i}.pdf" for i in range(4)}
+
+    data = write_pdf(pages, tmp_path / "poh.pdf").read_bytes()
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+    assert b"/Count 3" in data
+    # xref offsets point at the objects they name
+    xref = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+    offsets = [int(line[:10]) for line in data[xref:].split(b"\n")[3:]
+               if re.fullmatch(rb"\d{10} 00000 n ", line)]
+    assert len(offsets) == 3 + 2 * len(pages)     # catalog, page tree, font + content/page per page
+    assert [data[o:].split(b" ", 1)[0] for o in offsets] == [str(n).encode() for n in range(1, len(offsets) + 1)]
+
+
+def test_synthetic_pdf_parses(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    path = write_pdf(make_pages(2), tmp_path / "poh.pdf")
+    text = pypdf.PdfReader(str(path)).pages[0].extract_text()
+    assert "SECTION 1" in text
+
+
+def test_offline_benchmark_run_and_compare(capsys):
+    report = run_benchmarks(sizes=(200,), pages=5, embed_chunks=40)
+    stages = report["stages"]
+
+    assert report["meta"]["embedder"] == "hashing-384"
+    assert stages["chunking"]["pages"] == 5 and stages["chunking"]["chunks"] > 0
+    assert stages["embedding"] == {**stages["embedding"], "chunks": 40, "dimension": 384}
+    assert stages["index"]["sizes"]["200"]["p50_ms"] > 0
+    assert stages["generation"] == {"skipped": "run with --models"}
+    assert "pages_per_s" in stages["parse"] or stages["parse"]["skipped"].endswith("pypdf")
+
+    slower = {"stages": {**stages, "embedding": {**stages["embedding"],
+                                                  "chunks_per_s": stages["embedding"]["chunks_per_s"] / 2}}}
+    assert compare(report, report) == []
+    assert compare(report, slower) == ["embedding.chunks_per_s"]
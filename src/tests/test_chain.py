@@ -0,0 +1,70 @@
+import queue
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rag import chain
+from src.rag.chain import RAGEngine
+
+
+class FakeStreamer:
+    """Queue-backed stand-in for transformers.TextIteratorStreamer."""
+
+    def __init__(self, tokenizer, skip_prompt=False, timeout=None, **kwargs):
+        self.queue, self.timeout = queue.Queue(), timeout
+
+    def put(self, text):
+        self.queue.put(text)
+
+    def end(self):
+        self.queue.put(None)
+
+    def __iter__(self):
+        while (text := self.queue.get(timeout=self.timeout)) is not None:
+            yield text
+
+
+def _engine(generate):
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.llm = types.SimpleNamespace(pipeline=types.SimpleNamespace(
+        tokenizer=lambda prompt, **kwargs: {"input_ids": prompt},
+        model=types.SimpleNamespace(generate=generate),
+    ))
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def fake_transformers(monkeypatch):
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(TextIteratorStreamer=FakeStreamer))
+
+
+def test_stream_yields_tokens():
+    def generate(input_ids, streamer, **kwargs):
+        for word in ("Mixture ", "rich."):
+            streamer.put(word)
+        streamer.end()
+
+    assert list(_engine(generate).generate_stream("prompt")) == ["Mixture ", "rich."]
+
+
+def test_failing_model_raises_instead_of_hanging(monkeypatch):
+    def generate(input_ids, streamer, **kwargs):
+        streamer.put("Mixture ")
+        raise RuntimeError("CUDA out of memory")
+
+    stream = _engine(generate).generate_stream("prompt")
+    assert next(stream) == "Mixture "
+    with pytest.raises(RuntimeError, match="out of memory"):
+        next(stream)
+
+    # a model that stalls without raising times out
+    monkeypatch.setattr(chain, "STREAM_TIMEOUT", 0.05)
+    with pytest.raises(TimeoutError):
+        list(_engine(lambda input_ids, streamer, **kwargs: None).generate_stream("prompt"))
@@ -0,0 +1,57 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils import files
+from src.utils.chunk_store import ChunkStore, chunk_store_to_jsonl, write_chunk_store
+
+CHUNKS = [
+    {"text": "ENGINE FIRE DURING FLIGHT\n1. Mixture -- IDLE CUT OFF",
+     "metadata": {"source": "poh.pdf", "page": 40, "section": "3 > ENGINE FIRE", "block_type": "checklist"}},
+    {"text": "Stall speed increases with bank angle ✈", "metadata": {"source": "phak.pdf", "page": None}},
+    {"text": "", "metadata": {"source": "poh.pdf", "page": 41, "tags": ["a", 1]}},
+]
+
+
+def test_roundtrip_random_access_and_columns(tmp_path):
+    path = write_chunk_store(tmp_path / "chunks.bin", CHUNKS)
+    with ChunkStore(path) as store:
+        assert len(store) == 3
+        assert list(store) == CHUNKS
+        assert store[-2] == CHUNKS[1] and store[1:] == CHUNKS[1:]
+        assert store.text(1) == CHUNKS[1]["text"]
+        assert bytes(store.text_bytes(0)).startswith(b"ENGINE FIRE")
+        assert store.values("source") == ["phak.pdf", "poh.pdf"]
+        assert store.column("source").tolist() == [1, 0, 1]
+        assert store.column("page")[0] == 40 and store.column("section")[1] < 0
+        assert store.value("page", 1) is None and store.value("tags", 2) == ["a", 1]
+        with pytest.raises(IndexError):
+            store[3]
+
+        batches = list(store.iter_batches(2, fields=["page"]))
+        assert [list(b["ids"]) for b in batches] == [[0, 1], [2]]
+        assert batches[1]["text"] == [""] and batches[1]["page"].tolist() == [41]
+
+    back = chunk_store_to_jsonl(path, tmp_path / "back.jsonl")
+    assert list(files.read_jsonl(back)) == CHUNKS
+
+
+def test_loaders_prefer_fresh_store(tmp_path):
+    jsonl = tmp_path / "chunks.jsonl"
+    files.write_jsonl(jsonl, CHUNKS)
+    assert files.open_chunk_store(jsonl) is None
+
+    write_chunk_store(files.chunk_store_path(jsonl), CHUNKS[:2])
+    assert files.read_chunks(jsonl) == CHUNKS[:2]           # store is newer
+    assert files.read_chunk_texts(jsonl) == [c["text"] for c in CHUNKS[:2]]
+
+    later = os.stat(files.chunk_store_path(jsonl)).st_mtime + 10
+    os.utime(jsonl, (later, later))                           # JSONL rewritten after the store
+    assert files.read_chunks(jsonl) == CHUNKS
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.data.chunker import chunk_document
+
+CHECKLIST = """ENGINE FIRE DURING FLIGHT
+1. Mixture -- IDLE CUT OFF
+2. Fuel Shutoff Valve -- OFF (Pull Out)
+3. Master Switch -- OFF
+4. Forced Landing -- EXECUTE"""
+
+PAGES = [
+    ("SECTION 3\nEMERGENCY PROCEDURES\n\n" + CHECKLIST + "\n", 40),
+    ("SECTION 4\nNORMAL PROCEDURES\n\n" + "The fuel system feeds both tanks to the engine. " * 40, 41),
+]
+
+
+def test_procedures_intact_with_section_metadata():
+    chunks = chunk_document(PAGES, "poh.pdf", max_chars=600)
+
+    fire = [c for c in chunks if CHECKLIST in c.text]
+    assert len(fire) == 1
+    assert fire[0].metadata["section"].startswith("SECTION 3 > EMERGENCY PROCEDURES")
+    assert fire[0].metadata["block_type"] == "procedure"
+    assert fire[0].metadata["page"] == 40
+
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert all(c.metadata["chunk_count"] == len(chunks) for c in chunks)
+    assert all(len(c.text) <= 600 for c in chunks if c.metadata["block_type"] == "text")
+
+    # No overlap: body text is embedded once
+    body = "".join(c.text for c in chunks if c.metadata["page"] == 41)
+    assert body.count("The fuel system") == 40
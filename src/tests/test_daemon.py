@@ -0,0 +1,128 @@
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src import daemon
+
+
+class FakeService:
+    """Stands in for RAGService: streams a fixed answer, counts loads and reloads."""
+
+    version = "v1"
+
+    def __init__(self):
+        self.queries = []
+        self.reloads = 0
+
+    def answer(self, query, filter=None, on_token=None):
+        self.queries.append((query, filter))
+        if query == "boom":
+            raise RuntimeError("index missing")
+        answer = "Mixture idle cut off."
+        for token in answer.split(" "):
+            if on_token:
+                on_token(token + " ")
+        doc = types.SimpleNamespace(page_content="ENGINE FIRE", metadata={"source": "poh.pdf", "page": 40})
+        return answer, [doc]
+
+    @contextmanager
+    def acquire(self):
+        yield self
+
+    def reload(self):
+        self.reloads += 1
+
+    def start_watching(self, interval):
+        pass
+
+    def stop_watching(self):
+        pass
+
+
+@pytest.fixture
+def running(tmp_path):
+    path, service, ready = tmp_path / "fl.sock", FakeService(), threading.Event()
+    server = daemon.FlightLensDaemon(path, service=service)
+    thread = threading.Thread(target=server.serve, kwargs={"ready": ready}, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield path, service
+    if daemon.is_running(path):
+        daemon.request("shutdown", path)
+    thread.join(5)
+
+
+def test_query_streams_tokens_then_result(running):
+    path, service = running
+    tokens = []
+    result = daemon.query("engine fire", path, on_token=tokens.append, source="poh.pdf", page_range=[40, 45])
+
+    assert "".join(tokens).strip() == result["answer"] == "Mixture idle cut off."
+    assert result["sources"][0]["metadata"]["page"] == 40
+    assert result["index_version"] == "v1"
+    flt = service.queries[0][1]
+    assert flt.source == "poh.pdf" and flt.page_range == (40, 45)
+
+
+def test_errors_status_reload_and_shutdown(running):
+    path, service = running
+    with pytest.raises(daemon.DaemonError, match="index missing"):
+        daemon.query("boom", path)
+    with pytest.raises(daemon.DaemonError, match="Unknown op"):
+        daemon.request("explode", path)
+
+    assert daemon.request("reload", path)["reloading"] and service.reloads == 1
+    assert daemon.request("status", path)["requests"] == 4
+
+    daemon.request("shutdown", path)
+    for _ in range(50):
+        if not path.exists():
+            break
+        threading.Event().wait(0.05)
+    assert not daemon.is_running(path)
+    assert daemon.query("engine fire", path) is None
+
+
+def test_socket_must_belong_to_this_user(running, monkeypatch):
+    path, service = running
+    monkeypatch.setattr(daemon, "_uid", lambda: path.stat().st_uid + 1)
+    with pytest.raises(daemon.DaemonUnavailable, match="owned by uid"):
+        daemon.request("status", path)
+    assert daemon.query("engine fire", path) is None      # falls back to in-process
+    assert service.queries == []
+
+
+def test_socket_directory_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert daemon.default_socket_path() == tmp_path / "flightlens.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert daemon.default_socket_path().parent.name.startswith("flightlens-")
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    with pytest.raises(SystemExit, match="not writable by others"):
+        daemon.FlightLensDaemon(shared / "fl.sock", service=FakeService()).serve()
+
+
+def test_cli_reports_daemon_errors(monkeypatch, capsys):
+    from src import cli
+
+    def failing_query(text, on_token=None, **params):
+        on_token("Mixture ")
+        raise daemon.DaemonError("RuntimeError: index missing")
+
+    monkeypatch.setattr(daemon, "query", failing_query)
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["query", "engine fire"])
+    assert exit_info.value.code == 1
+    assert "Error: RuntimeError: index missing" in capsys.readouterr().err
@@ -0,0 +1,77 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils import files
+
+ITEMS = [{"text": f"Checklist step {i} ✈", "metadata": {"source": "poh.pdf", "page": i}} for i in range(500)]
+
+
+@pytest.mark.parametrize("name", ["items.jsonl", "items.jsonl.gz"])
+def test_roundtrip_and_count(tmp_path, name):
+    path = tmp_path / name
+    assert files.write_jsonl(path, iter(ITEMS)) == len(ITEMS)
+    assert list(files.read_jsonl(path)) == ITEMS
+    assert files.count_jsonl_lines(path) == len(ITEMS)
+
+
+def test_count_without_trailing_newline(tmp_path):
+    path = tmp_path / "a.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"a": 2}')
+    assert files.count_jsonl_lines(path) == 2
+    path.write_bytes(b"")
+    assert files.count_jsonl_lines(path) == 0
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "items.jsonl"
+    files.write_jsonl(path, ITEMS[:3])
+
+    def broken():
+        yield ITEMS[0]
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        files.write_jsonl(path, broken())
+    assert list(files.read_jsonl(path)) == ITEMS[:3]
+    assert [p.name for p in tmp_path.iterdir()] == ["items.jsonl"]
+
+
+def test_atomic_write_permissions(tmp_path, monkeypatch):
+    path = tmp_path / "items.jsonl"
+    old_umask = os.umask(0o027)
+    try:
+        files.write_jsonl(path, ITEMS[:1])
+    finally:
+        os.umask(old_umask)
+    assert path.stat().st_mode & 0o777 == 0o640          # umask applied, not mkstemp's 0600
+
+    path.chmod(0o604)
+    files.write_jsonl(path, ITEMS[:2])
+    assert path.stat().st_mode & 0o777 == 0o604          # replaced file keeps its mode
+
+    def chmod_fails(*args):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(files.os, "chmod", chmod_fails)
+    with pytest.raises(PermissionError):
+        files.write_jsonl(path, ITEMS)
+    assert [p.name for p in tmp_path.iterdir()] == ["items.jsonl"]
+    assert len(list(files.read_jsonl(path))) == 2
+
+
+def test_parallel_reader_keeps_order(tmp_path):
+    path = tmp_path / "items.jsonl"
+    files.write_jsonl(path, ITEMS)
+    for parts in (2, 3, 7):
+        ranges = files._line_ranges(path, parts)
+        assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+        assert sum(len(files._parse_range(path, a, b)) for a, b in ranges) == len(ITEMS)
+    assert files.read_jsonl_parallel(path, workers=3, min_bytes=0) == ITEMS
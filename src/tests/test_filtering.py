@@ -0,0 +1,91 @@
+import json
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rag.filtering import SELECTOR_CACHE_SIZE, FilteredSearch, MetadataFilter
+
+CHUNKS = [
+    ("poh.pdf", 10, "3 Emergency/3.2 Engine"),
+    ("poh.pdf", 11, "3 Emergency/3.3 Fire"),
+    ("poh.pdf", 40, "4 Normal/4.1 Preflight"),
+    ("afh.pdf", 10, "3 Emergency/3.2 Engine"),
+    ("afh.pdf", 55, "5 Takeoff"),
+]
+
+
+def _flat_db():
+    """LangChain-shaped FAISS store: flat index + docstore, one vector per chunk."""
+    import faiss
+
+    vectors = np.eye(len(CHUNKS), 8, dtype=np.float32)
+    index = faiss.IndexFlatL2(8)
+    index.add(vectors)
+    docs = {
+        f"id{i}": types.SimpleNamespace(page_content=f"chunk {i}",
+                                        metadata={"source": s, "page": p, "section": sec})
+        for i, (s, p, sec) in enumerate(CHUNKS)
+    }
+    return types.SimpleNamespace(
+        index=index,
+        index_to_docstore_id={i: f"id{i}" for i in range(len(CHUNKS))},
+        docstore=types.SimpleNamespace(search=docs.get),
+    ), vectors
+
+
+def _contents(docs):
+    return sorted(d.page_content for d in docs)
+
+
+def test_filters_from_json_are_hashable():
+    request = json.loads('{"source": ["poh.pdf", "afh.pdf"], "page_range": [10, 12]}')
+    flt = MetadataFilter(**request)
+    assert flt == MetadataFilter(source=("poh.pdf", "afh.pdf"), page_range=(10, 12))
+    assert hash(flt) == hash(MetadataFilter(source=("poh.pdf", "afh.pdf"), page_range=(10, 12)))
+
+
+def test_bitmap_selection_by_source_page_and_section():
+    db, vectors = _flat_db()
+    fs = FilteredSearch(db)
+    query = vectors[0]
+
+    assert _contents(fs.search_by_vector(query, 5, MetadataFilter(source="afh.pdf"))) == ["chunk 3", "chunk 4"]
+    assert _contents(fs.search_by_vector(query, 5, MetadataFilter(page_range=[10, 11]))) == \
+        ["chunk 0", "chunk 1", "chunk 3"]
+    assert _contents(fs.search_by_vector(query, 5, MetadataFilter(section="3 Emergency/3.2"))) == \
+        ["chunk 0", "chunk 3"]
+
+    combined = MetadataFilter(source=["poh.pdf"], page_range=(10, 40), section="3 Emergency")
+    assert _contents(fs.search_by_vector(query, 5, combined)) == ["chunk 0", "chunk 1"]
+    # same filter rebuilt from a list hits the bitmap cache
+    fs.search_by_vector(query, 5, MetadataFilter(source=("poh.pdf",), page_range=[10, 40], section="3 Emergency"))
+    assert len(fs._bitmaps) == 4
+    assert fs.search_by_vector(query, 5, MetadataFilter(source="missing.pdf")) == []
+
+
+def test_selector_cache_evicts_without_freeing_live_bitmaps():
+    import gc
+
+    db, vectors = _flat_db()
+    fs = FilteredSearch(db)
+    filters = [MetadataFilter(page_range=(lo, 60)) for lo in range(SELECTOR_CACHE_SIZE + 50)]
+
+    for lo, flt in enumerate(filters):
+        expected = [f"chunk {i}" for i, (_, page, _) in enumerate(CHUNKS) if page >= lo]
+        assert _contents(fs.search_by_vector(vectors[0], 5, flt)) == expected
+        gc.collect()
+
+    assert len(fs._bitmaps) == SELECTOR_CACHE_SIZE
+    assert filters[0] not in fs._bitmaps and filters[-1] in fs._bitmaps
+    # an evicted selector still holds its own bitmap
+    sel = fs.selector(filters[0])
+    del fs._bitmaps[filters[0]]
+    gc.collect()
+    assert sel.is_member(0) and not sel.is_member(len(CHUNKS))
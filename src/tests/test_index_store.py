@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.data.index_store import INDEX_FILES, IndexManifestError, IndexStore
+
+
+def test_legacy_index_dimension_is_checked(tmp_path):
+    import faiss
+
+    index = faiss.IndexFlatL2(384)
+    index.add(np.zeros((2, 384), dtype=np.float32))
+    faiss.write_index(index, str(tmp_path / INDEX_FILES[0]))
+    store = IndexStore(str(tmp_path))
+
+    assert store.current_version() is None and store.index_dimension() == 384
+    assert store.check("all-MiniLM-L6-v2", fingerprint={"name": "all-MiniLM-L6-v2", "dimension": 384}) is None
+    with pytest.raises(IndexManifestError, match="dimension 384 .* produces 768"):
+        store.check("all-mpnet-base-v2", fingerprint={"name": "all-mpnet-base-v2", "dimension": 768})
+
+
+def test_versions_are_ordered_by_build_sequence(tmp_path):
+    store = IndexStore(str(tmp_path))
+    names = ["20261019_120000", "20261019_120000_2", "20261019_120000_10", "20261019_120001"]
+    for name in reversed(names):
+        (store.versions_dir / name).mkdir(parents=True)
+
+    assert store.list_versions() == names
+    store._set_current(names[0])
+    store.prune(keep=2)
+    assert store.list_versions() == [names[0], names[2], names[3]]
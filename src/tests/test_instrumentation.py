@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils import instrumentation as inst
+
+
+@pytest.fixture
+def metrics_on():
+    inst.REGISTRY.reset()
+    inst.enable(True)
+    yield inst.REGISTRY
+    inst.enable(False)
+    inst.REGISTRY.reset()
+
+
+def test_disabled_is_noop():
+    inst.enable(False)
+    inst.REGISTRY.reset()
+    with inst.span("rag.answer") as s:
+        s.set(k=3)
+    inst.inc("rag_requests_total")
+    assert inst.REGISTRY.metrics == {} and len(inst.REGISTRY.spans) == 0
+
+
+def test_spans_nest_and_feed_histograms(metrics_on):
+    with inst.span("rag.answer"):
+        with inst.span("rag.retrieve", k=3):
+            pass
+    retrieve, answer = metrics_on.spans
+    assert retrieve.parent_id == answer.span_id and retrieve.trace_id == answer.trace_id
+    assert "rag_retrieve_seconds" in metrics_on.metrics
+
+    otlp = inst.to_otlp_traces()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {s["name"] for s in otlp} == {"rag.answer", "rag.retrieve"}
+
+
+def test_prometheus_text_and_cache_hit_rate(metrics_on):
+    for hit in (True, True, False, True):
+        inst.cache_result("metar", hit)
+    inst.observe("llm_tokens_generated", 40, buckets=inst.TOKEN_BUCKETS)
+
+    text = inst.to_prometheus()
+    assert 'flightlens_cache_lookups_total{cache="metar"} 4.0' in text
+    assert 'flightlens_llm_tokens_generated_bucket{le="64"} 1' in text
+    assert inst.to_json()["cache_hit_rate"]["metar"] == pytest.approx(0.75)
+
+
+def test_metrics_endpoint_starts_once(metrics_on):
+    import urllib.request
+
+    server = inst.serve_if_enabled(port=0)
+    try:
+        assert inst.serve_if_enabled(port=0) is server
+        inst.inc("daemon_requests_total", op="query")
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        assert "daemon_requests_total" in urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+        inst._server = None
+    inst.enable(False)
+    assert inst.serve_if_enabled(port=0) is None
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.importtime import COMMANDS, measure, parse_importtime
+
+
+def test_parse_importtime():
+    rows = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   src.utils.lazy\n"
+        "import time:       300 |        420 | src.rag\n"
+    )
+    assert [(r["module"], r["depth"], r["cumulative_us"]) for r in rows] == [
+        ("src.utils.lazy", 1, 120), ("src.rag", 0, 420)]
+
+
+def test_packages_do_not_load_the_ml_stack():
+    result = measure(COMMANDS["packages"] + "; src.rag.route_query; import src.rag.chain", repeat=1)
+    assert "error" not in result
+    assert result["heavy"] == []
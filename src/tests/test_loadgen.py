@@ -0,0 +1,85 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.bench.loadgen import METAR_TEMPLATES, TELEMETRY_TEMPLATES, Request, build_workload, run_load, summarize
+
+
+class FakeTarget:
+    """Answers in a fixed time; METAR requests fail. Tracks peak concurrency."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.inflight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+        try:
+            time.sleep(self.delay)
+            if request.kind == "metar":
+                raise TimeoutError("weather stub down")
+            return {"answer": "ok"}
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+
+def test_workload_follows_the_mix_and_the_seed():
+    workload = build_workload(1000, {"rag": 0.5, "metar": 0.3, "telemetry": 0.2}, seed=7)
+    counts = {kind: sum(1 for r in workload if r.kind == kind) for kind in ("rag", "metar", "telemetry")}
+    assert sum(counts.values()) == 1000
+    assert 430 < counts["rag"] < 570 and 240 < counts["metar"] < 360 and 140 < counts["telemetry"] < 260
+
+    metar_prefixes = tuple(t.split("{")[0] for t in METAR_TEMPLATES)
+    assert all(r.query.startswith(metar_prefixes) for r in workload if r.kind == "metar")
+    assert all(r.query in TELEMETRY_TEMPLATES for r in workload if r.kind == "telemetry")
+
+    assert build_workload(50, seed=7) == build_workload(50, seed=7)
+    assert build_workload(50, seed=7) != build_workload(50, seed=8)
+    assert {r.kind for r in build_workload(20, {"metar": 1.0})} == {"metar"}
+
+
+def test_summary_of_empty_and_error_only_runs():
+    empty = summarize([], 0.0, [])
+    assert empty["requests"] == 0 and empty["throughput_rps"] == 0.0 and empty["error_rate"] == 0
+    assert empty["latency"] == {"count": 0} and empty["queue_wait_p95_ms"] is None
+    assert empty["cpu_percent_mean"] is None and empty["rss_mb_max"] is None
+
+    failed = [{"kind": "metar", "latency": 0.2, "queued": 0.0, "error": "TimeoutError"}] * 3
+    report = summarize(failed, 2.0, [{"cpu_percent": 50.0, "rss_mb": 120.0}])
+    assert report["error_rate"] == 1.0 and report["errors"] == {"TimeoutError": 3}
+    assert report["throughput_rps"] == 0.0 and report["latency"] == {"count": 0}
+    assert report["by_kind"] == {"metar": {"count": 0, "errors": 3}}
+    assert report["cpu_percent_mean"] == 50.0 and report["rss_mb_max"] == 120.0
+
+
+def test_closed_loop_keeps_every_user_busy():
+    target = FakeTarget()
+    workload = [Request("rag", "What is Vy?"), Request("metar", "METAR at KDFW?")]
+
+    report = run_load(target, workload, concurrency=3, duration=0.3, sample_interval=0.1)
+    assert target.peak == 3
+    assert report["requests"] > 10 and report["errors"] == {"TimeoutError": report["by_kind"]["metar"]["errors"]}
+    assert report["by_kind"]["rag"]["count"] > 0 and 0.3 <= report["error_rate"] <= 0.7
+    assert report["latency"]["p50_ms"] >= 10.0
+    assert report["timeline"] and report["timeline"][0]["throughput_rps"] >= 0
+
+
+def test_open_loop_counts_queueing_from_the_scheduled_arrival():
+    target = FakeTarget(delay=0.05)
+    report = run_load(target, [Request("rag", "What is Vy?")], concurrency=1, rate=100.0,
+                      duration=0.3, sample_interval=0.1)
+
+    # one worker, ~20 req/s of service for ~100 req/s of arrivals: requests wait in the queue
+    assert target.peak == 1 and report["error_rate"] == 0
+    assert report["requests"] > 10 and report["queue_wait_p95_ms"] > 50.0
+    assert report["latency"]["max_ms"] > report["latency"]["p50_ms"] >= 50.0
@@ -6,6 +6,7 @@ project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root)) 
 
+from src.integrations import aviation_weather
 from src.integrations.aviation_weather import get_metar, decode_metar
 
 def test_metar_fetch_and_decode():
@@ -15,5 +16,21 @@ def test_metar_fetch_and_decode():
     decoded = decode_metar(raw)
     print("Decoded METAR:", decoded)
 
+def test_mock_fallback_is_not_cached(monkeypatch):
+    replies = iter([None, "KDFW 191753Z 18012KT 10SM FEW250 27/14 A2998"])
+    calls = []
+
+    def fetch(icao):
+        calls.append(icao)
+        return next(replies)
+
+    monkeypatch.setattr(aviation_weather, "_fetch_metar", fetch)
+    monkeypatch.setattr(aviation_weather, "_metar_cache", {})
+
+    assert get_metar("KDFW") == aviation_weather._get_mock_metar("KDFW")
+    real = get_metar("KDFW")
+    assert "18012KT" in real and get_metar("kdfw") == real
+    assert len(calls) == 2              # providers retried after the mock, then cached
+
 if __name__ == "__main__":
     test_metar_fetch_and_decode()
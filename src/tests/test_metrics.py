@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.evaluate.metrics import breakdown, evaluate_batch, evaluate_pair, rouge_l, score_records
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_batch_matches_pairwise():
+    preds = ["Mixture - IDLE CUTOFF, fuel selector off.", "", "Overcast at 300 ft"]
+    refs = ["Mixture idle cutoff; fuel selector OFF", "10SM", "Overcast cloud layer at 300 feet"]
+    for pred, ref, m in zip(preds, refs, evaluate_batch(preds, refs)):
+        assert {k: m[k] for k in ("f1", "exact_match", "length_ratio")} == evaluate_pair(pred, ref)
+
+
+def test_rouge_l():
+    # LCS "the cat on the mat" = 5 tokens; P = 5/6, R = 5/5
+    assert rouge_l("the cat sat on the mat", "the cat on the mat") == pytest.approx(2 * (5 / 6) / (5 / 6 + 1))
+    assert rouge_l("", "anything") == 0.0
+
+
+def test_semantic_similarity_single_embedding_call_and_breakdown():
+    emb = FakeEmbeddings()
+    records = [
+        {"answer": "a", "ground_truth": "a", "category": "weather", "difficulty": "easy"},
+        {"answer": "b c", "ground_truth": "a", "category": "weather", "difficulty": "hard"},
+    ]
+    score_records(records, embeddings=emb)
+    assert emb.calls == 1
+    assert records[0]["semantic_sim"] == pytest.approx(1.0)
+
+    table = breakdown(records)
+    assert table["category"]["weather"]["n"] == 2
+    assert table["difficulty"]["easy"]["f1"] == 1.0
@@ -0,0 +1,63 @@
+import sys
+import threading
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.integrations import aviation_weather
+from src.uia.normalizer import AviationNormalizer, manual_terms
+
+
+def test_canonical_forms():
+    n = AviationNormalizer(prefetch_metar=False)
+    cases = {
+        "What's the meter at kilo delta foxtrot whiskey?": "What's the METAR at KDFW?",
+        "Is OVC zero zero three below minimums?": "Is OVC003 below minimums?",
+        "Tune tower on one one eight point three and squawk seven zero zero zero.":
+            "Tune tower on 118.3 and squawk 7000.",
+        "wind two niner zero at one five, runway two seven": "wind 290 at 15, runway 27",
+        "Is it V F R at K D F W": "Is it VFR at KDFW",
+        # lone numbers / phonetic words stay as spoken
+        "one engine inoperative, taxi via alpha": "one engine inoperative, taxi via alpha",
+    }
+    for spoken, canonical in cases.items():
+        assert n(spoken) == canonical
+        assert n(canonical) == canonical          # idempotent
+
+
+def test_station_triggers_metar_prefetch(monkeypatch):
+    fetched = threading.Event()
+
+    def fake_get_metar(station):
+        fetched.set()
+        return f"METAR {station} 121853Z 18010KT 10SM OVC003 22/18 A2992"
+
+    monkeypatch.setattr(aviation_weather, "get_metar", fake_get_metar)
+    n = AviationNormalizer()
+    result = n.normalize("what is the ceiling at kilo delta foxtrot whiskey")
+
+    assert result.stations == ["KDFW"]
+    assert fetched.wait(2.0)
+    assert n.metar("KDFW").startswith("METAR KDFW")
+    assert n.normalize("Indicated airspeed in KIAS").stations == []
+
+
+def test_checklist_words_are_not_stations():
+    n = AviationNormalizer(prefetch_metar=False)
+    assert n.normalize("Fuel PUMP on, throttle knob PULL to idle").stations == []
+    assert n.normalize("winds at KDFW").stations == ["KDFW"]
+    # spelled out, it is deliberate
+    assert n.normalize("papa uniform mike papa").stations == ["PUMP"]
+
+
+def test_manual_terms_skip_headings(tmp_path):
+    chunks = tmp_path / "chunks.jsonl"
+    text = "ENGINE FIRE. The engine must be shut down. Check EGT and EGT again. The EGT gauge."
+    chunks.write_text("\n".join(f'{{"text": "{text}"}}' for _ in range(3)))
+    terms = manual_terms(chunks)
+    assert "EGT" in terms and "ENGINE" not in terms
+    assert (tmp_path / "asr_terms.json").exists()
+    assert "EGT" in AviationNormalizer(terms, prefetch_metar=False).initial_prompt()
@@ -0,0 +1,70 @@
+import os
+import sys
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rag.procedures import ProcedureIndex, extract_procedures, get_procedure_index
+
+POH_PAGE = """SECTION 3
+EMERGENCY PROCEDURES
+
+ENGINE FIRE DURING FLIGHT
+1. Mixture -- IDLE CUT OFF
+2. Fuel Shutoff Valve -- OFF (Pull Out)
+3. Master Switch -- OFF
+4. Airspeed -- 100 KIAS
+   (If fire is not extinguished, increase glide speed)
+5. Forced Landing -- EXECUTE
+
+The engine fire may be extinguished by increasing airspeed.
+
+SMOKE IN COCKPIT
+MASTER SWITCH.........OFF
+CABIN VENTS...........OPEN
+LAND..................AS SOON AS PRACTICABLE
+"""
+
+
+def test_extract_and_lookup(tmp_path):
+    procedures = extract_procedures([(POH_PAGE, "poh.pdf", 41)])
+    assert [p.title for p in procedures] == ["ENGINE FIRE DURING FLIGHT", "SMOKE IN COCKPIT"]
+    assert "increase glide speed" in procedures[0].text
+    assert "increasing airspeed" not in procedures[0].text
+
+    path = tmp_path / "procedures.json"
+    ProcedureIndex(procedures).save(str(path))
+    index = ProcedureIndex.load(str(path))
+
+    match = index.lookup("What are the steps for an engine fire during flight?")
+    assert match.procedure.title == "ENGINE FIRE DURING FLIGHT"
+    assert index.lookup("How should a pilot respond to smoke in the cockpit?").procedure.page == 41
+    assert index.lookup("What is the immediate action for rapid depressurization?") is None
+
+
+def test_near_miss_titles_fall_back_to_the_llm():
+    index = ProcedureIndex(extract_procedures([(POH_PAGE, "poh.pdf", 41)]))
+
+    assert index.lookup("What do I do after an engine failure during flight?") is None
+    assert index.lookup("Engine fire on the ground during start") is None
+    assert index.lookup("cabin fire in flight") is None
+    assert index.lookup("smoke from the engine cowling after shutdown") is None
+    assert index.lookup("Engine fires during flight").procedure.title == "ENGINE FIRE DURING FLIGHT"
+
+
+def test_reingest_replaces_the_cached_index(tmp_path):
+    path = str(tmp_path / "procedures.json")
+    assert get_procedure_index(path) is None
+
+    procedures = extract_procedures([(POH_PAGE, "poh.pdf", 41)])
+    ProcedureIndex(procedures[:1]).save(path)
+    first = get_procedure_index(path)
+    assert get_procedure_index(path) is first and len(first.procedures) == 1
+
+    ProcedureIndex(procedures).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))   # coarse-mtime filesystems
+    assert len(get_procedure_index(path).procedures) == 2
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.evaluate.retrieval_eval import hit_matrix, relevance_matrix, retrieval_metrics
+
+
+def test_relevance_from_terms_and_pages():
+    chunks = [
+        {"text": "ENGINE FIRE: Mixture idle cut off", "metadata": {"source": "poh.pdf", "page": 40}},
+        {"text": "Smoke in the cabin", "metadata": {"source": "poh.pdf", "page": 41}},
+        {"text": "Engine fire on start", "metadata": {"source": "poh.pdf", "page": 42}},
+    ]
+    questions = [{"gold": {"terms": ["engine fire", "mixture"], "pages": [{"source": "poh.pdf", "page": 41}]}}]
+    assert relevance_matrix(questions, chunks).tolist() == [[True, True, False]]
+
+
+def test_metrics_skip_unlabeled_questions():
+    relevance = np.array([[1, 0, 1, 0], [0, 0, 0, 0], [0, 1, 0, 0]], dtype=bool)
+    ranked = np.array([[2, 1, 0], [0, 1, 2], [3, -1, -1]])
+
+    m = retrieval_metrics(hit_matrix(ranked, relevance), relevance.sum(axis=1), ks=(1, 3))
+
+    assert m["labeled_questions"] == 2
+    assert m["mrr"] == pytest.approx(0.5)
+    assert m["recall@3"] == pytest.approx(0.5)
+    assert m["ndcg@3"] == pytest.approx((1 + 1 / np.log2(4)) / (1 + 1 / np.log2(3)) / 2)
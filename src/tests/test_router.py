@@ -0,0 +1,97 @@
+import re
+import sys
+import types
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.rag.procedures import ProcedureIndex, extract_procedures
+from src.rag.router import QueryRouter, answer_routed, extract_station, route_query
+
+
+class BagOfWords:
+    """Stands in for the sentence-embedding model: hashed word counts."""
+
+    def embed_query(self, text):
+        vec = np.zeros(256, dtype=np.float32)
+        for word in re.findall(r"[a-z]+", text.lower()):
+            vec[zlib.crc32(word.encode()) % 256] += 1
+        return vec
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+class FakeEngine:
+    def __init__(self):
+        self.embeddings = BagOfWords()
+        self.retrieved = []
+        self.prompts = []
+
+    def retrieve(self, query, k=None, embedding=None, filter=None):
+        self.retrieved.append(query)
+        return [types.SimpleNamespace(page_content="Maneuvering speed is 99 KIAS.",
+                                      metadata={"source": "poh.pdf", "page": 12})]
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        return "Ninety-nine knots."
+
+    def generate_stream(self, prompt):
+        self.prompts.append(prompt)
+        yield "Ninety-nine "
+        yield "knots."
+
+
+def test_keyword_routes():
+    assert route_query("Engine fire during flight") == "emergency"
+    assert route_query("What to do with the engine inoperative?") == "emergency"
+    assert route_query("Can I fly with the landing light inoperative?") != "emergency"
+    assert route_query("What does BKN015 mean?") == "metar"
+    assert route_query("Given current conditions, should I continue?") == "decision"
+    assert route_query("What is maneuvering speed?") == "rag"
+    assert route_query("Can we still land at KDFW with this crosswind?") == "decision"
+
+
+def test_general_can_questions_are_not_decisions():
+    assert route_query("Can a student pilot go solo at night?") == "rag"
+    assert route_query("Can the aircraft land on grass strips?") == "rag"
+    assert route_query("Can I find the landing distance chart in the POH?") == "rag"
+    assert route_query("Can I log time when the instructor is present, or does it go to them?") == "rag"
+
+
+def test_centroid_routes_questions_the_rules_miss():
+    router = QueryRouter(BagOfWords())
+
+    route, vec = router.route("Is there enough fuel to reach the alternate airport?")
+    assert route.name == "decision" and vec is not None
+    assert router.route("What is the maneuvering speed of this aircraft?")[0].name == "rag"
+    # keyword hits never embed the query
+    assert router.route("smoke in the cockpit")[1] is None
+
+
+def test_extract_station_skips_abbreviations():
+    assert extract_station("Winds at KIAS 90 near KDFW?") == "KDFW"
+    assert extract_station("what is cavok") is None
+
+
+def test_answer_routed_streams_and_uses_checklists():
+    engine, tokens = FakeEngine(), []
+    result = answer_routed("What is maneuvering speed?", engine=engine, on_token=tokens.append)
+    assert result["route"] == "rag" and result["answer"] == "Ninety-nine knots."
+    assert tokens == ["Ninety-nine ", "knots."]
+    assert "99 KIAS" in engine.prompts[0]
+
+    page = "ENGINE FIRE DURING FLIGHT\n1. Mixture -- IDLE CUT OFF\n2. Fuel Shutoff Valve -- OFF\n"
+    procedures = ProcedureIndex(extract_procedures([(page, "poh.pdf", 41)]))
+    tokens.clear()
+    result = answer_routed("Engine fire during flight", engine=engine, procedures=procedures,
+                           on_token=tokens.append)
+    assert result["route"] == "procedure" and tokens == [result["answer"]]
+    assert len(engine.prompts) == 1     # no LLM call for the checklist
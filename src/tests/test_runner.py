@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.evaluate.runner import CheckpointMismatch, EvalRunner, load_checkpoint
+
+QUESTIONS = [
+    {"id": f"q{i}", "question": f"question {i}", "ground_truth": f"answer {i}"}
+    for i in range(4)
+]
+CONFIG = {"index_version": "v1", "embedding_model": "mpnet", "top_k": 3}
+
+
+def test_resume_retries_errors_and_checks_config(tmp_path):
+    checkpoint = tmp_path / "rag_checkpoint.jsonl"
+    asked = []
+
+    def flaky(question):
+        asked.append(question)
+        if question == "question 2":
+            raise TimeoutError("LLM timed out")
+        return question.replace("question", "answer")
+
+    records = EvalRunner(checkpoint, answer_fn=flaky, workers=1, config=CONFIG).run(QUESTIONS)
+    assert [r["id"] for r in records] == ["q0", "q1", "q3"]
+    assert "q2" not in load_checkpoint(checkpoint)
+
+    # resume: only the failed question runs again
+    asked.clear()
+    records = EvalRunner(checkpoint, answer_fn=lambda q: q.replace("question", "answer"),
+                         workers=1, config=CONFIG).run(QUESTIONS)
+    assert [r["id"] for r in records] == ["q0", "q1", "q2", "q3"]
+    assert all(r["f1"] == 1.0 and "error" not in r for r in records)
+
+    # a new index version must not silently reuse old answers
+    with pytest.raises(CheckpointMismatch):
+        EvalRunner(checkpoint, answer_fn=flaky, config={**CONFIG, "index_version": "v2"}).run(QUESTIONS)
+    asked.clear()
+    EvalRunner(checkpoint, answer_fn=flaky, workers=1, config={**CONFIG, "index_version": "v2"}).run(
+        QUESTIONS, resume=False)
+    assert len(asked) == 4
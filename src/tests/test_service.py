@@ -0,0 +1,70 @@
+import sys
+import time
+import types
+from pathlib import Path
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.data.index_store import INDEX_FILES, IndexStore
+from src.rag.service import RAGService
+
+
+class FakeDB:
+    index = types.SimpleNamespace(ntotal=3, d=4)
+
+    def save_local(self, path):
+        Path(path).mkdir(parents=True)
+        for name in INDEX_FILES:
+            (Path(path) / name).write_bytes(b"index")
+
+
+class FakeEngine:
+    """Holds a version and the shared models; close() drops the index side."""
+
+    def __init__(self, index_version, embeddings=None, llm=None):
+        self.index_version = index_version
+        self.embeddings = embeddings or object()
+        self.llm = llm or object()
+        self.db, self.shards, self.retriever, self.chain = object(), None, object(), object()
+
+    def close(self):
+        self.db = self.retriever = self.chain = None
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_publish_swap_and_drain(tmp_path):
+    store = IndexStore(str(tmp_path))
+    v1 = store.publish(FakeDB(), "mpnet", 3)
+    service = RAGService(
+        engine_factory=lambda index_version=None, **kw: FakeEngine(index_version or store.current_version(), **kw),
+        store=store,
+        drain_timeout=5.0,
+    )
+    assert service.version == v1
+
+    with service.acquire() as old:
+        v2 = store.publish(FakeDB(), "mpnet", 3)
+        thread = service.reload()
+        _wait_for(lambda: service.version == v2)
+        # swapped, but the pinned query keeps a working engine until it finishes
+        assert old.db is not None and old.chain is not None
+        assert service.engine.embeddings is old.embeddings and service.engine.llm is old.llm
+    thread.join(5.0)
+    assert old.db is None and old.retriever is None and old.chain is None
+
+    # the watcher picks up the next publish on its own
+    service.start_watching(0.02)
+    try:
+        v3 = store.publish(FakeDB(), "mpnet", 3)
+        _wait_for(lambda: service.version == v3)
+    finally:
+        service.stop_watching()
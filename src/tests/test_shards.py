@@ -0,0 +1,116 @@
+import sys
+import threading
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.data.index_store import IndexManifestError
+from src.data.shards import build_shards, check_registry, load_registry, save_registry
+from src.rag.filtering import MetadataFilter
+from src.rag.sharded import Shard, ShardedIndex
+
+FINGERPRINT = {"name": "mpnet", "dimension": 768, "normalize": True, "tokenizer_hash": "abc"}
+
+
+def test_registry_fingerprint_is_checked_before_loading(tmp_path):
+    save_registry({"shards": {}, "embedding_model": "mpnet", "embedding": FINGERPRINT}, str(tmp_path))
+
+    assert check_registry("mpnet", FINGERPRINT, str(tmp_path))["embedding"] == FINGERPRINT
+    with pytest.raises(IndexManifestError, match="built with 'mpnet'"):
+        check_registry("minilm", shard_dir=str(tmp_path))
+    with pytest.raises(IndexManifestError, match="dimension"):
+        check_registry("mpnet", {**FINGERPRINT, "dimension": 384}, str(tmp_path))
+
+    # registries written before fingerprints were recorded still load
+    save_registry({"shards": {}, "embedding_model": "mpnet"}, str(tmp_path))
+    check_registry("mpnet", FINGERPRINT, str(tmp_path))
+
+
+def _shard(name, source, vectors):
+    """One LangChain-shaped FAISS shard: flat L2 index + docstore."""
+    import faiss
+
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    docs = {f"{name}{i}": types.SimpleNamespace(page_content=f"{name} {i}", metadata={"source": source, "page": i})
+            for i in range(len(vectors))}
+    db = types.SimpleNamespace(index=index, docstore=types.SimpleNamespace(search=docs.get),
+                               index_to_docstore_id={i: f"{name}{i}" for i in range(len(vectors))})
+    return Shard(name, db, [source])
+
+
+def test_fan_out_merges_top_k_across_shards(monkeypatch):
+    poh = _shard("poh", "poh.pdf", np.array([[0.0, 0], [5, 0], [9, 0]], dtype=np.float32))
+    afh = _shard("afh", "afh.pdf", np.array([[1.0, 0], [2, 0], [7, 0]], dtype=np.float32))
+    index = ShardedIndex([poh, afh], max_workers=2)
+
+    threads = set()
+    search = ShardedIndex._search_shard
+    monkeypatch.setattr(ShardedIndex, "_search_shard",
+                        lambda self, *a: threads.add(threading.current_thread().name) or search(self, *a))
+
+    docs = index.search_by_vector([0.0, 0.0], k=4)
+    assert [d.page_content for d in docs] == ["poh 0", "afh 0", "afh 1", "poh 1"]
+    assert all(name.startswith("shard") for name in threads)
+
+    # a source filter skips the other shard; page filters go through its bitmap
+    assert [d.page_content for d in index.search_by_vector([0.0, 0.0], 3, MetadataFilter(source="afh.pdf"))] == \
+        ["afh 0", "afh 1", "afh 2"]
+    assert [d.page_content for d in index.search_by_vector([0.0, 0.0], 3, MetadataFilter(page_range=(2, 2)))] == \
+        ["afh 2", "poh 2"]
+    assert index.search_by_vector([0.0, 0.0], 3, MetadataFilter(source="missing.pdf")) == []
+
+    index.close()
+    with pytest.raises(RuntimeError):
+        index.search_by_vector([0.0, 0.0], 3)
+
+
+class FakeFAISS:
+    """Stands in for langchain_community's FAISS store: records which shards were embedded."""
+
+    built = []
+
+    def __init__(self, texts):
+        self.texts = texts
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas):
+        cls.built.append(metadatas[0]["source"])
+        return cls(texts)
+
+    def save_local(self, path):
+        Path(path).mkdir(parents=True)
+        (Path(path) / "index.faiss").write_text("\n".join(self.texts), encoding="utf-8")
+
+
+def test_only_changed_shards_are_rebuilt_and_swapped_atomically(tmp_path, monkeypatch):
+    vectorstores = types.ModuleType("langchain_community.vectorstores")
+    vectorstores.FAISS = FakeFAISS
+    monkeypatch.setitem(sys.modules, "langchain_community.vectorstores", vectorstores)
+    FakeFAISS.built = []
+
+    def chunks(poh_text):
+        return [{"text": poh_text, "metadata": {"source": "poh.pdf"}},
+                {"text": "Rotate at 55 KIAS.", "metadata": {"source": "afh.pdf"}}]
+
+    first = build_shards(chunks("Vy is 79 KIAS."), None, "mpnet", str(tmp_path))
+    assert sorted(FakeFAISS.built) == ["afh.pdf", "poh.pdf"]
+
+    second = build_shards(chunks("Vy is 74 KIAS."), None, "mpnet", str(tmp_path))
+    assert sorted(FakeFAISS.built) == ["afh.pdf", "poh.pdf", "poh.pdf"]
+    assert second["shards"]["afh"] == first["shards"]["afh"]
+    old, new = first["shards"]["poh"]["path"], second["shards"]["poh"]["path"]
+    assert old != new and (tmp_path / new / "index.faiss").read_text(encoding="utf-8") == "Vy is 74 KIAS."
+    # a loader holding the previous registry still finds its shard until the next build
+    assert (tmp_path / old).exists() and load_registry(str(tmp_path))["retired"] == [old]
+
+    build_shards(chunks("Vy is 74 KIAS.")[:1], None, "mpnet", str(tmp_path))
+    assert not (tmp_path / old).exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([new, first["shards"]["afh"]["path"], "registry.json"])
@@ -0,0 +1,56 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.telemetry_buffer import TelemetryRingBuffer, replay_trace
+
+
+def _climb_sample(t):
+    return {
+        "altitude": 5000 + 500 * t / 60.0,       # 500 fpm climb
+        "airspeed": 120 + (1 if int(t) % 2 else -1),
+        "heading": (350 + 2 * t) % 360,           # 2°/s turn through north
+        "fuel_quantity": 45.5 - 10 * t / 3600.0,  # 10 gph
+        "pitch": 5.0,
+        "roll": -15.0 if t == 20 else 0.0,
+    }
+
+
+def test_trends_match_full_recompute():
+    buf = TelemetryRingBuffer(capacity=50)
+    for t in range(200):
+        buf.push(_climb_sample(float(t)), t=float(t))
+
+    tr = buf.trends()
+    assert len(buf) == 50
+    assert abs(tr["altitude_trend_fpm"] - 500) < 1e-6
+    assert abs(tr["fuel_burn_gph"] - 10) < 1e-6
+    assert abs(tr["turn_rate_dps"] - 2) < 1e-6
+    assert abs(tr["airspeed_std"] - 1) < 1e-9
+    assert tr["max_bank"] == 0.0  # the t=20 excursion has been evicted
+
+    # Incremental sums agree with a brute-force fit over the window
+    data, times = buf._window()
+    slope = np.polyfit(times, data[:, buf._col["altitude"]], 1)[0]
+    assert abs(slope * 60 - tr["altitude_trend_fpm"]) < 1e-6
+
+    assert "climbing" in buf.format_for_prompt()
+
+
+def test_replay_trace(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    with open(trace, "w", encoding="utf-8") as f:
+        for t in range(30):
+            f.write(json.dumps({"t": t, **_climb_sample(float(t))}) + "\n")
+
+    buf = replay_trace(str(trace), capacity=60)
+    assert len(buf) == 30
+    assert buf.trends()["max_bank"] == 15.0
+    assert buf.span_seconds() == 29.0
@@ -0,0 +1,234 @@
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Ensure FlightLens root is in sys.path
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.uia import voice_assistant as va
+
+SR = va.SAMPLE_RATE
+
+
+class FakeWhisper:
+    """Stands in for a Whisper model: 'transcribes' to the clip length."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        assert isinstance(audio, np.ndarray) and audio.dtype == np.float32
+        self.calls.append(len(audio))
+        return {"text": f" {len(audio) / SR:.1f}s "}
+
+
+def _fixture(tmp_path, segments, name="utterance.wav"):
+    """WAV fixture from (seconds, is_speech) segments: tone bursts between quiet noise."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for seconds, speech in segments:
+        n = int(seconds * SR)
+        if speech:
+            t = np.arange(n) / SR
+            parts.append(0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)))
+        else:
+            parts.append(rng.normal(0, 0.001, n))
+    return va.write_wav(tmp_path / name, np.concatenate(parts).astype(np.float32))
+
+
+def test_wav_roundtrip_and_resample(tmp_path):
+    audio = (np.sin(np.linspace(0, 100, 8000)) * 0.5).astype(np.float32)
+    path = va.write_wav(tmp_path / "a.wav", audio, samplerate=8000)
+    loaded, rate = va.read_wav(path)
+    assert rate == 8000
+    assert loaded.dtype == np.float32 and len(loaded) == 16000
+    assert np.abs(loaded).max() <= 0.51
+
+    pcm = np.array([[-32768], [0], [16384]], dtype=np.int16)
+    assert np.allclose(va.to_float32(pcm), [-1.0, 0.0, 0.5])
+
+
+def test_streaming_emits_partials_then_final(tmp_path):
+    path = _fixture(tmp_path, [(0.5, False), (2.5, True), (1.0, False)])
+    model, partials = FakeWhisper(), []
+
+    text = va.listen(va.wav_chunks(path), model=model, on_partial=partials.append)
+
+    # transcribed during speech, then once more at the end of the utterance
+    assert len(partials) >= 2
+    assert float(text.rstrip("s")) >= 2.5
+    assert float(text.rstrip("s")) < 2.5 + va.PRE_ROLL_S + va.END_SILENCE_S + 0.2
+
+
+def test_stream_splits_utterances_on_silence(tmp_path):
+    path = _fixture(tmp_path, [(0.3, False), (1.0, True), (1.0, False), (1.5, True), (0.2, False)])
+    transcriber = va.StreamingTranscriber(model=FakeWhisper())
+
+    finals = [t for chunk in va.wav_chunks(path) if (t := transcriber.feed(chunk)) is not None]
+    finals.append(transcriber.flush())
+
+    assert len(finals) == 2
+    assert float(finals[0].rstrip("s")) < float(finals[1].rstrip("s"))
+
+
+def test_silence_is_not_transcribed(tmp_path):
+    path = _fixture(tmp_path, [(2.0, False)])
+    model = FakeWhisper()
+    assert va.listen(va.wav_chunks(path), model=model) == ""
+    assert model.calls == []
+
+
+def test_whisper_loaded_once(monkeypatch):
+    loads = []
+    fake = types.SimpleNamespace(load_model=lambda name: loads.append(name) or FakeWhisper())
+    monkeypatch.setitem(sys.modules, "whisper", fake)
+    va._load_whisper.cache_clear()
+
+    va.preload_whisper().join()
+    first = va.get_whisper_model()
+    assert va.get_whisper_model() is first
+    assert va.transcribe_audio(np.zeros(SR, dtype=np.int16)) == "1.0s"
+    assert loads == [va.WHISPER_MODEL]
+    va._load_whisper.cache_clear()
+
+
+class FakeEngine:
+    def __init__(self, answer):
+        self.answer = answer
+        self.retrieved = []
+
+    def retrieve(self, query, k=None, embedding=None, filter=None):
+        self.retrieved.append(query)
+        return [types.SimpleNamespace(page_content=f"doc for {query}", metadata={})]
+
+    def generate_stream(self, prompt):
+        for token in self.answer.split(" "):
+            yield token + " "
+
+
+class FakeService:
+    def __init__(self, engine):
+        self.engine = engine
+
+    @contextmanager
+    def acquire(self):
+        yield self.engine
+
+
+class FakeTTS:
+    def __init__(self):
+        self.spoken = []
+
+    def setProperty(self, *args):
+        pass
+
+    def say(self, text):
+        self.spoken.append(text)
+
+    def runAndWait(self):
+        pass
+
+
+def test_sentence_splitter_keeps_decimals():
+    splitter = va.SentenceSplitter(min_chars=10)
+    out = []
+    for token in "Tune the radio to 122.8 now. Then call ground. Ok".split(" "):
+        out += splitter.add(token + " ")
+    out += splitter.flush()
+    assert out == ["Tune the radio to 122.8 now.", "Then call ground.", "Ok"]
+
+
+def test_speaker_surfaces_engine_failures_instead_of_hanging(monkeypatch):
+    def no_engine():
+        raise OSError("no audio device")
+
+    broken = va.Speaker(engine_factory=no_engine)
+    broken.say("Mixture rich.")
+    with pytest.raises(va.TTSError, match="no audio device"):
+        broken.wait()
+    assert not broken.alive
+    broken.close()
+
+    class FlakyTTS(FakeTTS):
+        def runAndWait(self):
+            if len(self.spoken) == 1:
+                raise RuntimeError("driver busy")
+
+    tts = FlakyTTS()
+    speaker = va.Speaker(engine_factory=lambda: tts)
+    speaker.say("Mixture rich.")
+    speaker.say("Carb heat on.")
+    with pytest.raises(va.TTSError, match="driver busy"):
+        speaker.wait()
+    speaker.say("Fuel pump on.")
+    speaker.wait()
+    assert tts.spoken == ["Mixture rich.", "Carb heat on.", "Fuel pump on."]
+    speaker.close()
+
+    # a speaker whose engine never started is not handed out again
+    monkeypatch.setattr(va, "_speaker", broken)
+    monkeypatch.setattr(va, "Speaker", lambda: speaker)
+    assert va.get_speaker() is speaker
+
+
+def test_pipeline_reuses_speculative_retrieval_and_speaks_by_sentence(tmp_path):
+    path = _fixture(tmp_path, [(0.3, False), (2.5, True), (1.0, False)])
+    engine = FakeEngine("Mixture rich. Carb heat on. Fuel pump on.")
+    tts = FakeTTS()
+    speaker = va.Speaker(engine_factory=lambda: tts)
+
+    whisper = types.SimpleNamespace(transcribe=lambda audio, **kw: {"text": " Engine roughness checklist"})
+
+    result = va.VoicePipeline(service=FakeService(engine), model=whisper, speaker=speaker,
+                              partial_every=0.5).run(va.wav_chunks(path))
+    speaker.close()
+
+    assert result["answer"] == "Mixture rich. Carb heat on. Fuel pump on."
+    assert tts.spoken == ["Mixture rich. Carb heat on.", "Fuel pump on."]
+    # retrieval ran once, on a partial transcript, before the utterance ended
+    assert result["speculative_retrieval"] and result["route"] == "rag"
+    assert engine.retrieved == ["Engine roughness checklist"]
+    timings = result["timings"]
+    for stage in ("transcribe", "retrieve", "first_token", "first_sentence", "first_audio",
+                  "generate", "speak_done"):
+        assert stage in timings
+    assert timings["first_sentence"] <= timings["speak_done"]
+
+
+def test_pipeline_returns_the_answer_when_tts_fails(tmp_path):
+    path = _fixture(tmp_path, [(0.3, False), (1.5, True), (1.0, False)])
+    speaker = va.Speaker(engine_factory=lambda: None)     # setProperty on None fails
+    whisper = types.SimpleNamespace(transcribe=lambda audio, **kw: {"text": " Engine roughness checklist"})
+
+    result = va.VoicePipeline(service=FakeService(FakeEngine("Mixture rich.")), model=whisper,
+                              speaker=speaker).run(va.wav_chunks(path))
+    speaker.close()
+
+    assert result["answer"] == "Mixture rich." and "Text-to-speech failed" in result["tts_error"]
+
+
+def test_pipeline_station_in_manual_question_keeps_the_chunks(tmp_path, monkeypatch):
+    path = _fixture(tmp_path, [(0.3, False), (1.5, True), (1.0, False)])
+    monkeypatch.setattr(va, "_stations", lambda query: ["KDFW"])
+    monkeypatch.setattr(va, "_metar_context", lambda station: f"METAR {station} 121853Z 18010KT")
+
+    def run(question):
+        engine = FakeEngine("Ok.")
+        engine.generate_stream = lambda prompt: iter([prompt])     # answer = the prompt it saw
+        whisper = types.SimpleNamespace(transcribe=lambda audio, **kw: {"text": question})
+        return va.VoicePipeline(service=FakeService(engine), model=whisper, speak=False,
+                                procedures=False).run(va.wav_chunks(path))
+
+    result = run("Which runway lights are used at KDFW?")
+    assert result["route"] == "rag" and result["metar"] is None
+    assert "doc for Which runway lights" in result["answer"] and "METAR KDFW" not in result["answer"]
+
+    result = run("Decode the METAR for KDFW")
+    assert result["route"] == "metar" and result["metar"].startswith("METAR KDFW")
+    assert result["sources"] == [] and "METAR KDFW" in result["answer"]
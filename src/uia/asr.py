@@ -0,0 +1,176 @@
+"""
+asr.py
+------
+Pluggable speech-to-text backends for the voice pipeline.
+
+Every backend exposes the openai-whisper call shape,
+    model.transcribe(float32_audio_16k, **options) -> {"text": ...}
+so StreamingTranscriber and transcribe_audio work with any of them.
+
+Backends (FLIGHTLENS_ASR_BACKEND):
+- openai-whisper   reference implementation, PyTorch fp32 on CPU
+- faster-whisper   CTranslate2 with int8 weights (FLIGHTLENS_ASR_COMPUTE_TYPE)
+- onnx             Whisper exported to ONNX Runtime via optimum; the export is
+                   cached next to the other models (model_registry.MODEL_CACHE)
+
+Dependencies (only the selected backend's):
+    pip install openai-whisper | faster-whisper | optimum[onnxruntime]
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ASR_BACKEND = os.getenv("FLIGHTLENS_ASR_BACKEND", "openai-whisper")
+ASR_COMPUTE_TYPE = os.getenv("FLIGHTLENS_ASR_COMPUTE_TYPE", "int8")
+ASR_THREADS = int(os.getenv("FLIGHTLENS_ASR_THREADS", "0"))   # 0 = library default
+
+_WORD = re.compile(r"[\w']+")
+
+
+class ASRBackendError(RuntimeError):
+    """Unknown backend, or its package is not installed."""
+
+
+# -------------------------------------------------------------------
+# Backends
+# -------------------------------------------------------------------
+class OpenAIWhisperBackend:
+    """openai-whisper (PyTorch), the baseline."""
+
+    name = "openai-whisper"
+    requires = ("whisper",)
+
+    def __init__(self, model: str):
+        import whisper
+
+        self.model = whisper.load_model(model)
+
+    def transcribe(self, audio: np.ndarray, **options) -> Dict:
+        return self.model.transcribe(audio, **options)
+
+
+class FasterWhisperBackend:
+    """CTranslate2 Whisper (faster-whisper) with quantized weights."""
+
+    name = "faster-whisper"
+    requires = ("faster_whisper",)
+
+    def __init__(self, model: str, compute_type: str = ASR_COMPUTE_TYPE, threads: int = ASR_THREADS):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type, cpu_threads=threads)
+
+    def transcribe(self, audio: np.ndarray, language=None, condition_on_previous_text=True,
+                   initial_prompt=None, **_) -> Dict:
+        segments, _info = self.model.transcribe(
+            audio,
+            language=language,
+            beam_size=1,
+            condition_on_previous_text=condition_on_previous_text,
+            initial_prompt=initial_prompt,
+        )
+        return {"text": "".join(s.text for s in segments)}
+
+
+class OnnxWhisperBackend:
+    """Whisper exported to ONNX and run with ONNX Runtime (optimum)."""
+
+    name = "onnx"
+    requires = ("optimum", "onnxruntime", "transformers")
+
+    def __init__(self, model: str, threads: int = ASR_THREADS):
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor
+        import onnxruntime
+
+        from src.utils.model_registry import cache_path, resolve_model
+
+        repo = model if "/" in model or Path(model).is_dir() else f"openai/whisper-{model}"
+        exported = cache_path(f"{repo}-onnx")
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+
+        if (exported / "config.json").exists():
+            self.model = ORTModelForSpeechSeq2Seq.from_pretrained(exported, session_options=options)
+            self.processor = WhisperProcessor.from_pretrained(exported)
+        else:
+            source = resolve_model(repo)
+            print(f"Exporting {repo} to ONNX → {exported} (one-time)")
+            self.model = ORTModelForSpeechSeq2Seq.from_pretrained(source, export=True, session_options=options)
+            self.processor = WhisperProcessor.from_pretrained(source)
+            self.model.save_pretrained(exported)
+            self.processor.save_pretrained(exported)
+
+    def transcribe(self, audio: np.ndarray, language=None, initial_prompt=None, **_) -> Dict:
+        features = self.processor(audio, sampling_rate=16000, return_tensors="pt").input_features
+        kwargs = {"task": "transcribe"}
+        if language:
+            kwargs["language"] = language
+        if initial_prompt:
+            kwargs["prompt_ids"] = self.processor.get_prompt_ids(initial_prompt, return_tensors="pt")
+        ids = self.model.generate(features, **kwargs)
+        text = self.processor.batch_decode(ids, skip_special_tokens=True)[0]
+        if initial_prompt and text.lstrip().startswith(initial_prompt.strip()):
+            text = text.lstrip()[len(initial_prompt.strip()):]
+        return {"text": text}
+
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    OnnxWhisperBackend.name: OnnxWhisperBackend,
+}
+
+
+def backend_available(backend: str = ASR_BACKEND) -> bool:
+    """Whether a backend's packages are installed (checked without importing them)."""
+    from importlib.util import find_spec
+
+    cls = BACKENDS.get(backend)
+    return cls is not None and all(find_spec(name) is not None for name in cls.requires)
+
+
+def load_backend(backend: str = ASR_BACKEND, model: str = "base"):
+    """Instantiate an ASR backend by name."""
+    try:
+        cls = BACKENDS[backend]
+    except KeyError:
+        raise ASRBackendError(f"Unknown ASR backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
+    try:
+        return cls(model)
+    except ImportError as e:
+        raise ASRBackendError(f"ASR backend '{backend}' needs the '{e.name}' package") from e
+
+
+# -------------------------------------------------------------------
+# Scoring
+# -------------------------------------------------------------------
+def words(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level edit distance (substitutions + deletions + insertions)."""
+    ref, hyp = words(reference), words(hypothesis)
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        curr = [i]
+        for j, h in enumerate(hyp, 1):
+            curr.append(min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (r != h)))
+        prev = curr
+    return prev[-1]
+
+
+def word_error_rate(references: List[str], hypotheses: List[str]) -> float:
+    """Corpus WER: total word errors over total reference words."""
+    errors = sum(word_errors(r, h) for r, h in zip(references, hypotheses))
+    total = sum(len(words(r)) for r in references)
+    return errors / total if total else 0.0
@@ -0,0 +1,349 @@
+"""
+normalizer.py
+-------------
+Rewrites speech transcripts into the canonical aviation form the index and
+the router understand, before retrieval:
+
+    "kilo delta foxtrot whiskey"         → "KDFW"
+    "OVC zero zero three"                → "OVC003"
+    "tower one one eight point three"    → "tower 118.3"
+    "what's the meter at K D F W"        → "what's the METAR at KDFW"
+
+All vocabulary (phonetic alphabet, ICAO digits, METAR sky-cover tokens,
+common mis-hearings and acronyms found in the ingested manuals) is compiled
+once into a word trie; a transcript is rewritten in one greedy
+longest-match pass, typically a few tens of microseconds.
+
+Also provides the Whisper initial prompt that biases decoding towards the
+same vocabulary, and prefetches the METAR for any station it recognises so
+the report is usually cached by the time the question is answered.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.utils.files import read_chunk_texts
+
+load_dotenv()
+
+CHUNK_FILE = Path(os.getenv("PROCESSED_DATA_PATH", "data/processed")) / "chunks.jsonl"
+TERMS_FILE = CHUNK_FILE.with_name("asr_terms.json")
+MAX_MANUAL_TERMS = 150
+MIN_TERM_COUNT = 3
+
+# -------------------------------------------------------------------
+# Vocabulary
+# -------------------------------------------------------------------
+PHONETIC = {
+    "alpha": "A", "alfa": "A", "bravo": "B", "charlie": "C", "delta": "D", "echo": "E",
+    "foxtrot": "F", "golf": "G", "hotel": "H", "india": "I", "juliet": "J", "juliett": "J",
+    "kilo": "K", "lima": "L", "mike": "M", "november": "N", "oscar": "O", "papa": "P",
+    "quebec": "Q", "romeo": "R", "sierra": "S", "tango": "T", "uniform": "U", "victor": "V",
+    "whiskey": "W", "whisky": "W", "x-ray": "X", "xray": "X", "x ray": "X", "yankee": "Y", "zulu": "Z",
+}
+
+DIGITS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "tree": "3", "four": "4", "fower": "4",
+    "five": "5", "fife": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9", "niner": "9",
+}
+DECIMAL = {"point", "decimal", "dayseemal"}
+
+SKY_COVER = {
+    "few": "FEW", "scattered": "SCT", "broken": "BKN", "overcast": "OVC",
+    "vertical visibility": "VV", "sct": "SCT", "bkn": "BKN", "ovc": "OVC", "vv": "VV",
+}
+
+# Spoken form / frequent Whisper mis-hearing → canonical
+AVIATION_TERMS = {
+    "metar": "METAR", "meter": "METAR", "meta": "METAR", "me tar": "METAR", "metars": "METARs",
+    "taf": "TAF", "taff": "TAF", "tafs": "TAFs", "speci": "SPECI",
+    "atis": "ATIS", "a tis": "ATIS", "awos": "AWOS", "a waas": "AWOS", "asos": "ASOS",
+    "vfr": "VFR", "ifr": "IFR", "mvfr": "MVFR", "lifr": "LIFR",
+    "ctaf": "CTAF", "see taf": "CTAF", "unicom": "UNICOM", "notam": "NOTAM", "notams": "NOTAMs",
+    "squawk": "squawk", "squak": "squawk", "squalk": "squawk",
+    "pitot": "pitot", "pito": "pitot", "pee toe": "pitot",
+    "poh": "POH", "afm": "AFM", "elt": "ELT", "vor": "VOR", "ils": "ILS", "gps": "GPS",
+    "cavok": "CAVOK", "rmk": "RMK", "clr": "CLR", "skc": "SKC",
+    "v speeds": "V-speeds", "vee speeds": "V-speeds",
+    "v one": "V1", "vee one": "V1", "v r": "Vr", "vee r": "Vr", "v two": "V2", "vee two": "V2",
+    "v a": "Va", "v x": "Vx", "v y": "Vy", "v ne": "Vne", "v so": "Vso", "v s o": "Vso",
+    "carb heat": "carb heat", "carburetor heat": "carburetor heat",
+}
+
+_LETTER_WORDS = {"a", "i"}          # single capitals that are words, not spelled letters
+_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[-.'][A-Za-z0-9]+)*|[^\sA-Za-z0-9]")
+_ACRONYM = re.compile(r"\b[A-Z]{2,6}\b")
+_LOWER_WORD = re.compile(r"\b[a-z]{2,6}\b")
+_STATION = re.compile(r"^[KCP][A-Z]{3}$")
+_NOT_STATIONS = {"KIAS", "KTAS", "KCAS", "PROB", "PAPI", "CTAF", "CFIT"}
+# Station-shaped checklist words; only a spelled run ("papa uniform ...") makes these a station
+_CHECKLIST_WORDS = {
+    "PULL", "PUSH", "PUMP", "PARK", "PORT", "PEAK", "PINS", "PAGE", "COLD", "CALL", "CARB",
+    "COWL", "CREW", "CAGE", "COMM", "CAPS", "CUTS", "CASE", "CODE", "COIL", "CORE", "KNOB", "KILL",
+    "KEEP", "KICK",
+}
+_NO_SPACE_BEFORE = set(",.;:!?)'%")
+
+LETTER, DIGIT, POINT, COVER, TERM = "letter", "digit", "point", "cover", "term"
+
+
+# -------------------------------------------------------------------
+# Trie
+# -------------------------------------------------------------------
+class _Node:
+    __slots__ = ("children", "value")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.value: Optional[Tuple[str, str]] = None
+
+
+class PhraseTrie:
+    """Word-level trie; lookups return the longest phrase starting at a position."""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, phrase: str, kind: str, value: str):
+        node = self.root
+        for word in phrase.lower().split():
+            node = node.children.setdefault(word, _Node())
+        node.value = (kind, value)
+
+    def longest(self, words: List[str], start: int) -> Tuple[int, Optional[Tuple[str, str]]]:
+        """(words consumed, (kind, value)) of the longest match at `start`; (0, None) if none."""
+        node, best, best_len = self.root, None, 0
+        for i in range(start, len(words)):
+            node = node.children.get(words[i])
+            if node is None:
+                break
+            if node.value is not None:
+                best, best_len = node.value, i - start + 1
+        return best_len, best
+
+
+@dataclass
+class Normalized:
+    text: str
+    stations: List[str]
+    changed: bool
+
+
+# -------------------------------------------------------------------
+# Manual-specific terms
+# -------------------------------------------------------------------
+def manual_terms(chunk_file: Path = CHUNK_FILE, limit: int = MAX_MANUAL_TERMS) -> List[str]:
+    """
+    Frequent acronyms in the ingested manuals (e.g. POH-specific system names)
+
+    Scanned once from chunks.jsonl and cached next to it until the chunks change.
+    Capitalised headings ("ENGINE FIRE") are skipped: a term only counts when
+    its lowercase form is rare as an ordinary word in the same text.
+    """
+    chunk_file = Path(chunk_file)
+    if not chunk_file.exists():
+        return []
+    terms_file = chunk_file.with_name(TERMS_FILE.name)
+    if terms_file.exists() and terms_file.stat().st_mtime >= chunk_file.stat().st_mtime:
+        with open(terms_file, "r", encoding="utf-8") as f:
+            return json.load(f)[:limit]
+
+    counts, lower = Counter(), Counter()
+    for text in read_chunk_texts(chunk_file):
+        counts.update(_ACRONYM.findall(text))
+        lower.update(_LOWER_WORD.findall(text))
+    terms = [t for t, n in counts.most_common()
+             if n >= MIN_TERM_COUNT and not _STATION.match(t) and lower[t.lower()] * 10 < n]
+    try:
+        with open(terms_file, "w", encoding="utf-8") as f:
+            json.dump(terms[:MAX_MANUAL_TERMS], f)
+    except OSError:
+        pass
+    return terms[:limit]
+
+
+# -------------------------------------------------------------------
+# Normalizer
+# -------------------------------------------------------------------
+class AviationNormalizer:
+    """Compiled transcript normalizer (build once, reuse)."""
+
+    def __init__(self, extra_terms: Iterable[str] = (), prefetch_metar: bool = True):
+        self.trie = PhraseTrie()
+        for phrase, letter in PHONETIC.items():
+            self.trie.add(phrase, LETTER, letter)
+        for phrase, digit in DIGITS.items():
+            self.trie.add(phrase, DIGIT, digit)
+        for phrase in DECIMAL:
+            self.trie.add(phrase, POINT, ".")
+        for phrase, cover in SKY_COVER.items():
+            self.trie.add(phrase, COVER, cover)
+        self.manual_terms = [t for t in extra_terms if t.lower() not in PHONETIC and t.lower() not in DIGITS]
+        for term in self.manual_terms:
+            self.trie.add(term, TERM, term)
+        for phrase, canonical in AVIATION_TERMS.items():
+            self.trie.add(phrase, TERM, canonical)
+
+        self.prefetch_metar = prefetch_metar
+        self._metar: Dict[str, Future] = {}
+        self._metar_lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # -- tokens -------------------------------------------------------
+    def _classify(self, tokens: List[str]) -> List[Tuple[str, str, int]]:
+        """(kind, value, source tokens) items; kind None means passthrough."""
+        lowered = [t.lower() for t in tokens]
+        items, i = [], 0
+        while i < len(tokens):
+            n, match = self.trie.longest(lowered, i)
+            if match:
+                items.append((match[0], match[1], n))
+                i += n
+                continue
+            token = tokens[i]
+            if len(token) == 1 and token.isupper() and token.lower() not in _LETTER_WORDS:
+                items.append((LETTER, token, 1))              # "K D F W"
+            elif token.isdigit() and len(token) <= 3:
+                items.append((DIGIT, token, 1))
+            else:
+                items.append((None, token, 1))
+            i += 1
+        return items
+
+    def _collapse(self, items: List[Tuple[str, str, int]], tokens: List[str]) -> Tuple[List[str], set]:
+        """
+        Join spelled runs into single tokens and attach cloud heights to sky cover
+
+        Returns:
+            (output tokens, the tokens that were spelled out letter by letter)
+        """
+        out, spelled, i, pos = [], set(), 0, 0
+        while i < len(items):
+            kind, value, n = items[i]
+            if kind in (LETTER, DIGIT):
+                j, run, consumed = i, [], 0
+                while j < len(items):
+                    k, v, m = items[j]
+                    if k in (LETTER, DIGIT) or (k == POINT and run and run[-1].isdigit()
+                                                  and j + 1 < len(items) and items[j + 1][0] == DIGIT):
+                        run.append(v)
+                        consumed += m
+                        j += 1
+                    else:
+                        break
+                if consumed >= 2:
+                    out.append("".join(run))
+                    spelled.add(out[-1])
+                else:
+                    out.extend(tokens[pos:pos + consumed])      # lone "one", "delta": leave as spoken
+                i, pos = j, pos + consumed
+                continue
+
+            if kind == COVER:
+                digits, j, consumed = "", i + 1, 0
+                while j < len(items) and items[j][0] == DIGIT and len(digits) < 3:
+                    digits += items[j][1]
+                    consumed += items[j][2]
+                    j += 1
+                if len(digits) == 3:
+                    out.append(value + digits)
+                    i, pos = j, pos + n + consumed
+                    continue
+                out.extend(tokens[pos:pos + n] if not tokens[pos].isupper() else [value])
+            elif kind in (TERM, POINT):
+                out.append(value if kind == TERM else tokens[pos])
+            else:
+                out.append(value)
+            i, pos = i + 1, pos + n
+        return out, spelled
+
+    @staticmethod
+    def _join(tokens: List[str]) -> str:
+        text = ""
+        for token in tokens:
+            if text and token not in _NO_SPACE_BEFORE and not text.endswith(("(", "'")):
+                text += " "
+            text += token
+        return text
+
+    # -- public -------------------------------------------------------
+    def normalize(self, text: str) -> Normalized:
+        """
+        Canonical transcript plus the ICAO stations it mentions
+
+        Spelled identifiers ("kilo delta foxtrot whiskey", "K D F W") are
+        stations; a written four-letter word only when it is not a known
+        abbreviation or checklist word (PULL, PUMP, ...).
+        """
+        tokens = _TOKEN.findall(text or "")
+        out, spelled = self._collapse(self._classify(tokens), tokens)
+        stations = list(dict.fromkeys(
+            t for t in out
+            if _STATION.match(t) and t not in _NOT_STATIONS
+            and (t in spelled or t not in _CHECKLIST_WORDS)
+        ))
+        if stations and self.prefetch_metar:
+            for station in stations:
+                self.metar_future(station)
+        canonical = self._join(out)
+        return Normalized(canonical, stations, canonical != self._join(tokens))
+
+    def __call__(self, text: str) -> str:
+        return self.normalize(text).text
+
+    def metar_future(self, station: str) -> Future:
+        """Start (once) fetching a station's METAR in the background."""
+        with self._metar_lock:
+            future = self._metar.get(station)
+            if future is None or (future.done() and future.exception() is not None):
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="metar-prefetch")
+                from src.integrations.aviation_weather import get_metar
+
+                future = self._pool.submit(get_metar, station)
+                self._metar[station] = future
+        return future
+
+    def metar(self, station: str, timeout: float = 10.0) -> Optional[str]:
+        """METAR for a station (cached by get_metar; waits for a prefetch in flight)."""
+        future = self.metar_future(station)
+        try:
+            raw = future.result(timeout=timeout)
+        except Exception:
+            return None
+        with self._metar_lock:
+            if self._metar.get(station) is future:
+                del self._metar[station]   # later calls go through get_metar's TTL cache
+        return raw
+
+    def initial_prompt(self, max_terms: int = 40) -> str:
+        """
+        Whisper initial prompt biasing decoding towards aviation spelling
+
+        Whisper treats it as preceding text, so terms that appear here are
+        much more likely to be written the same way.
+        """
+        terms = ["METAR", "TAF", "ATIS", "VFR", "IFR", "KDFW", "OVC003", "BKN015", "squawk",
+                 "niner", "Kilo", "Whiskey", "CTAF", "pitot", "Vr"]
+        terms += [t for t in self.manual_terms if t not in terms][:max(0, max_terms - len(terms))]
+        return "Pilot radio and cockpit terms: " + ", ".join(terms) + "."
+
+
+@lru_cache(maxsize=1)
+def get_normalizer() -> AviationNormalizer:
+    """Process-wide normalizer including acronyms from the ingested manuals."""
+    return AviationNormalizer(extra_terms=manual_terms())
+
+
+def normalize_transcript(text: str) -> Normalized:
+    return get_normalizer().normalize(text)
@@ -3,60 +3,697 @@ voice_assistant.py
 ------------------
 Handles voice input → transcription → RAG response → optional TTS playback.
 
+- One Whisper model per process, loaded once (get_whisper_model / preload_whisper);
+  the ASR backend (openai-whisper, faster-whisper int8, ONNX) is chosen in asr.py
+- Audio stays in memory as float32 NumPy arrays; Whisper is fed the array
+  directly, nothing is written to disk
+- Streaming mode: microphone chunks go through an energy VAD and are
+  transcribed while the pilot is still speaking; the utterance ends after a
+  short silence instead of a fixed recording time
+- WAV files can stand in for the microphone (wav_chunks), which is how the
+  tests drive the pipeline
+- Transcripts are rewritten into canonical aviation form (normalizer.py),
+  with Whisper biased towards the same vocabulary; a recognised station
+  triggers a METAR fetch while the pilot is still talking
+- VoicePipeline overlaps the stages: retrieval starts on partial
+  transcripts, generation streams tokens and a persistent TTS engine speaks
+  each sentence as soon as it is complete
+
 Dependencies:
-    pip install sounddevice wavio openai-whisper pyttsx3
+    pip install sounddevice openai-whisper pyttsx3
 """
 
-import sounddevice as sd
-import wavio
-import whisper
-import pyttsx3
-from src.rag.chain import answer_question
+import os
+import queue
+import re
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.utils import instrumentation as inst
+
+load_dotenv()
+
+WHISPER_MODEL = os.getenv("FLIGHTLENS_WHISPER_MODEL", "base")
+WHISPER_LANGUAGE = os.getenv("FLIGHTLENS_WHISPER_LANGUAGE", "en")
+SAMPLE_RATE = 16000                  # Whisper's native rate
+
+VAD_THRESHOLD_DB = float(os.getenv("FLIGHTLENS_VAD_THRESHOLD_DB", "-40"))
+VAD_MARGIN_DB = 10.0                 # speech must also be this far above the noise floor
+FRAME_MS = 30
+END_SILENCE_S = float(os.getenv("FLIGHTLENS_VAD_END_SILENCE", "0.6"))
+PARTIAL_EVERY_S = 1.0
+PRE_ROLL_S = 0.3
+MAX_UTTERANCE_S = 30.0               # Whisper's window
+
+# Aviation vocabulary: Whisper prompt biasing and transcript normalization (normalizer.py)
+ASR_BIAS = os.getenv("FLIGHTLENS_ASR_BIAS", "1") == "1"
+ASR_NORMALIZE = os.getenv("FLIGHTLENS_ASR_NORMALIZE", "1") == "1"
+
+_load_lock = threading.Lock()
+
+
+# -------------------------------------------------------------------
+# Whisper model (process-wide)
+# -------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _load_whisper(name: str, backend: str):
+    from src.uia.asr import load_backend
+
+    print(f"🧠 Loading Whisper model '{name}' ({backend})...")
+    return load_backend(backend, name)
+
+
+def get_whisper_model(name: str = WHISPER_MODEL, backend: str = None):
+    """The shared Whisper model for the configured ASR backend (loaded on first use, then reused)."""
+    from src.uia.asr import ASR_BACKEND
+
+    with _load_lock:
+        return _load_whisper(name, backend or ASR_BACKEND)
+
+
+def preload_whisper(name: str = WHISPER_MODEL, backend: str = None) -> threading.Thread:
+    """Load the model in the background so the first utterance does not wait for it."""
+    thread = threading.Thread(target=get_whisper_model, args=(name, backend), name="whisper-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+# -------------------------------------------------------------------
+# Audio buffers
+# -------------------------------------------------------------------
+def to_float32(audio: np.ndarray, samplerate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 in [-1, 1] at 16 kHz, as Whisper expects."""
+    audio = np.asarray(audio)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    if audio.dtype.kind in "iu":
+        info = np.iinfo(audio.dtype)
+        audio = (audio.astype(np.float32) - (info.max + info.min + 1) / 2) / ((info.max - info.min + 1) / 2)
+    audio = audio.astype(np.float32, copy=False)
+
+    if samplerate != SAMPLE_RATE and len(audio):
+        n = int(round(len(audio) * SAMPLE_RATE / samplerate))
+        audio = np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def read_wav(path) -> Tuple[np.ndarray, int]:
+    """PCM WAV file (path or file object) → (float32 mono 16 kHz samples, original sample rate)."""
+    with wave.open(path if hasattr(path, "read") else str(path), "rb") as f:
+        width, channels, rate = f.getsampwidth(), f.getnchannels(), f.getframerate()
+        raw = f.readframes(f.getnframes())
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}.get(width)
+    if dtype is None:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+    return to_float32(np.frombuffer(raw, dtype=dtype).reshape(-1, channels), rate), rate
+
+
+def write_wav(path: Union[str, Path], audio: np.ndarray, samplerate: int = SAMPLE_RATE) -> Path:
+    """Save float32 or int16 mono audio as 16-bit PCM (e.g. to make test fixtures)."""
+    audio = np.asarray(audio)
+    if audio.dtype.kind == "f":
+        audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(samplerate)
+        f.writeframes(audio.astype("<i2").tobytes())
+    return Path(path)
+
+
+def wav_chunks(path, chunk_s: float = 0.1, realtime: bool = False) -> Iterator[np.ndarray]:
+    """Replay a WAV file as microphone-sized chunks (optionally at real-time pace)."""
+    audio, _ = read_wav(path)
+    step = int(chunk_s * SAMPLE_RATE)
+    for start in range(0, len(audio), step):
+        if realtime:
+            time.sleep(chunk_s)
+        yield audio[start:start + step]
+
+
+def microphone_chunks(chunk_s: float = 0.1, max_s: float = MAX_UTTERANCE_S) -> Iterator[np.ndarray]:
+    """
+    Live microphone audio as float32 chunks
+
+    Capture runs in the PortAudio callback thread, so audio keeps arriving
+    while the consumer is busy transcribing.
+    """
+    import sounddevice as sd
+
+    chunks: "queue.Queue[np.ndarray]" = queue.Queue()
+
+    def callback(indata, frames, time_info, status):
+        chunks.put(indata[:, 0].copy())
 
+    with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype="float32",
+                        blocksize=int(chunk_s * SAMPLE_RATE), callback=callback):
+        received = 0
+        while received < max_s * SAMPLE_RATE:
+            chunk = chunks.get()
+            received += len(chunk)
+            yield chunk
+
+
+def record_audio(duration=5, samplerate=SAMPLE_RATE) -> np.ndarray:
+    """Record a fixed-length clip from the microphone (kept in memory)."""
+    import sounddevice as sd
 
-def record_audio(filename="query.wav", duration=5, samplerate=16000):
-    """Record voice input from microphone."""
     print(f"🎙️ Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1, dtype='int16')
+    audio = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1, dtype="float32")
     sd.wait()
-    wavio.write(filename, audio, samplerate, sampwidth=2)
-    print("✅ Recording saved as", filename)
-    return filename
+    print("✅ Recording complete")
+    return to_float32(audio, samplerate)
+
+
+# -------------------------------------------------------------------
+# Transcription
+# -------------------------------------------------------------------
+def _transcribe(model, audio: np.ndarray, **kwargs) -> str:
+    options = {"fp16": False, "language": WHISPER_LANGUAGE or None, "condition_on_previous_text": False}
+    if ASR_BIAS or ASR_NORMALIZE:
+        from src.uia.normalizer import get_normalizer
 
+        normalizer = get_normalizer()
+        if ASR_BIAS:
+            options["initial_prompt"] = normalizer.initial_prompt()
+    options.update(kwargs)
+    text = model.transcribe(audio, **options)["text"].strip()
+    return normalizer(text) if ASR_NORMALIZE else text
 
-def transcribe_audio(filename):
-    """Transcribe speech to text using Whisper."""
+
+def transcribe_audio(audio: Union[np.ndarray, str, Path], samplerate: int = SAMPLE_RATE, model=None) -> str:
+    """Transcribe speech to text using the shared Whisper model (array or WAV path)."""
     print("🧠 Transcribing audio...")
-    model = whisper.load_model("base")
-    result = model.transcribe(filename)
-    text = result["text"].strip()
+    if isinstance(audio, (str, Path)):
+        audio, samplerate = read_wav(audio)[0], SAMPLE_RATE
+    text = _transcribe(model or get_whisper_model(), to_float32(audio, samplerate))
     print("🗣️ Transcribed text:", text)
     return text
 
 
+class EnergyVAD:
+    """
+    Frame-level voice activity detection on RMS energy.
+
+    A frame is speech when it is above an absolute level and clearly above
+    the running noise floor (tracked on non-speech frames).
+    """
+
+    def __init__(self, threshold_db: float = VAD_THRESHOLD_DB, margin_db: float = VAD_MARGIN_DB,
+                 frame_ms: int = FRAME_MS):
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.frame = int(SAMPLE_RATE * frame_ms / 1000)
+        self.noise_db = -90.0
+
+    def levels(self, frames: np.ndarray) -> np.ndarray:
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-9))
+
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        """Speech flag for each row of a (n_frames, frame) array."""
+        flags = np.empty(len(frames), dtype=bool)
+        for i, level in enumerate(self.levels(frames)):
+            flags[i] = level > self.threshold_db and level > self.noise_db + self.margin_db
+            if not flags[i]:
+                self.noise_db = 0.95 * self.noise_db + 0.05 * level if self.noise_db > -90 else level
+        return flags
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of a live audio stream.
+
+    feed() takes chunks of any size. While speech is ongoing the utterance so
+    far is re-transcribed every `partial_every` seconds (on_partial); once
+    `end_silence` seconds of silence follow speech the utterance is
+    transcribed one last time and returned.
+    """
+
+    def __init__(self, model=None, vad: Optional[EnergyVAD] = None,
+                 on_partial: Optional[Callable[[str], None]] = None,
+                 partial_every: float = PARTIAL_EVERY_S, end_silence: float = END_SILENCE_S,
+                 pre_roll: float = PRE_ROLL_S, max_utterance: float = MAX_UTTERANCE_S):
+        self.model = model
+        self.vad = vad or EnergyVAD()
+        self.on_partial = on_partial
+        self.partial_every = int(partial_every * SAMPLE_RATE)
+        self.end_silence = int(end_silence * SAMPLE_RATE)
+        self.pre_roll = int(pre_roll * SAMPLE_RATE)
+        self.max_utterance = int(max_utterance * SAMPLE_RATE)
+        self.partial = ""
+        self.last_transcribe_s = 0.0
+        self.last_audio: Optional[np.ndarray] = None
+        self._reset()
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._history = np.zeros(0, dtype=np.float32)
+
+    def _reset(self):
+        self._utterance = []
+        self._samples = 0
+        self._silence = 0
+        self._since_partial = 0
+        self.in_speech = False
+
+    def _transcribe(self) -> str:
+        model = self.model or get_whisper_model()
+        start = time.perf_counter()
+        text = _transcribe(model, np.concatenate(self._utterance))
+        self.last_transcribe_s = time.perf_counter() - start
+        return text
+
+    def _finish(self) -> str:
+        text = self._transcribe() if self._utterance else ""
+        self.last_audio = np.concatenate(self._utterance) if self._utterance else None
+        self._reset()
+        self.partial = ""
+        return text
+
+    def feed(self, chunk: np.ndarray) -> Optional[str]:
+        """Add audio; returns the final text when an utterance has just ended."""
+        audio = np.concatenate([self._pending, to_float32(chunk)])
+        n = len(audio) // self.vad.frame * self.vad.frame
+        self._pending = audio[n:]
+        if not n:
+            return None
+
+        frames = audio[:n].reshape(-1, self.vad.frame)
+        for frame, speech in zip(frames, self.vad.is_speech(frames)):
+            if not self.in_speech:
+                if not speech:
+                    self._history = np.concatenate([self._history, frame])[-self.pre_roll:]
+                    continue
+                self.in_speech = True
+                self._utterance = [self._history] if len(self._history) else []
+                self._samples = len(self._history)
+                self._history = np.zeros(0, dtype=np.float32)
+
+            self._utterance.append(frame)
+            self._samples += len(frame)
+            self._since_partial += len(frame)
+            self._silence = 0 if speech else self._silence + len(frame)
+
+            if self._silence >= self.end_silence or self._samples >= self.max_utterance:
+                return self._finish()
+
+        if self.in_speech and self._since_partial >= self.partial_every:
+            self._since_partial = 0
+            self.partial = self._transcribe()
+            if self.on_partial:
+                self.on_partial(self.partial)
+        return None
+
+    def flush(self) -> str:
+        """Final text for any speech still buffered (end of stream)."""
+        return self._finish() if self.in_speech else ""
+
+    def run(self, chunks: Iterable[np.ndarray]) -> str:
+        """Transcribe the first utterance of a chunk stream; stops reading when it ends."""
+        stream = iter(chunks)
+        try:
+            for chunk in stream:
+                text = self.feed(chunk)
+                if text is not None:
+                    return text
+            return self.flush()
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()   # stops the microphone stream
+
+
+def listen(chunks: Iterable[np.ndarray], model=None, on_partial: Optional[Callable[[str], None]] = None,
+           **kwargs) -> str:
+    """Transcribe the first utterance from an audio chunk stream."""
+    return StreamingTranscriber(model=model, on_partial=on_partial, **kwargs).run(chunks)
+
+
+# -------------------------------------------------------------------
+# Response / TTS
+# -------------------------------------------------------------------
 def get_ai_response(query):
-    """Use RAG chain to answer the user's transcribed question."""
+    """Answer the user's transcribed question through the query router."""
+    from src.rag.router import answer_routed
+    from src.rag.service import get_service
+
     print("🤖 Generating response...")
-    answer = answer_question(query)
+    try:
+        with get_service().acquire() as engine:
+            answer = answer_routed(query, engine=engine)["answer"]
+    except Exception as e:
+        answer = f"Error: {e}"
     print("💬 AI Response:", answer)
     return answer
 
 
+class TTSError(RuntimeError):
+    """The text-to-speech engine could not start or failed while speaking."""
+
+
+class Speaker:
+    """
+    One persistent TTS engine on its own thread.
+
+    Sentences are queued with say() and spoken in order, so the caller can
+    keep generating while earlier sentences play. pyttsx3 engines are not
+    thread-safe, so the engine is created and only used on the worker.
+    Engine failures never stall the queue: items are still marked done and
+    the error is raised from the next wait().
+    """
+
+    def __init__(self, rate: int = 175, engine_factory: Callable = None):
+        self.rate = rate
+        self._factory = engine_factory
+        self._queue: "queue.Queue" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._broken = False             # engine failed to start; nothing will be spoken
+        self._thread = threading.Thread(target=self._run, name="tts", daemon=True)
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive() and not self._broken
+
+    def _start_engine(self):
+        try:
+            if self._factory is None:
+                import pyttsx3
+
+                self._factory = pyttsx3.init
+            engine = self._factory()
+            engine.setProperty("rate", self.rate)
+            return engine
+        except Exception as e:
+            self._error, self._broken = e, True
+            return None
+
+    def _run(self):
+        engine = self._start_engine()
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if engine is None:
+                    continue
+                text, on_start = item
+                if on_start:
+                    on_start()
+                engine.say(text)
+                engine.runAndWait()
+            except Exception as e:
+                self._error = self._error or e
+            finally:
+                self._queue.task_done()
+
+    def say(self, text: str, on_start: Optional[Callable[[], None]] = None):
+        self._queue.put((text, on_start))
+
+    def wait(self):
+        """Block until everything queued so far has been spoken; raise TTSError if speech failed."""
+        self._queue.join()
+        error = self._error
+        if error is not None:
+            if not self._broken:
+                self._error = None
+            raise TTSError(f"Text-to-speech failed: {error}") from error
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+_speaker: Optional[Speaker] = None
+_speaker_lock = threading.Lock()
+
+
+def get_speaker() -> Speaker:
+    """The process-wide TTS engine (replaced if its engine failed to start)."""
+    global _speaker
+    with _speaker_lock:
+        if _speaker is None or not _speaker.alive:
+            _speaker = Speaker()
+        return _speaker
+
+
 def speak_text(text):
-    """Convert text to speech (TTS)."""
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 175)
-    engine.say(text)
-    engine.runAndWait()
+    """Convert text to speech (TTS) with the shared engine."""
+    speaker = get_speaker()
+    speaker.say(text)
+    speaker.wait()
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+_WORDS = re.compile(r"\w+")
+
+
+class SentenceSplitter:
+    """Turns a token stream into complete sentences (decimals like 122.8 stay intact)."""
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def add(self, text: str) -> List[str]:
+        self._buffer += text
+        parts = _SENTENCE_END.split(self._buffer)
+        self._buffer = parts.pop()
+        sentences, current = [], ""
+        for part in parts:
+            current = f"{current} {part}" if current else part
+            if len(current) >= self.min_chars:
+                sentences.append(current)
+                current = ""
+        if current:
+            self._buffer = f"{current} {self._buffer}" if self._buffer else current + " "
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def _stations(query: str) -> List[str]:
+    if not ASR_NORMALIZE:
+        return []
+    from src.uia.normalizer import get_normalizer
+
+    return get_normalizer().normalize(query).stations
+
+
+def _metar_context(station: str) -> Optional[str]:
+    """Raw + decoded METAR for a recognised station (None when unavailable)."""
+    from src.integrations.aviation_weather import decode_metar
+    from src.uia.normalizer import get_normalizer
+
+    raw = get_normalizer().metar(station)
+    if not raw or raw.startswith("Error") or "No METAR" in raw:
+        return None
+    return f"{raw}\n{decode_metar(raw)}"
 
 
-def run_voice_assistant():
-    """Full pipeline: record → transcribe → query RAG → speak response."""
-    filename = record_audio()
-    query = transcribe_audio(filename)
+def _same_query(a: str, b: str) -> bool:
+    return _WORDS.findall(a.lower()) == _WORDS.findall(b.lower())
+
+
+class VoicePipeline:
+    """
+    Overlapped listen → retrieve → generate → speak.
+
+    - Retrieval is started on every partial transcript (latest one wins);
+      if the final transcript matches it, the chunks are already there
+    - The final transcript goes through the query router: matching
+      emergency checklists are spoken verbatim, and the route decides
+      whether the manual chunks, METAR and telemetry go into the prompt
+    - Generation streams tokens; each completed sentence goes straight to
+      the persistent TTS engine while the rest is still being generated
+    - Stage timings are measured per interaction, from the moment the end
+      of the utterance was detected
+
+    Timings (seconds): transcribe, retrieve (wait after the final
+    transcript; 0 when the speculative result was reused; retrieval routes
+    only), first_token, first_sentence, first_audio, generate, speak_done,
+    and metar (wait for the report) when a weather route names a station.
+    """
+
+    def __init__(self, service=None, model=None, speaker: Speaker = None, speak: bool = True,
+                 procedures=None, **transcriber_kwargs):
+        self.service = service
+        self.model = model
+        self.speaker = speaker
+        self.speak = speak
+        self.procedures = procedures
+        self.transcriber_kwargs = transcriber_kwargs
+        self._router = None
+
+    def _get_router(self, engine):
+        """One QueryRouter per embedding model (embeddings survive index swaps)."""
+        from src.rag.router import QueryRouter
+
+        embeddings = getattr(engine, "embeddings", None)
+        if self._router is None or self._router[0] is not embeddings:
+            self._router = (embeddings, QueryRouter(embeddings))
+        return self._router[1]
+
+    def run(self, chunks: Iterable[np.ndarray], on_partial: Optional[Callable[[str], None]] = None,
+            on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        service = self.service
+        if service is None:
+            from src.rag.service import get_service
+
+            service = get_service()
+        speaker = (self.speaker or get_speaker()) if self.speak else None
+        timings: Dict[str, float] = {}
+
+        with service.acquire() as engine, ThreadPoolExecutor(1, thread_name_prefix="voice-retrieve") as pool:
+            speculative = {}
+
+            def partial(text: str):
+                if on_partial:
+                    on_partial(text)
+                if not text or (speculative and _same_query(speculative["query"], text)):
+                    return
+                if speculative:
+                    speculative["future"].cancel()
+                speculative.update(query=text, future=pool.submit(engine.retrieve, text))
+
+            transcriber = StreamingTranscriber(model=self.model, on_partial=partial, **self.transcriber_kwargs)
+            query = transcriber.run(chunks)
+            end_of_speech = time.perf_counter() - transcriber.last_transcribe_s
+            timings["transcribe"] = transcriber.last_transcribe_s
+            result = {"query": query, "answer": "", "route": None, "sources": [],
+                      "speculative_retrieval": False, "metar": None, "tts_error": None, "timings": timings}
+            if not query:
+                return result
+
+            def mark(stage: str):
+                timings.setdefault(stage, time.perf_counter() - end_of_speech)
+
+            from src.rag.router import answer_procedure, routed_prompt
+
+            fast = answer_procedure(query, self.procedures)
+            if fast is not None:
+                # Verbatim checklist: nothing to retrieve or generate
+                result["route"] = "procedure"
+                docs, tokens = [], iter([fast["answer"]])
+            else:
+                route, query_vec = self._get_router(engine).route(query)
+                result["route"] = route.name
+                docs = metar = None
+                if route.retrieval:
+                    start = time.perf_counter()
+                    future = speculative.get("future")
+                    if future is not None and not future.cancelled() and _same_query(speculative["query"], query):
+                        docs = future.result()
+                        result["speculative_retrieval"] = True
+                    else:
+                        docs = engine.retrieve(query, embedding=query_vec)
+                    timings["retrieve"] = time.perf_counter() - start
+
+                stations = _stations(query)
+                if route.metar and stations:
+                    # Fetch was started by the normalizer as soon as the station was heard
+                    start = time.perf_counter()
+                    metar = _metar_context(stations[0]) or "Not available"
+                    timings["metar"] = time.perf_counter() - start
+
+                prompt, docs, metar, _ = routed_prompt(query, route, engine, query_vec, docs=docs, metar=metar)
+                if route.metar and metar != "Not available":
+                    result["metar"] = metar
+                tokens = engine.generate_stream(prompt)
+
+            splitter, pieces = SentenceSplitter(), []
+
+            def emit(sentence: str):
+                mark("first_sentence")
+                if speaker:
+                    speaker.say(sentence, on_start=lambda: mark("first_audio"))
+
+            start = time.perf_counter()
+            for token in tokens:
+                mark("first_token")
+                pieces.append(token)
+                if on_token:
+                    on_token(token)
+                for sentence in splitter.add(token):
+                    emit(sentence)
+            for sentence in splitter.flush():
+                emit(sentence)
+            timings["generate"] = time.perf_counter() - start
+
+        if speaker:
+            try:
+                speaker.wait()
+            except TTSError as e:
+                # The text answer is still good; report the audio failure alongside it
+                print(f"⚠️ {e}")
+                result["tts_error"] = str(e)
+        mark("speak_done")
+
+        for stage, seconds in timings.items():
+            inst.observe("voice_stage_seconds", seconds, stage=stage)
+        result.update(answer="".join(pieces).strip(), sources=docs,
+                      timings={k: round(v, 3) for k, v in timings.items()})
+        return result
+
+
+def print_timings(timings: Dict[str, float]):
+    print("⏱️  " + "  ".join(f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in timings.items()))
+
+
+def run_voice_assistant(streaming: bool = True, duration: int = 5, wav: Optional[str] = None,
+                        speak: bool = True, pipelined: bool = True):
+    """Full pipeline: listen → transcribe → query RAG → speak response."""
+    preload_whisper()
+    if pipelined and (streaming or wav):
+        chunks = wav_chunks(wav, realtime=True) if wav else microphone_chunks()
+        print("🎙️ Listening (stops when you stop speaking)...")
+        result = VoicePipeline(speak=speak).run(
+            chunks,
+            on_partial=lambda t: print("… " + t),
+            on_token=lambda t: print(t, end="", flush=True),
+        )
+        print()
+        print("🗣️ Transcribed text:", result["query"] or "(no speech detected)")
+        print_timings(result["timings"])
+        return result
+
+    if wav:
+        query = listen(wav_chunks(wav), on_partial=lambda t: print("… " + t))
+    elif streaming:
+        print("🎙️ Listening (stops when you stop speaking)...")
+        query = listen(microphone_chunks(), on_partial=lambda t: print("… " + t))
+    else:
+        query = transcribe_audio(record_audio(duration))
+    print("🗣️ Transcribed text:", query)
+    if not query:
+        print("⚠️ No speech detected")
+        return
     response = get_ai_response(query)
-    speak_text(response)
+    if speak:
+        try:
+            speak_text(response)
+        except TTSError as e:
+            print(f"⚠️ {e}")
 
 
 if __name__ == "__main__":
-    run_voice_assistant()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlightLens voice assistant")
+    parser.add_argument("--fixed", type=int, metavar="SECONDS", help="Record a fixed-length clip instead of streaming")
+    parser.add_argument("--wav", help="Use a WAV file instead of the microphone")
+    parser.add_argument("--no-tts", action="store_true", help="Print the answer only")
+    parser.add_argument("--sequential", action="store_true", help="Transcribe, answer, then speak (no overlap)")
+    args = parser.parse_args()
+
+    run_voice_assistant(streaming=args.fixed is None, duration=args.fixed or 5, wav=args.wav,
+                        speak=not args.no_tts, pipelined=not args.sequential)
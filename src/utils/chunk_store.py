@@ -0,0 +1,369 @@
+"""
+Columnar binary chunk store for FlightLens
+Compact replacement for chunks.jsonl that loads without JSON parsing:
+- chunk texts as one UTF-8 blob plus an offsets array (random access by chunk id)
+- metadata stored column by column: integer columns (page, chunk_index, ...)
+  as int32 arrays, string columns (source, section, block_type) interned
+  into a table of distinct values plus int32 codes; anything else falls
+  back to a per-chunk JSON column
+- the file is memory-mapped, so arrays and text slices are zero-copy views
+
+Layout (little-endian, arrays 8-byte aligned):
+    b"FLCHUNK1" | uint64 header length | JSON header | text offsets (uint64[n+1])
+    | text blob | metadata columns
+
+Written next to chunks.jsonl as chunks.bin by ingest; convert either way with
+    python -m src.utils.chunk_store to-bin data/processed/chunks.jsonl
+    python -m src.utils.chunk_store to-jsonl data/processed/chunks.bin
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+MAGIC = b"FLCHUNK1"
+FORMAT_VERSION = 1
+ALIGN = 8
+
+# Sentinels in int32 columns / string codes: key absent vs. key present with null
+INT_ABSENT, INT_NULL = np.iinfo(np.int32).min, np.iinfo(np.int32).min + 1
+CODE_ABSENT, CODE_NULL = -1, -2
+_INT_LO, _INT_HI = INT_NULL + 1, np.iinfo(np.int32).max
+_ABSENT = object()
+
+
+def _pad(n: int) -> int:
+    return (-n) % ALIGN
+
+
+def _column_kind(values: List[Any]) -> str:
+    present = [v for v in values if v is not _ABSENT and v is not None]
+    if all(type(v) is int and _INT_LO <= v <= _INT_HI for v in present):
+        return "int"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    return "json"
+
+
+# -------------------------------------------------------------------
+# Writer
+# -------------------------------------------------------------------
+def write_chunk_store(path: Union[str, Path], chunks: Iterable[Dict]) -> Path:
+    """
+    Write chunk records ({"text": ..., "metadata": {...}}) as a chunk store
+
+    Returns:
+        The written path
+    """
+    chunks = list(chunks)
+    n = len(chunks)
+    keys: Dict[str, None] = {}
+    for ch in chunks:
+        extra = set(ch) - {"text", "metadata"}
+        if extra:
+            raise ValueError(f"Chunk store holds text + metadata only, got keys {sorted(extra)}")
+        keys.update(dict.fromkeys(ch.get("metadata") or {}))
+
+    encoded = [(ch.get("text") or "").encode("utf-8") for ch in chunks]
+    offsets = np.zeros(n + 1, dtype="<u8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blobs = [offsets.tobytes(), b"".join(encoded)]
+
+    columns = []
+    for key in keys:
+        values = [(ch.get("metadata") or {}).get(key, _ABSENT) for ch in chunks]
+        kind = _column_kind(values)
+        column = {"name": key, "kind": kind}
+        if kind == "int":
+            data = np.array([INT_ABSENT if v is _ABSENT else INT_NULL if v is None else v for v in values], dtype="<i4")
+            blobs.append(data.tobytes())
+        elif kind == "str":
+            table = sorted({v for v in values if isinstance(v, str)})
+            code = {s: i for i, s in enumerate(table)}
+            data = np.array([CODE_ABSENT if v is _ABSENT else CODE_NULL if v is None else code[v] for v in values], dtype="<i4")
+            column["values"] = table
+            blobs.append(data.tobytes())
+        else:
+            items = [b"" if v is _ABSENT else json.dumps(v).encode("utf-8") for v in values]
+            item_offsets = np.zeros(n + 1, dtype="<u8")
+            np.cumsum([len(b) for b in items], out=item_offsets[1:])
+            blobs.append(item_offsets.tobytes())
+            blobs.append(b"".join(items))
+        columns.append(column)
+
+    # Section positions are relative to the end of the header; the reader adds its offset
+    sections, pos = [], 0
+    for blob in blobs:
+        sections.append([pos, len(blob)])
+        pos += len(blob) + _pad(len(blob))
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "count": n,
+        "columns": columns,
+        "sections": sections,
+    }).encode("utf-8")
+
+    from src.utils.files import atomic_write
+
+    path = Path(path)
+    with atomic_write(path) as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * _pad(len(MAGIC) + 8 + len(header)))
+        for blob in blobs:
+            f.write(blob)
+            f.write(b"\0" * _pad(len(blob)))
+    return path
+
+
+# -------------------------------------------------------------------
+# Reader
+# -------------------------------------------------------------------
+class ChunkStore:
+    """
+    Memory-mapped chunk store.
+
+    Usage:
+        with ChunkStore("data/processed/chunks.bin") as store:
+            store[42]                     # {"text": ..., "metadata": {...}}
+            store.text(42)                # str, decoded from the mapped blob
+            store.column("page")          # int32 array view (INT_ABSENT / INT_NULL for gaps)
+            for batch in store.iter_batches(1024):
+                batch["text"], batch["source"]
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                                   # empty file
+            self._file.close()
+            raise ValueError(f"{self.path} is not a chunk store (empty file)")
+        self._buf = memoryview(self._mm)
+
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a chunk store")
+        (header_len,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(self._buf[start:start + header_len]))
+        if header["version"] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported chunk store version {header['version']} in {self.path}")
+        base = start + header_len + _pad(start + header_len)
+
+        self.count = header["count"]
+        sections = iter([(base + pos, size) for pos, size in header["sections"]])
+        self._offsets = self._array(next(sections), "<u8")
+        self._text_start = next(sections)[0]
+
+        self.columns: Dict[str, Dict] = {}
+        for column in header["columns"]:
+            column = dict(column)
+            if column["kind"] == "json":
+                column["offsets"] = self._array(next(sections), "<u8")
+                column["start"] = next(sections)[0]
+            else:
+                column["data"] = self._array(next(sections), "<i4")
+            self.columns[column["name"]] = column
+
+    def _array(self, section, dtype) -> np.ndarray:
+        offset, size = section
+        return np.frombuffer(self._mm, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=offset)
+
+    # ------------------------------------------------------------------
+    # Random access
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self.count
+
+    def _index(self, i: int) -> int:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"chunk {i} out of range (0..{self.count - 1})")
+        return i
+
+    def text_bytes(self, i: int) -> memoryview:
+        """UTF-8 bytes of chunk i, as a zero-copy view into the file."""
+        i = self._index(i)
+        return self._buf[self._text_start + int(self._offsets[i]):self._text_start + int(self._offsets[i + 1])]
+
+    def text(self, i: int) -> str:
+        return str(self.text_bytes(i), "utf-8")
+
+    def texts(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Texts of chunks [start, stop), decoded from one contiguous slice."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return []
+        offsets = self._offsets[start:stop + 1]
+        base = self._text_start
+        blob = self._buf[base + int(offsets[0]):base + int(offsets[-1])]
+        rel = (offsets - offsets[0]).tolist()
+        return [str(blob[a:b], "utf-8") for a, b in zip(rel, rel[1:])]
+
+    def value(self, name: str, i: int) -> Any:
+        """One metadata value (None when absent or null)."""
+        return self._value(self.columns[name], self._index(i))
+
+    def _value(self, column: Dict, i: int):
+        if column["kind"] == "json":
+            a, b = int(column["offsets"][i]), int(column["offsets"][i + 1])
+            return json.loads(bytes(self._buf[column["start"] + a:column["start"] + b])) if b > a else None
+        v = int(column["data"][i])
+        if column["kind"] == "int":
+            return None if v in (INT_ABSENT, INT_NULL) else v
+        return column["values"][v] if v >= 0 else None
+
+    def _metadata(self, i: int) -> Dict:
+        meta = {}
+        for name, column in self.columns.items():
+            if column["kind"] == "json":
+                if column["offsets"][i] != column["offsets"][i + 1]:
+                    meta[name] = self._value(column, i)
+            elif column["data"][i] != (INT_ABSENT if column["kind"] == "int" else CODE_ABSENT):
+                meta[name] = self._value(column, i)
+        return meta
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.count)
+            if step == 1:
+                return self.records(start, stop)
+            return [self[j] for j in range(start, stop, step)]
+        i = self._index(i)
+        return {"text": self.text(i), "metadata": self._metadata(i)}
+
+    def _decoded(self, column: Dict, start: int, stop: int) -> List:
+        """Python values of one column for chunks [start, stop) (_ABSENT where the key is missing)."""
+        if column["kind"] == "json":
+            offsets = column["offsets"][start:stop + 1].tolist()
+            base = column["start"]
+            return [json.loads(bytes(self._buf[base + a:base + b])) if b > a else _ABSENT
+                    for a, b in zip(offsets, offsets[1:])]
+        data = column["data"][start:stop].tolist()
+        if column["kind"] == "int":
+            return [_ABSENT if v == INT_ABSENT else None if v == INT_NULL else v for v in data]
+        table = column["values"]
+        return [table[v] if v >= 0 else _ABSENT if v == CODE_ABSENT else None for v in data]
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """Chunk records [start, stop), decoded a column at a time."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return []
+        columns = [(name, self._decoded(column, start, stop)) for name, column in self.columns.items()]
+        out = []
+        for j, text in enumerate(self.texts(start, stop)):
+            meta = {}
+            for name, values in columns:
+                if values[j] is not _ABSENT:
+                    meta[name] = values[j]
+            out.append({"text": text, "metadata": meta})
+        return out
+
+    def __iter__(self) -> Iterator[Dict]:
+        for start in range(0, self.count, 4096):
+            yield from self.records(start, start + 4096)
+
+    # ------------------------------------------------------------------
+    # Columnar access
+    # ------------------------------------------------------------------
+    def column(self, name: str) -> np.ndarray:
+        """
+        Raw column as a zero-copy array: int32 values (INT_ABSENT / INT_NULL
+        for gaps) or string codes into values(name) (negative for gaps).
+        JSON columns are decoded into an object array.
+        """
+        column = self.columns[name]
+        if column["kind"] == "json":
+            return np.array([self._value(column, i) for i in range(self.count)], dtype=object)
+        return column["data"]
+
+    def values(self, name: str) -> List[str]:
+        """Distinct values of an interned string column (codes index into this list)."""
+        return list(self.columns[name].get("values", []))
+
+    def iter_batches(self, batch_size: int = 1024, fields: Iterable[str] = None) -> Iterator[Dict]:
+        """
+        Columnar batches: {"ids": range, "text": [str], <column>: array slice, ...}
+
+        Integer and string-code columns are zero-copy slices of the mapped file.
+        """
+        fields = list(self.columns) if fields is None else [f for f in fields if f != "text"]
+        for start in range(0, self.count, batch_size):
+            stop = min(start + batch_size, self.count)
+            batch = {"ids": range(start, stop), "text": self.texts(start, stop)}
+            for name in fields:
+                column = self.columns[name]
+                if column["kind"] == "json":
+                    batch[name] = [self._value(column, i) for i in range(start, stop)]
+                else:
+                    batch[name] = column["data"][start:stop]
+            yield batch
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self):
+        self._offsets = None
+        self.columns = {}
+        if getattr(self, "_buf", None) is not None:
+            try:
+                self._buf.release()
+            except BufferError:
+                pass
+            self._buf = None
+        if getattr(self, "_mm", None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass        # arrays handed out still reference the map; freed with them
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------------------------------------------------
+# Converters
+# -------------------------------------------------------------------
+def jsonl_to_chunk_store(src: Union[str, Path], dst: Union[str, Path] = None) -> Path:
+    """chunks.jsonl → chunks.bin (default: same name, .bin suffix)."""
+    from src.utils.files import read_jsonl_parallel
+
+    src = Path(src)
+    return write_chunk_store(dst or src.with_suffix(".bin"), read_jsonl_parallel(src))
+
+
+def chunk_store_to_jsonl(src: Union[str, Path], dst: Union[str, Path] = None) -> Path:
+    """chunks.bin → chunks.jsonl (default: same name, .jsonl suffix)."""
+    from src.utils.files import write_jsonl
+
+    src = Path(src)
+    dst = Path(dst or src.with_suffix(".jsonl"))
+    with ChunkStore(src) as store:
+        write_jsonl(dst, store)
+    return dst
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ("to-bin", "to-jsonl"):
+        print("Usage: python -m src.utils.chunk_store to-bin|to-jsonl SRC [DST]")
+        sys.exit(1)
+    convert = jsonl_to_chunk_store if sys.argv[1] == "to-bin" else chunk_store_to_jsonl
+    out = convert(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"✅ {sys.argv[2]} → {out}")
@@ -3,6 +3,12 @@ Microsoft Flight Simulator SimConnect Integration
 Provides real-time aircraft telemetry data
 """
 
+import threading
+import time
+
+from src.utils import instrumentation as inst
+from src.utils.telemetry_buffer import TelemetryRingBuffer
+
 # Try to import SimConnect (Windows only)
 try:
     from SimConnect import SimConnect, AircraftRequests
@@ -17,9 +23,14 @@ class MSFSContext:
     Falls back to mock data if SimConnect unavailable
     """
     
-    def __init__(self):
+    def __init__(self, history_size: int = 120):
         self.connected = False
         self.mode = "MOCK"
+        self.history = TelemetryRingBuffer(capacity=history_size)
+        self.latest = None
+        self._history_lock = threading.Lock()
+        self._sampler = None
+        self._stop_sampling = threading.Event()
         
         if SIMCONNECT_AVAILABLE:
             try:
@@ -41,26 +52,70 @@ class MSFSContext:
         Returns:
             Dictionary with telemetry data
         """
+        inst.inc("telemetry_reads_total", mode=self.mode)
         if not self.connected:
-            return self._get_mock_status()
+            status = self._get_mock_status()
+            self._record(status)
+            return status
         
         try:
-            return {
-                "altitude": self.aq.get("INDICATED_ALTITUDE"),
-                "airspeed": self.aq.get("AIRSPEED_INDICATED"),
-                "heading": self.aq.get("HEADING_INDICATOR"),
-                "vertical_speed": self.aq.get("VERTICAL_SPEED"),
-                "fuel_quantity": self.aq.get("FUEL_TOTAL_QUANTITY"),
-                "engine_rpm": self.aq.get("GENERAL_ENG_RPM:1"),
-                "flaps": self.aq.get("FLAPS_HANDLE_INDEX"),
-                "pitch": self.aq.get("PLANE_PITCH_DEGREES"),
-                "roll": self.aq.get("PLANE_BANK_DEGREES"),
-                "mode": "LIVE"
-            }
+            with inst.span("telemetry.read"):
+                status = {
+                    "altitude": self.aq.get("INDICATED_ALTITUDE"),
+                    "airspeed": self.aq.get("AIRSPEED_INDICATED"),
+                    "heading": self.aq.get("HEADING_INDICATOR"),
+                    "vertical_speed": self.aq.get("VERTICAL_SPEED"),
+                    "fuel_quantity": self.aq.get("FUEL_TOTAL_QUANTITY"),
+                    "engine_rpm": self.aq.get("GENERAL_ENG_RPM:1"),
+                    "flaps": self.aq.get("FLAPS_HANDLE_INDEX"),
+                    "pitch": self.aq.get("PLANE_PITCH_DEGREES"),
+                    "roll": self.aq.get("PLANE_BANK_DEGREES"),
+                    "mode": "LIVE"
+                }
+            self._record(status)
+            return status
         except Exception as e:
             print(f"Error reading telemetry: {e}")
+            inst.inc("telemetry_errors_total")
             return self._get_mock_status()
     
+    def _record(self, status):
+        with self._history_lock:
+            self.history.push(status)
+            self.latest = status
+
+    def start_sampler(self, hz: float = 1.0) -> threading.Thread:
+        """
+        Poll telemetry on a background thread at a fixed rate
+
+        Readers (UI panels, prompts) then use snapshot() / get_trend_summary()
+        and never wait on SimConnect themselves.
+        """
+        if self._sampler is not None and self._sampler.is_alive():
+            return self._sampler
+        period = 1.0 / hz
+        self._stop_sampling.clear()
+
+        def sample():
+            while not self._stop_sampling.is_set():
+                start = time.monotonic()
+                self.get_status()
+                self._stop_sampling.wait(max(0.0, period - (time.monotonic() - start)))
+
+        self._sampler = threading.Thread(target=sample, name="telemetry-sampler", daemon=True)
+        self._sampler.start()
+        return self._sampler
+
+    def stop_sampler(self):
+        self._stop_sampling.set()
+
+    def snapshot(self):
+        """(latest status, trend features) from the history, without a new read."""
+        if self.latest is None:
+            self.get_status()
+        with self._history_lock:
+            return dict(self.latest), self.history.trends()
+
     def _get_mock_status(self):
         """
         Return mock telemetry data for testing
@@ -90,6 +145,15 @@ class MSFSContext:
             f"VS: {status['vertical_speed']:.0f} fpm"
         )
 
+    def get_trend_summary(self):
+        """
+        Get compact trend summary over recent samples (for decision-support prompts)
+        """
+        if not len(self.history):
+            self.get_status()
+        with self._history_lock:
+            return self.history.format_for_prompt()
+
 
 if __name__ == "__main__":
     # Test SimConnect
@@ -101,3 +165,6 @@ if __name__ == "__main__":
     
     print("\nSummary:")
     print(sim.get_contextual_summary())
+
+    print("\nTrends:")
+    print(sim.get_trend_summary())
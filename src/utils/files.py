@@ -1,12 +1,135 @@
 """
 File utility functions for FlightLens
+
+JSONL helpers use the fastest available codec (orjson, then msgspec, then
+the stdlib json; FLIGHTLENS_JSON_CODEC picks one explicitly), read and
+write .gz / .zst files transparently, and write atomically (temp file +
+rename) so a crashed job never leaves a half-written file behind.
 """
 
+import gzip
+import io
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, Dict, Any
+from typing import Generator, Dict, Any, Iterable, List, Optional, Tuple
+
+from src.utils.chunk_store import (
+    ChunkStore,
+    chunk_store_to_jsonl,
+    jsonl_to_chunk_store,
+    write_chunk_store,
+)
+
+JSON_CODEC = os.getenv("FLIGHTLENS_JSON_CODEC", "auto")   # auto | orjson | msgspec | json
+WRITE_BUFFER_BYTES = 1 << 20
+PARALLEL_MIN_BYTES = 32 << 20       # smaller files parse faster in one process
+_READ_BLOCK = 1 << 20
+
+# -------------------------------------------------------------------
+# JSON codec
+# -------------------------------------------------------------------
+def _load_codec(name: str):
+    """(name, dumps -> bytes, loads from bytes/str) for the requested codec."""
+    if name in ("auto", "orjson"):
+        try:
+            import orjson
+
+            options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            return "orjson", lambda obj: orjson.dumps(obj, option=options), orjson.loads
+        except ImportError:
+            if name == "orjson":
+                raise
+    if name in ("auto", "msgspec"):
+        try:
+            import msgspec
+
+            encoder, decoder = msgspec.json.Encoder(), msgspec.json.Decoder()
+            return "msgspec", encoder.encode, decoder.decode
+        except ImportError:
+            if name == "msgspec":
+                raise
+    if name not in ("auto", "json"):
+        raise ValueError(f"Unknown JSON codec '{name}' (auto, orjson, msgspec, json)")
+    return "json", lambda obj: json.dumps(obj).encode("utf-8"), json.loads
+
+CODEC, dumps_bytes, loads = _load_codec(JSON_CODEC)
+
+# -------------------------------------------------------------------
+# Streams
+# -------------------------------------------------------------------
+def open_stream(path: str, mode: str = "rb"):
+    """
+    Open a binary stream, (de)compressing by suffix
+
+    .gz uses gzip, .zst uses zstandard (pip install zstandard); anything
+    else is a plain buffered file.
+
+    Args:
+        path: File path
+        mode: "rb" or "wb"
+    """
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, mode, compresslevel=6)
+    if suffix == ".zst":
+        import zstandard
+
+        raw = open(path, mode)
+        if "r" in mode:
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+    return open(path, mode)
 
+@contextmanager
+def atomic_write(path: str, mode: str = "wb"):
+    """
+    Write to a temp file in the target directory, then rename over path
+
+    Readers see either the old file or the complete new one. On error the
+    temp file is removed and path is left untouched.
+
+    Usage:
+        with atomic_write("data/processed/chunks.jsonl") as f:
+            f.write(b"...")
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Created 0666 so the kernel applies the umask (mkstemp would make it 0600)
+    while True:
+        tmp = path.parent / f".{path.name}.{os.urandom(4).hex()}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+
+    f = None
+    try:
+        f = os.fdopen(fd, mode)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)   # keep the replaced file's mode
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if f is None:
+            os.close(fd)
+        else:
+            f.close()
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+# -------------------------------------------------------------------
+# Directories
+# -------------------------------------------------------------------
 def ensure_dirs():
     """
     Create all required directories for FlightLens
@@ -18,52 +141,188 @@ def ensure_dirs():
         "evaluate/results",
         "logs"
     ]
-    
+
     for directory in directories:
         Path(directory).mkdir(parents=True, exist_ok=True)
         print(f"✅ {directory}")
 
+# -------------------------------------------------------------------
+# JSONL
+# -------------------------------------------------------------------
 def read_jsonl(path: str) -> Generator[Dict[str, Any], None, None]:
     """
-    Read JSONL file line by line
-    
+    Read JSONL file line by line (.gz / .zst decompressed on the fly)
+
     Args:
         path: Path to JSONL file
-    
+
     Yields:
-        Parsed JSON objects
+        Parsed JSON objects (blank lines are skipped)
     """
-    with open(path, "r", encoding="utf-8") as f:
+    with open_stream(path, "rb") as f:
         for line in f:
-            yield json.loads(line)
+            if line.strip():
+                yield loads(line)
 
-def write_jsonl(path: str, data: list):
+def write_jsonl(path: str, data: Iterable[Dict[str, Any]], atomic: bool = True):
     """
-    Write list of dicts to JSONL file
-    
+    Write dicts to a JSONL file (compressed by suffix, see open_stream)
+
+    Lines are encoded with the fast codec and written in ~1 MB blocks.
+
     Args:
         path: Output file path
-        data: List of dictionaries to write
+        data: Dictionaries to write (any iterable; consumed once)
+        atomic: Write to a temp file and rename it into place
+
+    Returns:
+        Number of lines written
     """
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(path, "w", encoding="utf-8") as f:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(f) -> int:
+        stream = f if path.suffix not in (".gz", ".zst") else _compressor(path, f)
+        buffer, size, count = [], 0, 0
         for item in data:
-            json.dump(item, f)
-            f.write("\n")
+            line = dumps_bytes(item) + b"\n"
+            buffer.append(line)
+            size += len(line)
+            count += 1
+            if size >= WRITE_BUFFER_BYTES:
+                stream.write(b"".join(buffer))
+                buffer, size = [], 0
+        stream.write(b"".join(buffer))
+        if stream is not f:
+            stream.close()
+        return count
+
+    if atomic:
+        with atomic_write(path) as f:
+            return write(f)
+    with open(path, "wb") as f:
+        return write(f)
+
+def _compressor(path: Path, raw):
+    """Compressing writer over an already-open file (left open for atomic_write to sync)."""
+    if path.suffix == ".gz":
+        return gzip.GzipFile(filename=path.stem, mode="wb", fileobj=raw, compresslevel=6)
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
 
 def count_jsonl_lines(path: str) -> int:
     """
     Count lines in JSONL file
-    
+
+    Counts newline bytes in 1 MB blocks without decoding; a final line
+    without a trailing newline still counts.
+
     Args:
         path: Path to JSONL file
-    
+
     Returns:
         Number of lines
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return sum(1 for _ in f)
+    count, last = 0, b"\n"
+    with open_stream(path, "rb") as f:
+        while True:
+            block = f.read(_READ_BLOCK)
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+def _line_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into ~equal byte ranges that start and end on line boundaries."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()                                  # move to the next line start
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def _parse_range(path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        block = f.read(end - start)
+    return [loads(line) for line in block.splitlines() if line.strip()]
+
+def read_jsonl_parallel(path: str, workers: Optional[int] = None,
+                        min_bytes: int = PARALLEL_MIN_BYTES) -> List[Dict[str, Any]]:
+    """
+    Parse a large JSONL file across processes, split by byte offsets
+
+    Each worker seeks to its range (aligned to line boundaries) and parses
+    it; results keep file order. Compressed and small files are read
+    in this process.
+
+    Parsed records are pickled back to the parent, which costs about as
+    much as orjson/msgspec parsing itself, so by default only the stdlib
+    codec is parallelised.
+
+    Args:
+        path: Path to JSONL file
+        workers: Processes to use (default: CPU count with the stdlib codec, else 1)
+        min_bytes: Files smaller than this are parsed sequentially
+    """
+    if workers is None:
+        workers = (os.cpu_count() or 1) if CODEC == "json" else 1
+    if Path(path).suffix in (".gz", ".zst") or workers < 2 or os.path.getsize(path) < min_bytes:
+        return list(read_jsonl(path))
+
+    ranges = _line_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        parts = pool.map(_parse_range, [path] * len(ranges), *zip(*ranges))
+        return [item for part in parts for item in part]
+
+# -------------------------------------------------------------------
+# Chunks
+# -------------------------------------------------------------------
+def chunk_store_path(path: str) -> Path:
+    """chunks.bin next to a chunks.jsonl path"""
+    return Path(path).with_suffix(".bin")
+
+def open_chunk_store(path: str) -> Optional[ChunkStore]:
+    """
+    Open the binary chunk store for a chunks.jsonl path
+
+    The store is used when it exists and is at least as new as the JSONL
+    (a JSONL edited or rewritten afterwards wins).
+
+    Returns:
+        ChunkStore, or None to fall back to the JSONL
+    """
+    path = Path(path)
+    store = path if path.suffix == ".bin" else chunk_store_path(path)
+    if not store.exists():
+        return None
+    if store != path and path.exists() and path.stat().st_mtime > store.stat().st_mtime:
+        return None
+    return ChunkStore(store)
+
+def read_chunks(path: str) -> List[Dict[str, Any]]:
+    """
+    All chunk records ({"text", "metadata"}) from chunks.jsonl,
+    read from the binary chunk store when available
+    """
+    store = open_chunk_store(path)
+    if store is not None:
+        with store:
+            return list(store)
+    return read_jsonl_parallel(path)
+
+def read_chunk_texts(path: str) -> List[str]:
+    """Chunk texts only (no metadata decoding on the binary path)"""
+    store = open_chunk_store(path)
+    if store is not None:
+        with store:
+            return store.texts()
+    return [item["text"] for item in read_jsonl(path)]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,485 @@
+"""
+Lightweight instrumentation for FlightLens
+Spans, counters, gauges and histograms for the RAG pipeline, ingestion,
+weather fetches and telemetry polling.
+
+- Disabled by default: span() returns a shared no-op context manager and
+  inc/observe/set_gauge return after one flag check, so instrumented code
+  costs next to nothing. Enable with FLIGHTLENS_METRICS=1 or enable().
+- Every span records its duration in the "<name>_seconds" histogram and is
+  kept (bounded) for trace export
+- Export: Prometheus text (serve() exposes /metrics and /metrics.json on
+  localhost; long-running processes call serve_if_enabled()), JSON dump,
+  and OTLP/JSON payloads for an OpenTelemetry collector
+
+Usage:
+    from src.utils import instrumentation as inst
+
+    with inst.span("rag.retrieve", k=3):
+        docs = db.similarity_search(query)
+    inst.inc("cache_hits_total", cache="metar")
+    inst.observe("llm_tokens_generated", 42)
+"""
+
+import bisect
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENABLED = os.getenv("FLIGHTLENS_METRICS", "0") == "1"
+METRICS_PORT = int(os.getenv("FLIGHTLENS_METRICS_PORT", "9464"))
+METRICS_DIR = os.getenv("FLIGHTLENS_METRICS_DIR", "logs/metrics")
+MAX_SPANS = 2000
+SERVICE_NAME = "flightlens"
+
+# Seconds; covers FAISS lookups (sub-ms) through FLAN-T5 decode (tens of seconds)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# -------------------------------------------------------------------
+# Metric types
+# -------------------------------------------------------------------
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.values: Dict[LabelKey, float] = {}
+
+    def add(self, value: float, labels: LabelKey):
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, labels: LabelKey):
+        self.values[labels] = value
+
+    def add(self, value: float, labels: LabelKey):
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self.values: Dict[LabelKey, List] = {}   # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, labels: LabelKey):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+
+class Registry:
+    """All metrics and finished spans of the process."""
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, object] = {}
+        self.spans = deque(maxlen=max_spans)
+        self.started = time.time()
+
+    def _get(self, cls, name: str, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, **kwargs)
+        return metric
+
+    def inc(self, name: str, value: float, labels: LabelKey):
+        with self._lock:
+            self._get(Counter, name).add(value, labels)
+
+    def set_gauge(self, name: str, value: float, labels: LabelKey, delta: bool = False):
+        with self._lock:
+            gauge = self._get(Gauge, name)
+            (gauge.add if delta else gauge.set)(value, labels)
+
+    def observe(self, name: str, value: float, labels: LabelKey, buckets=None):
+        with self._lock:
+            hist = self._get(Histogram, name, **({"buckets": buckets} if buckets else {}))
+            hist.observe(value, labels)
+
+    def reset(self):
+        with self._lock:
+            self.metrics.clear()
+            self.spans.clear()
+
+
+REGISTRY = Registry()
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+def enabled() -> bool:
+    return ENABLED
+
+
+# -------------------------------------------------------------------
+# Recording API
+# -------------------------------------------------------------------
+def inc(name: str, value: float = 1.0, **labels):
+    if ENABLED:
+        REGISTRY.inc(name, value, _labels(labels))
+
+
+def set_gauge(name: str, value: float, **labels):
+    if ENABLED:
+        REGISTRY.set_gauge(name, value, _labels(labels))
+
+
+def add_gauge(name: str, delta: float, **labels):
+    """Increment/decrement a gauge (e.g. queue depth: +1 on enqueue, -1 on dequeue)."""
+    if ENABLED:
+        REGISTRY.set_gauge(name, delta, _labels(labels), delta=True)
+
+
+def observe(name: str, value: float, buckets=None, **labels):
+    if ENABLED:
+        REGISTRY.observe(name, value, _labels(labels), buckets)
+
+
+def cache_result(cache: str, hit: bool):
+    """Count a cache lookup; hit rate = cache_hits_total / cache_lookups_total."""
+    if ENABLED:
+        key = _labels({"cache": cache})
+        REGISTRY.inc("cache_lookups_total", 1.0, key)
+        if hit:
+            REGISTRY.inc("cache_hits_total", 1.0, key)
+
+
+@contextmanager
+def track_inflight(name: str, **labels):
+    """Gauge of concurrent work (queue depth / in-flight requests)."""
+    add_gauge(name, 1, **labels)
+    try:
+        yield
+    finally:
+        add_gauge(name, -1, **labels)
+
+
+# -------------------------------------------------------------------
+# Spans
+# -------------------------------------------------------------------
+_current_span: ContextVar[Optional["Span"]] = ContextVar("flightlens_span", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """Timed region; nests via contextvars so traces keep parent/child links."""
+
+    __slots__ = ("name", "attrs", "trace_id", "span_id", "parent_id", "start", "end", "error", "_token")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else random.getrandbits(128)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = random.getrandbits(64)
+        self._token = _current_span.set(self)
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        seconds = (self.end - self.start) / 1e9
+        labels = _labels({"error": self.error} if self.error else {})
+        REGISTRY.observe(f"{self.name.replace('.', '_')}_seconds", seconds, labels)
+        REGISTRY.spans.append(self)
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager timing a region (no-op when instrumentation is disabled)."""
+    if not ENABLED:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# -------------------------------------------------------------------
+# Export
+# -------------------------------------------------------------------
+def _prom_labels(labels: LabelKey, extra: Tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def to_prometheus(registry: Registry = REGISTRY) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with registry._lock:
+        for name in sorted(registry.metrics):
+            metric = registry.metrics[name]
+            full = f"{SERVICE_NAME}_{name}"
+            lines.append(f"# TYPE {full} {metric.kind}")
+            for labels, value in sorted(metric.values.items()):
+                if metric.kind != "histogram":
+                    lines.append(f"{full}{_prom_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(metric.buckets) + ["+Inf"], value[:-1]):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{_prom_labels(labels, (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{full}_sum{_prom_labels(labels)} {value[-1]}")
+                lines.append(f"{full}_count{_prom_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_summary(metric: Histogram, state: List) -> Dict:
+    count = sum(state[:-1])
+    return {"count": count, "sum": state[-1], "mean": state[-1] / count if count else 0.0,
+            "buckets": dict(zip([str(b) for b in metric.buckets] + ["+Inf"], state[:-1]))}
+
+
+def to_json(registry: Registry = REGISTRY, spans: int = 100) -> Dict:
+    """Snapshot of all metrics, derived cache hit rates and the most recent spans."""
+    out = {"service": SERVICE_NAME, "uptime_s": round(time.time() - registry.started, 1), "metrics": {}}
+    with registry._lock:
+        for name, metric in registry.metrics.items():
+            series = []
+            for labels, value in metric.values.items():
+                value = _histogram_summary(metric, value) if metric.kind == "histogram" else value
+                series.append({"labels": dict(labels), "value": value})
+            out["metrics"][name] = {"type": metric.kind, "series": series}
+
+        lookups = registry.metrics.get("cache_lookups_total")
+        hits = registry.metrics.get("cache_hits_total")
+        if lookups:
+            out["cache_hit_rate"] = {
+                dict(labels)["cache"]: (hits.values.get(labels, 0.0) if hits else 0.0) / total
+                for labels, total in lookups.values.items() if total
+            }
+        recent = list(registry.spans)[-spans:] if spans else []
+    out["spans"] = [
+        {"name": s.name, "trace_id": f"{s.trace_id:032x}", "span_id": f"{s.span_id:016x}",
+         "parent_id": f"{s.parent_id:016x}" if s.parent_id else None,
+         "duration_ms": (s.end - s.start) / 1e6, "attributes": s.attrs, "error": s.error}
+        for s in recent
+    ]
+    return out
+
+
+def dump_json(path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_json(spans=MAX_SPANS), f, indent=2, default=str)
+    return path
+
+
+def dump_if_enabled(name: str) -> Optional[Path]:
+    """End-of-run JSON dump for batch jobs (ingest, index build, eval)."""
+    if not ENABLED:
+        return None
+    path = dump_json(Path(METRICS_DIR) / f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    print(f"📈 Metrics → {path}")
+    return path
+
+
+def _otlp_value(v):
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_attrs(attrs: Dict) -> List[Dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items()]
+
+
+def to_otlp_traces(registry: Registry = REGISTRY) -> Dict:
+    """Finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in list(registry.spans):
+        item = {
+            "traceId": f"{s.trace_id:032x}",
+            "spanId": f"{s.span_id:016x}",
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start),
+            "endTimeUnixNano": str(s.end),
+            "attributes": _otlp_attrs(s.attrs),
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = f"{s.parent_id:016x}"
+        spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attrs({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "flightlens.instrumentation"}, "spans": spans}],
+    }]}
+
+
+def to_otlp_metrics(registry: Registry = REGISTRY) -> Dict:
+    """Metrics as an OTLP/JSON ExportMetricsServiceRequest (cumulative temporality)."""
+    now = str(time.time_ns())
+    start = str(int(registry.started * 1e9))
+    metrics = []
+    with registry._lock:
+        for name, metric in registry.metrics.items():
+            points = []
+            for labels, value in metric.values.items():
+                point = {"attributes": _otlp_attrs(dict(labels)), "startTimeUnixNano": start, "timeUnixNano": now}
+                if metric.kind == "histogram":
+                    point.update({"count": str(sum(value[:-1])), "sum": value[-1],
+                                  "bucketCounts": [str(c) for c in value[:-1]],
+                                  "explicitBounds": list(metric.buckets)})
+                else:
+                    point["asDouble"] = value
+                points.append(point)
+            if metric.kind == "counter":
+                body = {"sum": {"dataPoints": points, "aggregationTemporality": 2, "isMonotonic": True}}
+            elif metric.kind == "gauge":
+                body = {"gauge": {"dataPoints": points}}
+            else:
+                body = {"histogram": {"dataPoints": points, "aggregationTemporality": 2}}
+            metrics.append({"name": f"{SERVICE_NAME}.{name}", **body})
+    return {"resourceMetrics": [{
+        "resource": {"attributes": _otlp_attrs({"service.name": SERVICE_NAME})},
+        "scopeMetrics": [{"scope": {"name": "flightlens.instrumentation"}, "metrics": metrics}],
+    }]}
+
+
+def export_otlp(endpoint: str = None, timeout: float = 5.0) -> bool:
+    """
+    POST spans and metrics to an OTLP/HTTP collector (JSON encoding)
+
+    Args:
+        endpoint: Collector base URL (default: OTEL_EXPORTER_OTLP_ENDPOINT)
+    """
+    import requests
+
+    endpoint = (endpoint or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")).rstrip("/")
+    try:
+        for path, payload in (("/v1/traces", to_otlp_traces()), ("/v1/metrics", to_otlp_metrics())):
+            requests.post(endpoint + path, json=payload, timeout=timeout).raise_for_status()
+        return True
+    except Exception as e:
+        print(f"⚠️  OTLP export to {endpoint} failed: {e}")
+        return False
+
+
+def serve(port: int = METRICS_PORT, host: str = "127.0.0.1"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = json.dumps(to_json(), default=str).encode(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = to_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 Metrics at http://{host}:{server.server_port}/metrics")
+    return server
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_if_enabled(port: int = METRICS_PORT):
+    """
+    Start the /metrics endpoint once per process for long-running services
+    (daemon, UI) when FLIGHTLENS_METRICS=1
+
+    Returns:
+        The HTTP server, or None when metrics are off or the port is taken
+    """
+    global _server
+    if not ENABLED:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = serve(port)
+            except OSError as e:
+                print(f"⚠️  Metrics endpoint not started on port {port}: {e}")
+        return _server
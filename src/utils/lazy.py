@@ -0,0 +1,32 @@
+"""
+lazy.py
+-------
+PEP 562 lazy exports for package __init__ modules.
+
+Importing a package (e.g. src.rag for the procedure index) should not pull
+in LangChain, transformers or torch; the module that defines an export is
+imported the first time the name is accessed.
+
+    __getattr__, __dir__ = lazy_exports(__name__, {"answer_question": "src.rag.chain"})
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """Module-level __getattr__ / __dir__ resolving `exports` (name → module) on first use."""
+
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        setattr(sys.modules[package], name, value)   # later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,189 @@
+"""
+Model registry for FlightLens
+Single source of truth for which models are used, where their files live,
+and how to tell whether an index matches the query encoder.
+
+- One default embedding model for index build and query time
+- Models resolved to a local cache directory; with FLIGHTLENS_OFFLINE=1
+  startup never touches the network and fails fast if a model is missing
+- Embedding fingerprint (name, dimension, normalization, tokenizer hash)
+  recorded in the index manifest at build time and checked at load time
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_EMBED_MODEL = "sentence-transformers/all-mpnet-base-v2"
+DEFAULT_LLM_MODEL = "google/flan-t5-base"
+
+EMBED_MODEL = os.getenv("FLIGHTLENS_EMBEDDING_MODEL", DEFAULT_EMBED_MODEL)
+LLM_MODEL = os.getenv("FLIGHTLENS_LLM_MODEL", DEFAULT_LLM_MODEL)
+NORMALIZE_EMBEDDINGS = os.getenv("FLIGHTLENS_NORMALIZE_EMBEDDINGS", "0") == "1"
+
+MODEL_CACHE = os.getenv("FLIGHTLENS_MODEL_CACHE", "models/hf_cache")
+OFFLINE = os.getenv("FLIGHTLENS_OFFLINE", "0") == "1"
+
+# Files that define tokenization, in preference order
+TOKENIZER_FILES = ("tokenizer.json", "vocab.txt", "spiece.model", "sentencepiece.bpe.model", "merges.txt")
+
+
+class ModelRegistryError(RuntimeError):
+    """Model missing from the local cache, or index/encoder mismatch."""
+
+
+def enable_offline():
+    """Stop transformers / huggingface_hub from making any network call."""
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+
+if OFFLINE:
+    enable_offline()
+
+
+# -------------------------------------------------------------------
+# Local model cache
+# -------------------------------------------------------------------
+def cache_path(name: str, cache_dir: str = MODEL_CACHE) -> Path:
+    return Path(cache_dir) / re.sub(r"[^A-Za-z0-9._-]+", "--", name)
+
+
+@lru_cache(maxsize=None)
+def resolve_model(name: str, cache_dir: str = MODEL_CACHE) -> str:
+    """
+    Local directory holding a model's files
+
+    Already-local paths are returned as-is. Otherwise the model is taken from
+    the FlightLens cache, downloading it once unless running offline.
+    """
+    if Path(name).is_dir():
+        return name
+
+    local = cache_path(name, cache_dir)
+    if (local / "config.json").exists():
+        return str(local)
+
+    if OFFLINE:
+        raise ModelRegistryError(
+            f"Model '{name}' is not in the local cache ({local}) and FLIGHTLENS_OFFLINE=1. "
+            f"Run `python -m src.utils.model_registry fetch` on a connected machine first."
+        )
+
+    from huggingface_hub import snapshot_download
+
+    print(f"Downloading {name} → {local} (one-time)")
+    snapshot_download(repo_id=name, local_dir=str(local))
+    return str(local)
+
+
+def fetch_models(*names: str):
+    """Populate the cache for offline use."""
+    for name in names or (EMBED_MODEL, LLM_MODEL):
+        print(f"✅ {name} → {resolve_model(name)}")
+
+
+# -------------------------------------------------------------------
+# Embedding fingerprint
+# -------------------------------------------------------------------
+def _read_json(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tokenizer_hash(model_dir: str) -> Optional[str]:
+    for name in TOKENIZER_FILES:
+        path = Path(model_dir) / name
+        if path.exists():
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            return h.hexdigest()[:16]
+    return None
+
+
+def embedding_dimension(model_dir: str) -> Optional[int]:
+    """Read the output dimension from sentence-transformers / HF config files."""
+    pooling = _read_json(Path(model_dir) / "1_Pooling" / "config.json")
+    if "word_embedding_dimension" in pooling:
+        return int(pooling["word_embedding_dimension"])
+    config = _read_json(Path(model_dir) / "config.json")
+    for key in ("hidden_size", "d_model", "dim"):
+        if key in config:
+            return int(config[key])
+    return None
+
+
+@lru_cache(maxsize=None)
+def embedding_fingerprint(name: str = EMBED_MODEL) -> Dict:
+    """
+    Identity of an embedding model, computed from local files only
+
+    Returns:
+        Dictionary with name, dimension, normalize and tokenizer_hash
+    """
+    model_dir = resolve_model(name)
+    modules = _read_json(Path(model_dir) / "modules.json")
+    model_normalizes = any("Normalize" in m.get("type", "") for m in modules) if isinstance(modules, list) else False
+
+    return {
+        "name": name,
+        "dimension": embedding_dimension(model_dir),
+        "normalize": NORMALIZE_EMBEDDINGS or model_normalizes,
+        "tokenizer_hash": tokenizer_hash(model_dir),
+    }
+
+
+def check_fingerprint(built: Dict, current: Dict):
+    """Raise ModelRegistryError if an index fingerprint does not match the encoder."""
+    for key in ("name", "dimension", "normalize", "tokenizer_hash"):
+        if built.get(key) is None or current.get(key) is None:
+            continue
+        if built[key] != current[key]:
+            raise ModelRegistryError(
+                f"Index was built with embedding {key}={built[key]!r} but the query encoder has "
+                f"{key}={current[key]!r}. Rebuild the index (python -m src.data.embed_faiss) "
+                f"or set FLIGHTLENS_EMBEDDING_MODEL={built.get('name')}."
+            )
+
+
+# -------------------------------------------------------------------
+# Model loaders
+# -------------------------------------------------------------------
+def make_embeddings(name: str = EMBED_MODEL):
+    """LangChain embeddings for a registered model, loaded from the local cache."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=resolve_model(name),
+        encode_kwargs={"normalize_embeddings": NORMALIZE_EMBEDDINGS},
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+
+    if command == "fetch":
+        fetch_models(*sys.argv[2:])
+    elif command == "check":
+        from src.data.index_store import IndexStore, INDEX_DIR
+
+        manifest = IndexStore(INDEX_DIR).check(EMBED_MODEL, fingerprint=embedding_fingerprint(EMBED_MODEL))
+        print("✅ Index matches query encoder" if manifest else "ℹ️  Legacy index without manifest")
+    else:
+        print(f"Embedding model: {EMBED_MODEL}")
+        print(f"LLM model:       {LLM_MODEL}")
+        print(f"Model cache:     {MODEL_CACHE}  (offline={OFFLINE})")
@@ -0,0 +1,310 @@
+"""
+Telemetry ring buffer for FlightLens
+Fixed-size NumPy history of SimConnect samples with incremental trend features
+(altitude trend, airspeed stability, fuel burn, bank/pitch excursions) that can
+be formatted compactly for the decision-support prompt.
+
+Trace files are JSONL, one sample per line:
+    {"t": 12.5, "altitude": 5000, "airspeed": 120, "heading": 270, ...}
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Generator, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Same keys as MSFSContext.get_status()
+CHANNELS = (
+    "altitude",
+    "airspeed",
+    "heading",
+    "vertical_speed",
+    "fuel_quantity",
+    "engine_rpm",
+    "flaps",
+    "pitch",
+    "roll",
+)
+
+LEVEL_FPM = 100.0        # |altitude trend| below this is "level"
+STABLE_KTS = 3.0         # airspeed std-dev below this is "stable"
+
+
+class TelemetryRingBuffer:
+    """
+    Fixed-capacity ring buffer of telemetry samples.
+
+    Window sums (t, t², x, x², t·x) are kept for every channel at once and
+    updated per sample (add newest, subtract evicted), so trend features are
+    O(channels) per push instead of a rescan of the whole history.
+    """
+
+    def __init__(self, capacity: int = 120, channels: Tuple[str, ...] = CHANNELS):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2 samples")
+
+        self.capacity = capacity
+        self.channels = tuple(channels)
+        self._col = {name: i for i, name in enumerate(self.channels)}
+
+        n = len(self.channels)
+        self._data = np.zeros((capacity, n), dtype=np.float64)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._head = 0          # next write slot
+        self._size = 0
+        self._pushes = 0
+        self._t0 = None
+        self._last = np.zeros(n, dtype=np.float64)
+
+        # Running window sums
+        self._st = 0.0
+        self._stt = 0.0
+        self._sx = np.zeros(n)
+        self._sxx = np.zeros(n)
+        self._stx = np.zeros(n)
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, sample: Dict, t: Optional[float] = None):
+        """Append one telemetry sample (dict as returned by MSFSContext.get_status)."""
+        if t is None:
+            t = sample.get("t", time.monotonic())
+        if self._t0 is None:
+            self._t0 = float(t)
+        tr = float(t) - self._t0
+
+        row = self._to_row(sample)
+
+        if self._size == self.capacity:
+            self._evict(self._head)
+        else:
+            self._size += 1
+
+        self._data[self._head] = row
+        self._times[self._head] = tr
+        self._st += tr
+        self._stt += tr * tr
+        self._sx += row
+        self._sxx += row * row
+        self._stx += tr * row
+
+        self._last = row
+        self._head = (self._head + 1) % self.capacity
+        self._pushes += 1
+
+        # Re-derive the sums once per buffer turn to cancel float drift (amortised O(1))
+        if self._pushes % self.capacity == 0:
+            self._resync()
+
+    def extend(self, samples: Iterable[Dict]):
+        for sample in samples:
+            self.push(sample)
+
+    def _to_row(self, sample: Dict) -> np.ndarray:
+        row = self._last.copy()
+        for name, i in self._col.items():
+            value = sample.get(name)
+            if value is None:
+                continue  # hold last value for missing readings
+            value = float(value)
+            if name == "heading" and self._size:
+                # Unwrap so 359° → 1° is a +2° change, not -358°
+                delta = (value - self._last[i] + 180.0) % 360.0 - 180.0
+                value = self._last[i] + delta
+            row[i] = value
+        return row
+
+    def _evict(self, slot: int):
+        old = self._data[slot]
+        t = self._times[slot]
+        self._st -= t
+        self._stt -= t * t
+        self._sx -= old
+        self._sxx -= old * old
+        self._stx -= t * old
+
+    def _resync(self):
+        data, times = self._window()
+        self._st = float(times.sum())
+        self._stt = float((times * times).sum())
+        self._sx = data.sum(axis=0)
+        self._sxx = (data * data).sum(axis=0)
+        self._stx = times @ data
+
+    def _window(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples currently in the window, oldest first."""
+        if self._size < self.capacity:
+            return self._data[:self._size], self._times[:self._size]
+        order = np.roll(np.arange(self.capacity), -self._head)
+        return self._data[order], self._times[order]
+
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+    def slopes(self) -> np.ndarray:
+        """Least-squares slope (units/sec) of every channel over the window."""
+        n = self._size
+        if n < 2:
+            return np.zeros(len(self.channels))
+        var_t = self._stt - self._st * self._st / n
+        if var_t <= 1e-12:
+            return np.zeros(len(self.channels))
+        return (self._stx - self._st * self._sx / n) / var_t
+
+    def means(self) -> np.ndarray:
+        if not self._size:
+            return np.zeros(len(self.channels))
+        return self._sx / self._size
+
+    def stds(self) -> np.ndarray:
+        if not self._size:
+            return np.zeros(len(self.channels))
+        mean = self._sx / self._size
+        return np.sqrt(np.maximum(self._sxx / self._size - mean * mean, 0.0))
+
+    def span_seconds(self) -> float:
+        if self._size < 2:
+            return 0.0
+        newest = self._times[(self._head - 1) % self.capacity]
+        oldest = self._times[0] if self._size < self.capacity else self._times[self._head]
+        return float(newest - oldest)
+
+    def excursions(self, names=("pitch", "roll")) -> Dict[str, float]:
+        """Peak absolute value over the window (vectorised across channels)."""
+        cols = [self._col[n] for n in names if n in self._col]
+        if not self._size or not cols:
+            return {n: 0.0 for n in names}
+        peaks = np.abs(self._data[:self._size, cols]).max(axis=0)
+        return {n: float(p) for n, p in zip(names, peaks)}
+
+    def trends(self) -> Dict[str, float]:
+        """
+        Summary features for the current window.
+
+        Returns:
+            Dictionary of trend values (per-minute / per-hour rates where relevant)
+        """
+        slope = self.slopes()
+        mean = self.means()
+        std = self.stds()
+        c = self._col
+        peaks = self.excursions()
+
+        out = {
+            "samples": self._size,
+            "window_s": self.span_seconds(),
+        }
+        if "altitude" in c:
+            out["altitude"] = float(self._last[c["altitude"]])
+            out["altitude_trend_fpm"] = float(slope[c["altitude"]] * 60.0)
+        if "airspeed" in c:
+            out["airspeed"] = float(self._last[c["airspeed"]])
+            out["airspeed_mean"] = float(mean[c["airspeed"]])
+            out["airspeed_std"] = float(std[c["airspeed"]])
+            out["airspeed_trend_kpm"] = float(slope[c["airspeed"]] * 60.0)
+        if "heading" in c:
+            out["heading"] = float(self._last[c["heading"]] % 360.0)
+            out["turn_rate_dps"] = float(slope[c["heading"]])
+        if "fuel_quantity" in c:
+            out["fuel_quantity"] = float(self._last[c["fuel_quantity"]])
+            out["fuel_burn_gph"] = float(-slope[c["fuel_quantity"]] * 3600.0)
+        out["max_pitch"] = peaks.get("pitch", 0.0)
+        out["max_bank"] = peaks.get("roll", 0.0)
+        return out
+
+    def format_for_prompt(self) -> str:
+        """Compact one-line summary suitable for the {telemetry} prompt slot."""
+        if not self._size:
+            return "No telemetry available"
+
+        tr = self.trends()
+        parts = []
+
+        if "altitude" in tr:
+            trend = tr["altitude_trend_fpm"]
+            if abs(trend) < LEVEL_FPM:
+                state = "level"
+            else:
+                state = "climbing" if trend > 0 else "descending"
+            parts.append(f"ALT {tr['altitude']:.0f} ft ({trend:+.0f} fpm, {state})")
+        if "airspeed" in tr:
+            state = "stable" if tr["airspeed_std"] < STABLE_KTS else "unstable"
+            parts.append(f"IAS {tr['airspeed']:.0f} kt (±{tr['airspeed_std']:.1f}, {state})")
+        if "heading" in tr:
+            parts.append(f"HDG {tr['heading']:.0f}° ({tr['turn_rate_dps']:+.1f}°/s)")
+        if "fuel_quantity" in tr:
+            parts.append(f"FUEL {tr['fuel_quantity']:.1f} gal (burn {tr['fuel_burn_gph']:.1f} gph)")
+        parts.append(f"max bank {tr['max_bank']:.0f}°, max pitch {tr['max_pitch']:.0f}°")
+        parts.append(f"over {tr['window_s']:.0f}s")
+
+        return " | ".join(parts)
+
+
+# -------------------------------------------------------------------
+# Trace files
+# -------------------------------------------------------------------
+def load_trace(path: str) -> Generator[Dict, None, None]:
+    """Yield samples from a JSONL telemetry trace."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def replay_trace(path: str, buffer: Optional[TelemetryRingBuffer] = None,
+                 capacity: int = 120) -> TelemetryRingBuffer:
+    """Push every sample of a recorded trace through a ring buffer."""
+    if buffer is None:
+        buffer = TelemetryRingBuffer(capacity=capacity)
+    buffer.extend(load_trace(path))
+    return buffer
+
+
+def record_trace(context, path: str, seconds: float = 60.0, hz: float = 1.0):
+    """
+    Record a trace from an MSFSContext (live or mock)
+
+    Args:
+        context: Object with get_status() (e.g. MSFSContext)
+        path: Output JSONL path
+        seconds: Recording length
+        hz: Sample rate
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    period = 1.0 / hz
+    start = time.monotonic()
+
+    with open(path, "w", encoding="utf-8") as f:
+        while True:
+            now = time.monotonic() - start
+            if now > seconds:
+                break
+            sample = dict(context.get_status())
+            sample["t"] = round(now, 3)
+            json.dump(sample, f)
+            f.write("\n")
+            time.sleep(period)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        buf = replay_trace(sys.argv[1])
+        print(f"Replayed {len(buf)} samples from {sys.argv[1]}")
+    else:
+        from src.utils.context_simconnect import MSFSContext
+
+        sim = MSFSContext()
+        buf = TelemetryRingBuffer(capacity=30)
+        for i in range(30):
+            buf.push(sim.get_status(), t=float(i))
+
+    print(buf.format_for_prompt())
@@ -3,7 +3,13 @@ FlightLens Streamlit Application
 Improved v2 – Optimized for MPNet + Updated RAG Chain
 """
 
+import os
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib.util import find_spec
 from pathlib import Path
 import streamlit as st
 
@@ -14,18 +20,18 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from src.rag.chain import answer_question, answer_question_with_sources
+from src.rag.router import QueryRouter, answer_routed, extract_station
+from src.rag.service import get_service
 from src.utils.context_simconnect import MSFSContext
-from src.integrations.aviation_weather import get_metar, decode_metar
+from src.integrations.aviation_weather import METAR_CACHE_TTL, get_metar, decode_metar
+from src.rag.filtering import MetadataFilter, list_sources
+from src.uia.asr import ASR_BACKEND, backend_available
+from src.utils import instrumentation as inst
 
-# Voice support
-try:
-    import whisper
-    import sounddevice as sd
-    import wavio
-    VOICE_AVAILABLE = True
-except ImportError:
-    VOICE_AVAILABLE = False
+# Voice support: the configured ASR backend (FLIGHTLENS_ASR_BACKEND) and a microphone library
+VOICE_AVAILABLE = backend_available(ASR_BACKEND) and find_spec("sounddevice") is not None
+if VOICE_AVAILABLE:
+    from src.uia import voice_assistant as voice
 
 
 # ---------------------------------------------------------
@@ -54,10 +60,15 @@ load_css()
 # ---------------------------------------------------------
 # Initialize SimConnect (cached)
 # ---------------------------------------------------------
+TELEMETRY_HZ = float(os.getenv("FLIGHTLENS_UI_TELEMETRY_HZ", "2"))
+
+
 @st.cache_resource
 def init_simconnect():
     try:
-        return MSFSContext()
+        context = MSFSContext()
+        context.start_sampler(TELEMETRY_HZ)   # panels read the ring buffer, never SimConnect
+        return context
     except Exception as e:
         st.error(f"SimConnect Error: {e}")
         return None
@@ -65,6 +76,271 @@ def init_simconnect():
 sim = init_simconnect()
 
 
+@st.cache_resource
+def metrics_server():
+    """/metrics endpoint for this Streamlit process (FLIGHTLENS_METRICS=1)."""
+    return inst.serve_if_enabled()
+
+metrics_server()
+
+
+# ---------------------------------------------------------
+# Warm models and memoized results
+# ---------------------------------------------------------
+ANSWER_TTL = int(os.getenv("FLIGHTLENS_UI_ANSWER_TTL", "3600"))
+QUERY_WORKERS = int(os.getenv("FLIGHTLENS_UI_WORKERS", "2"))
+ANSWER_CACHE_SIZE = 500
+POLL_S = 0.5
+
+GROUNDING_EXAMPLES = [
+    "What is the minimum safe altitude?",
+    "Interpret METAR visibility",
+    "VFR weather minimums in Class E",
+    "Engine fire procedure in flight",
+]
+
+
+class AnswerCache:
+    """
+    Memoized routed answers with a lifetime chosen from what the answer used.
+    The route is only known once the question has been answered, so this is
+    decided per result rather than per function like st.cache_data.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def ttl(result: dict) -> float:
+        """Seconds an answer may be reused: never with telemetry or errors, METAR lifetime with weather."""
+        if result["answer"].startswith("Error") or result.get("telemetry") is not None:
+            return 0
+        if result.get("metar") is not None:
+            return min(ANSWER_TTL, METAR_CACHE_TTL)
+        return ANSWER_TTL
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, result: dict):
+        ttl = self.ttl(result)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class QueryJob:
+    """A question answered on the background executor; polled by the UI."""
+
+    def __init__(self, query: str, source: str = None, icao: str = None):
+        self.query = query
+        self.source = source
+        self.icao = icao
+        self.stage = "Retrieving"
+        self.partial = ""
+        self.started = time.monotonic()
+        self.finished = None
+        self.future = None
+
+    def on_token(self, text: str):
+        self.stage = "Generating"
+        self.partial += text
+
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+
+@st.cache_resource(show_spinner="Loading FlightLens engine...")
+def load_rag_service():
+    """The process-wide RAG service with embeddings, FAISS index and LLM loaded once."""
+    return get_service()
+
+
+def engine_version():
+    """
+    (index version, None) when the RAG service is loaded, else (None, reason).
+    A missing or mismatched index must not take the whole page down; a
+    failed load is not cached, so the next rerun tries again.
+    """
+    try:
+        return load_rag_service().version, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+@st.cache_resource(show_spinner="Loading Whisper...")
+def load_whisper():
+    return voice.get_whisper_model()
+
+
+@st.cache_resource
+def query_executor():
+    """Shared worker pool, so a running query never blocks the script."""
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="ui-query")
+
+
+@st.cache_resource
+def load_router(_embeddings):
+    """Query router bound to the engine's embeddings (they survive index swaps)."""
+    return QueryRouter(_embeddings)
+
+
+def routed_answer(query: str, source: str = None, icao: str = None, on_token=None):
+    """Answer through the query router: checklists, METAR, telemetry or the manuals."""
+    try:
+        with load_rag_service().acquire() as engine:
+            return answer_routed(query, engine=engine, router=load_router(engine.embeddings),
+                                 icao=icao, sim=sim, filter=MetadataFilter(source=source),
+                                 on_token=on_token)
+    except Exception as e:
+        return {"answer": f"Error: {e}", "sources": [], "num_sources": 0}
+
+
+@st.cache_resource
+def answer_cache():
+    return AnswerCache()
+
+
+def cached_answer(query: str, source: str = None, icao: str = None, index_version: str = None,
+                  on_token=None):
+    """Routed answer + sources, memoized per question, manual, station and index version."""
+    key = (query, source, icao, index_version)
+    cache = answer_cache()
+    result = cache.get(key)
+    if result is None:
+        result = routed_answer(query, source, icao, on_token=on_token)
+        cache.put(key, result)
+    return result
+
+
+def submit_query(query: str, source: str = None, icao: str = None,
+                 executor: ThreadPoolExecutor = None) -> QueryJob:
+    """
+    Start answering on the executor and return immediately.
+    icao is the sidebar station, used when the question names none.
+    """
+    query = query.strip()
+    job = QueryJob(query, source, extract_station(query) or icao)
+    version, error = engine_version()
+    if error:
+        job.future, job.finished = Future(), job.started
+        job.future.set_result({"answer": f"Error: FlightLens engine unavailable ({error})",
+                               "sources": [], "num_sources": 0})
+        return job
+
+    def run():
+        try:
+            return cached_answer(job.query, source, job.icao, version, on_token=job.on_token)
+        finally:
+            job.finished = time.monotonic()
+
+    job.future = (executor or query_executor()).submit(run)
+    return job
+
+
+@st.cache_data(ttl=int(METAR_CACHE_TTL), show_spinner=False)
+def cached_metar(icao: str):
+    """(raw METAR, decoded text or None) per station."""
+    raw = get_metar(icao)
+    ok = not raw.startswith("Error") and "No METAR" not in raw
+    return raw, decode_metar(raw) if ok else None
+
+
+@st.cache_resource
+def grounding_answers(source: str = None, index_version: str = None):
+    """Start answering the canned Source Grounding questions in the background."""
+    # Own single worker, so pilot questions never queue behind the precompute
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grounding")
+    return {q: submit_query(q, source, executor=pool) for q in GROUNDING_EXAMPLES}
+
+
+def render_sources(result):
+    with st.expander(f"Sources ({result['num_sources']})"):
+        st.markdown('<div class="sources-block">', unsafe_allow_html=True)
+        for s in result["sources"]:
+            st.text(s["content"])
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+@st.fragment(run_every=POLL_S)
+def job_panel(key: str, show_sources: bool = True):
+    """Progress, partial answer and final result of the job in st.session_state[key]."""
+    job = st.session_state.get(key)
+    if job is None:
+        return
+    if not job.done():
+        st.caption(f"⏳ {job.stage}... {job.elapsed():.1f}s")
+        if job.partial:
+            st.markdown(f'<div class="answer-block">{job.partial}▌</div>', unsafe_allow_html=True)
+        return
+
+    result = job.result()
+    st.success(f"Answer ({job.elapsed():.1f}s)")
+    st.markdown(f'<div class="answer-block">{result["answer"]}</div>', unsafe_allow_html=True)
+    if show_sources:
+        render_sources(result)
+
+
+@st.cache_data
+def available_manuals():
+    return list_sources()
+
+
+def show_engine_error():
+    if engine_error:
+        st.error(f"⚠️ FlightLens engine unavailable: {engine_error}")
+
+
+index_version, engine_error = engine_version()
+if engine_error is None:
+    grounding_answers(None, index_version)     # default view: all manuals
+
+
+# ---------------------------------------------------------
+# Live telemetry (refreshed from the background sampler)
+# ---------------------------------------------------------
+@st.fragment(run_every=1.0 / TELEMETRY_HZ)
+def telemetry_panel():
+    if not sim:
+        st.error("SimConnect not initialized.")
+        return
+
+    status, trends = sim.snapshot()
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric("Altitude", f"{status['altitude']:.0f} ft", f"{trends.get('altitude_trend_fpm', 0):+.0f} fpm")
+        st.metric("Airspeed", f"{status['airspeed']:.0f} kts", f"±{trends.get('airspeed_std', 0):.1f} kts",
+                  delta_color="off")
+        st.metric("Heading", f"{status['heading']:.0f}°", f"{trends.get('turn_rate_dps', 0):+.1f}°/s",
+                  delta_color="off")
+
+    with col2:
+        st.metric("Vertical Speed", f"{status['vertical_speed']:.0f} fpm")
+        st.metric("Fuel", f"{status['fuel_quantity']:.1f} gal", f"{-trends.get('fuel_burn_gph', 0):+.1f} gph",
+                  delta_color="off")
+        st.metric("Engine RPM", f"{status['engine_rpm']:.0f}")
+
+    st.caption(f"Mode: {sim.mode} · {trends['samples']} samples over {trends['window_s']:.0f}s")
+
+
 # ---------------------------------------------------------
 # Session State
 # ---------------------------------------------------------
@@ -84,15 +360,20 @@ st.divider()
 # SIDEBAR — WEATHER + TELEMETRY
 # ---------------------------------------------------------
 with st.sidebar:
+    st.header("📚 Manuals")
+    manual = st.selectbox("Answer from", ["All manuals"] + available_manuals())
+    source_filter = None if manual == "All manuals" else manual
+
+    st.divider()
     st.header("🌦️ Weather Assistant")
     icao = st.text_input("ICAO Code", "KDFW")
+    station = icao.strip().upper() or None      # also used for weather questions
 
     if st.button("Get METAR", use_container_width=True):
-        raw = get_metar(icao)
+        raw, decoded = cached_metar(icao.strip().upper())
         st.text_area("Raw METAR", raw, height=80)
 
-        if not raw.startswith("Error") and "No METAR" not in raw:
-            decoded = decode_metar(raw)
+        if decoded is not None:
             st.info(f"**Decoded METAR:**\n\n{decoded}")
         else:
             st.error(raw)
@@ -100,26 +381,7 @@ with st.sidebar:
     st.divider()
     st.header("✈️ Live Telemetry")
 
-    if st.button("Refresh Telemetry", use_container_width=True):
-        if sim:
-            status = sim.get_status()
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.metric("Altitude", f"{status['altitude']:.0f} ft")
-                st.metric("Airspeed", f"{status['airspeed']:.0f} kts")
-                st.metric("Heading", f"{status['heading']:.0f}°")
-
-            with col2:
-                st.metric("Vertical Speed", f"{status['vertical_speed']:.0f} fpm")
-                st.metric("Fuel", f"{status['fuel_quantity']:.1f} gal")
-                st.metric("Engine RPM", f"{status['engine_rpm']:.0f}")
-
-            st.caption(f"Mode: {sim.mode}")
-        else:
-            st.error("SimConnect not initialized.")
-    else:
-        st.info("Click to refresh telemetry")
+    telemetry_panel()
 
 
 # ---------------------------------------------------------
@@ -133,6 +395,7 @@ tab1, tab2, tab3 = st.tabs(["💬 Text Query", "🎤 Voice Query", "📚 Source
 # ---------------------------------------------------------
 with tab1:
     st.header("Ask a Question")
+    show_engine_error()
 
     col1, col2 = st.columns([3, 1])
     query = col1.text_input("Question", placeholder="E.g., What are VFR minimums?")
@@ -143,24 +406,9 @@ with tab1:
             st.warning("Please enter a valid question.")
         else:
             st.session_state.query_history.append(query)
+            st.session_state.text_job = submit_query(query, source_filter, station)
 
-            with st.spinner("Processing your query..."):
-                if show_src:
-                    result = answer_question_with_sources(query)
-                    st.success("Answer")
-                    st.markdown(
-                        f'<div class="answer-block">{result["answer"]}</div>',
-                        unsafe_allow_html=True,
-                    )
-
-                    with st.expander(f"Sources ({result['num_sources']})"):
-                        st.markdown('<div class="sources-block">', unsafe_allow_html=True)
-                        for s in result["sources"]:
-                            st.text(s["content"])
-                        st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    st.success("Answer")
-                    st.write(answer_question(query))
+    job_panel("text_job", show_src)
 
     # Recent history
     if len(st.session_state.query_history):
@@ -174,30 +422,42 @@ with tab1:
 # ---------------------------------------------------------
 with tab2:
     st.header("Voice Query")
+    show_engine_error()
 
     if not VOICE_AVAILABLE:
-        st.error("Voice mode unavailable. Install: openai-whisper, sounddevice, wavio")
+        st.error(f"Voice mode unavailable. Install sounddevice and the '{ASR_BACKEND}' ASR backend "
+                 "(openai-whisper, faster-whisper or optimum[onnxruntime])")
     else:
-        duration = st.slider("Recording Duration (seconds)", 3, 10, 5)
-
-        if st.button("🎙 Record", type="primary"):
-            st.write("Recording...")
-            fs = 16000
-            audio = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype="int16")
-            sd.wait()
-
-            wavio.write("query.wav", audio, fs, sampwidth=2)
-
-            st.success("Recording saved. Transcribing...")
-
-            model = whisper.load_model("base")
-            transcription = model.transcribe("query.wav")["text"]
-
+        load_whisper()   # shared model, loaded once per process
+
+        streaming = st.toggle("Stop when I stop speaking", value=True)
+        duration = st.slider("Recording Duration (seconds)", 3, 10, 5, disabled=streaming)
+        fixture = st.file_uploader("…or use a WAV recording", type=["wav"])
+
+        transcription = None
+        if fixture is not None and st.button("▶ Transcribe file"):
+            live = st.empty()
+            transcription = voice.listen(voice.wav_chunks(fixture),
+                                         on_partial=lambda t: live.info(f"… {t}"))
+        elif st.button("🎙 Record", type="primary"):
+            if streaming:
+                live = st.empty()
+                live.write("Listening...")
+                transcription = voice.listen(voice.microphone_chunks(),
+                                             on_partial=lambda t: live.info(f"… {t}"))
+            else:
+                st.write("Recording...")
+                audio = voice.record_audio(duration)
+                transcription = voice.transcribe_audio(audio)
+
+        if transcription is not None:
             st.info("Transcribed Text:")
-            st.write(transcription)
+            st.write(transcription or "_No speech detected_")
+
+            if transcription:
+                st.session_state.voice_job = submit_query(transcription, source_filter, station)
 
-            st.success("Answer:")
-            st.write(answer_question(transcription))
+        job_panel("voice_job", show_sources=False)
 
 
 # ---------------------------------------------------------
@@ -205,30 +465,17 @@ with tab2:
 # ---------------------------------------------------------
 with tab3:
     st.header("Source Grounding Demo")
+    show_engine_error()
 
-    examples = [
-        "What is the minimum safe altitude?",
-        "Interpret METAR visibility",
-        "VFR weather minimums in Class E",
-        "Engine fire procedure in flight",
-    ]
-
-    q = st.selectbox("Choose a question:", examples)
+    q = st.selectbox("Choose a question:", GROUNDING_EXAMPLES)
 
     if st.button("Run Source Grounding", type="primary"):
-        result = answer_question_with_sources(q)
-
-        st.success("Answer")
-        st.markdown(
-            f'<div class="answer-block">{result["answer"]}</div>',
-            unsafe_allow_html=True,
-        )
-
-        with st.expander("Sources"):
-            st.markdown('<div class="sources-block">', unsafe_allow_html=True)
-            for s in result["sources"]:
-                st.text(s["content"])
-            st.markdown('</div>', unsafe_allow_html=True)
+        job = grounding_answers(source_filter, index_version)[q] if engine_error is None else None
+        if job is None or (job.done() and job.result()["answer"].startswith("Error")):
+            job = submit_query(q, source_filter, station)
+        st.session_state.grounding_job = job
+
+    job_panel("grounding_job")
 
 
 # ---------------------------------------------------------